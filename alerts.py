@@ -0,0 +1,92 @@
+"""Cảnh báo tồn kho dưới mức an toàn, đánh giá ngay khi ghi lượt nhập/xuất.
+
+`record_movement(...)` gọi `check_part(...)` trong cùng transaction nên bảng alerts luôn khớp
+với tồn kho vừa ghi. Mỗi linh kiện có nhiều nhất một cảnh báo đang mở cho mỗi loại: bảng có
+unique key (part_id, kind, active) với active = 1 khi đang mở và NULL khi đã đóng, nên ghi lại
+cùng một vi phạm chỉ cập nhật dòng đang mở. Cảnh báo tự đóng khi tồn kho trở lại mức an toàn.
+Số cảnh báo đang mở đếm trên index (active) chứ không quét spare_parts.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+
+from database import read_df, read_scalar
+
+SAFETY_STOCK = "safety_stock"
+
+# Tồn kho dưới safety_stock của linh kiện có bật kiểm tra (cột lưu '1'/'0' hoặc 'Yes'/'No')
+BREACH_SQL = ("safety_stock > 0 AND stock < safety_stock "
+              "AND COALESCE(safety_stock_check, '1') NOT IN ('0', 'No')")
+
+_OPEN_ALERT = {
+    "mysql": """
+        INSERT INTO alerts (part_id, kind, active, stock, threshold, created_at, updated_at)
+        VALUES (:part_id, :kind, 1, :stock, :threshold, :now, :now)
+        ON DUPLICATE KEY UPDATE stock = VALUES(stock), threshold = VALUES(threshold), updated_at = VALUES(updated_at)
+    """,
+    "sqlite": """
+        INSERT INTO alerts (part_id, kind, active, stock, threshold, created_at, updated_at)
+        VALUES (:part_id, :kind, 1, :stock, :threshold, :now, :now)
+        ON CONFLICT (part_id, kind, active)
+        DO UPDATE SET stock = excluded.stock, threshold = excluded.threshold, updated_at = excluded.updated_at
+    """,
+}
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def check_part(conn, part_id):
+    """Mở (hoặc cập nhật) cảnh báo nếu tồn kho hiện tại của `part_id` dưới mức an toàn, đóng
+    cảnh báo đang mở nếu không; trả về True khi linh kiện đang vi phạm. Gọi sau khi đã cập
+    nhật spare_parts.stock trong cùng transaction."""
+    row = conn.execute(text(f"""
+        SELECT stock, safety_stock, CASE WHEN {BREACH_SQL} THEN 1 ELSE 0 END AS breached
+        FROM spare_parts WHERE id = :part_id
+    """), {"part_id": part_id}).first()
+    if row is None:
+        return False
+    params = {"part_id": part_id, "kind": SAFETY_STOCK, "stock": row.stock, "now": _now()}
+    if row.breached:
+        conn.execute(text(_OPEN_ALERT[conn.dialect.name]), {**params, "threshold": row.safety_stock})
+        return True
+    conn.execute(text("""
+        UPDATE alerts SET active = NULL, stock = :stock, resolved_at = :now, updated_at = :now
+        WHERE part_id = :part_id AND kind = :kind AND active = 1
+    """), params)
+    return False
+
+
+def check_all(conn):
+    """Đánh giá lại toàn bộ danh mục (sau migration hoặc khi tồn kho bị sửa ngoài app);
+    trả về (số cảnh báo đang mở, số cảnh báo vừa đóng)."""
+    now = _now()
+    closed = conn.execute(text(f"""
+        UPDATE alerts SET active = NULL, resolved_at = :now, updated_at = :now
+        WHERE kind = :kind AND active = 1
+          AND part_id NOT IN (SELECT id FROM spare_parts WHERE {BREACH_SQL})
+    """), {"kind": SAFETY_STOCK, "now": now}).rowcount
+    breaches = conn.execute(text(f"""
+        SELECT id AS part_id, stock, safety_stock AS threshold FROM spare_parts WHERE {BREACH_SQL}
+    """)).mappings().all()
+    if breaches:
+        conn.execute(text(_OPEN_ALERT[conn.dialect.name]),
+                     [{**row, "kind": SAFETY_STOCK, "now": now} for row in breaches])
+    return len(breaches), closed
+
+
+def open_alert_count(conn):
+    return read_scalar(conn, "SELECT COUNT(*) FROM alerts WHERE active = 1")
+
+
+def open_alerts(conn):
+    """Các cảnh báo đang mở kèm mã và mô tả linh kiện, thiếu nhiều nhất lên đầu."""
+    return read_df(conn, """
+        SELECT a.part_id, sp.material_no, sp.description, a.kind, a.stock, a.threshold,
+               a.created_at, a.updated_at
+        FROM alerts a
+        JOIN spare_parts sp ON sp.id = a.part_id
+        WHERE a.active = 1
+        ORDER BY a.stock - a.threshold, a.created_at
+    """)
@@ -0,0 +1,191 @@
+"""Lưu trữ lịch sử nhập/xuất cũ ra file Parquet.
+
+Các lượt nhập/xuất cũ hơn `settings.ARCHIVE_AFTER_DAYS` ngày được chuyển khỏi import_export
+sang file Parquet chia theo tháng trong `settings.ARCHIVE_DIR`:
+
+    <ARCHIVE_DIR>/import_export/month=2023-01/part-20250131T020000000000.parquet
+
+Bảng `movement_archive` giữ một dòng cho mỗi file (tháng, đường dẫn, số dòng, ngày nhỏ nhất và
+lớn nhất) để khi đọc chỉ mở các file giao với khoảng ngày cần. `daily_movements` không bị xóa
+nên biểu đồ và thống kê vẫn đủ lịch sử; `iter_movements` đọc liền mạch cả archive lẫn
+import_export khi cần từng lượt. Chạy định kỳ bằng:
+
+    python tools/manage.py archive-movements
+"""
+import os
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import inspect, text
+
+import settings
+from database import read_chunks, write_transaction
+from stock_history import as_date
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("part_id", pa.int64()),
+    ("quantity", pa.int64()),
+    ("mc_pos_id", pa.int64()),
+    # empl_id giữ mã nhân viên (amann_id) dạng chuỗi
+    ("empl_id", pa.string()),
+    ("date", pa.timestamp("us")),
+    ("reason", pa.string()),
+    ("im_ex_flag", pa.int8()),
+])
+COLUMNS = SCHEMA.names
+# im_ex_flag là BIT(1) trên MySQL, `+ 0` để đọc ra số
+_SELECT = {"im_ex_flag": "im_ex_flag + 0 AS im_ex_flag"}
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def archive_cutoff(before=None):
+    """Đầu tháng chứa ngày `before` (mặc định hôm nay trừ ARCHIVE_AFTER_DAYS): mọi tháng
+    trước đó được lưu trữ, để mỗi tháng chỉ nằm ở một nơi."""
+    before = as_date(before) if before else date.today() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    return month_start(before)
+
+
+def _select_columns(columns):
+    return ", ".join(_SELECT.get(c, c) for c in columns)
+
+
+def _archive_month(engine, month, log):
+    bounds = {"start": month.strftime('%Y-%m-%d'), "end": next_month(month).strftime('%Y-%m-%d')}
+    relative = os.path.join("import_export", f"month={month:%Y-%m}", f"part-{datetime.now():%Y%m%dT%H%M%S%f}.parquet")
+    path = os.path.join(settings.ARCHIVE_DIR, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    rows, max_id, min_date, max_date, writer = 0, None, None, None, None
+    try:
+        with engine.connect() as conn:
+            for chunk in read_chunks(conn, f"""
+                SELECT {_select_columns(COLUMNS)} FROM import_export
+                WHERE date >= :start AND date < :end
+                ORDER BY id
+            """, bounds):
+                chunk['date'] = pd.to_datetime(chunk['date'])
+                chunk['empl_id'] = chunk['empl_id'].astype("string")
+                if writer is None:
+                    writer = pq.ParquetWriter(path + ".tmp", SCHEMA)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=SCHEMA, preserve_index=False))
+                rows += len(chunk)
+                max_id = max(max_id or 0, int(chunk['id'].max()))
+                min_date = min(min_date or chunk['date'].min(), chunk['date'].min())
+                max_date = max(max_date or chunk['date'].max(), chunk['date'].max())
+    except Exception:
+        if writer is not None:
+            writer.close()
+            os.remove(path + ".tmp")
+        raise
+    if writer is not None:
+        writer.close()
+    if not rows:
+        return 0
+    # File chỉ được ghi nhận sau khi đã ghi xong; nếu lỗi trước đó thì import_export còn nguyên
+    os.replace(path + ".tmp", path)
+
+    try:
+        with write_transaction("import_export", "movement_archive", engine=engine) as conn:
+            conn.execute(text("""
+                INSERT INTO movement_archive (path, month, row_count, min_date, max_date, archived_at)
+                VALUES (:path, :month, :rows, :min_date, :max_date, :archived_at)
+            """), {
+                "path": relative.replace(os.sep, "/"),
+                "month": bounds["start"],
+                "rows": rows,
+                "min_date": min_date.strftime('%Y-%m-%d %H:%M:%S'),
+                "max_date": max_date.strftime('%Y-%m-%d %H:%M:%S'),
+                "archived_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            })
+            # Chỉ xóa đúng các dòng đã ghi ra file (lượt ghi trong lúc chạy có id lớn hơn)
+            deleted = conn.execute(text("""
+                DELETE FROM import_export
+                WHERE date >= :start AND date < :end AND id <= :max_id
+            """), {**bounds, "max_id": max_id}).rowcount
+            if deleted != rows:
+                raise RuntimeError(f"Tháng {month:%Y-%m}: đã ghi {rows} dòng nhưng xóa {deleted} dòng")
+    except Exception:
+        os.remove(path)
+        raise
+    log(f"  {month:%Y-%m}: {rows} dòng → {relative}")
+    return rows
+
+
+def archive_movements(engine, before=None, log=print):
+    """Chuyển các lượt nhập/xuất của những tháng trước `archive_cutoff(before)` sang Parquet,
+    mỗi tháng một transaction; trả về tổng số dòng đã chuyển."""
+    cutoff = archive_cutoff(before)
+    with engine.connect() as conn:
+        first = conn.execute(text("SELECT MIN(date) FROM import_export WHERE date < :cutoff"),
+                             {"cutoff": cutoff.strftime('%Y-%m-%d')}).scalar()
+    total = 0
+    month = month_start(as_date(first)) if first is not None else cutoff
+    while month < cutoff:
+        total += _archive_month(engine, month, log)
+        month = next_month(month)
+    return total
+
+
+def archived_files(conn, start=None, end=None):
+    """Đường dẫn các file archive có dữ liệu trong [start, end), theo thứ tự thời gian."""
+    if not inspect(conn).has_table("movement_archive"):
+        return []
+    conditions, params = [], {}
+    if start is not None:
+        conditions.append("max_date >= :start")
+        params["start"] = as_date(start).strftime('%Y-%m-%d')
+    if end is not None:
+        conditions.append("min_date < :end")
+        params["end"] = as_date(end).strftime('%Y-%m-%d')
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    paths = conn.execute(text(f"SELECT path FROM movement_archive {where} ORDER BY month, path"), params).scalars()
+    return [os.path.join(settings.ARCHIVE_DIR, path) for path in paths]
+
+
+def iter_movements(conn, columns, start=None, end=None, im_ex_flag=None, include_hot=True):
+    """Các lượt nhập/xuất có ngày trong [start, end) từ archive rồi đến import_export, trả về
+    theo từng DataFrame có các cột `columns` (cột date luôn ở dạng datetime).
+    Chỉ mở các file archive giao với khoảng ngày cần đọc."""
+    start_ts = pd.Timestamp(as_date(start)) if start is not None else None
+    end_ts = pd.Timestamp(as_date(end)) if end is not None else None
+    needed = list(dict.fromkeys([*columns, "date", "im_ex_flag"]))
+    for path in archived_files(conn, start, end):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=settings.STREAM_CHUNK_ROWS, columns=needed):
+            df = batch.to_pandas()
+            mask = pd.Series(True, index=df.index)
+            if start_ts is not None:
+                mask &= df['date'] >= start_ts
+            if end_ts is not None:
+                mask &= df['date'] < end_ts
+            if im_ex_flag is not None:
+                mask &= df['im_ex_flag'] == im_ex_flag
+            if mask.any():
+                yield df.loc[mask, columns].reset_index(drop=True)
+    if not include_hot:
+        return
+
+    conditions, params = [], {}
+    if start_ts is not None:
+        conditions.append("date >= :start")
+        params["start"] = start_ts.strftime('%Y-%m-%d')
+    if end_ts is not None:
+        conditions.append("date < :end")
+        params["end"] = end_ts.strftime('%Y-%m-%d')
+    if im_ex_flag is not None:
+        conditions.append("im_ex_flag = :flag")
+        params["flag"] = im_ex_flag
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    for chunk in read_chunks(conn, f"SELECT {_select_columns(columns)} FROM import_export {where}", params):
+        if 'date' in chunk:
+            chunk['date'] = pd.to_datetime(chunk['date'])
+        yield chunk
@@ -0,0 +1,92 @@
+"""Benchmark archive Parquet: quét bảng import_export trước và sau khi chuyển lịch sử cũ ra archive.
+
+Sinh nhiều năm lịch sử trên một file SQLite tạm (archive ghi vào thư mục tạm cạnh file DB),
+đo các truy vấn quét import_export, chạy `archive.archive_movements` với horizon mặc định
+rồi đo lại. Sau đó kiểm tra toàn bộ lịch sử vẫn đọc được qua `archive.iter_movements` và
+daily_movements vẫn khớp với lịch sử:
+
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --movements 2000000 --years 6
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    db_path = bench_utils.use_scratch_sqlite("bench_archive")
+    os.environ.setdefault("WAREHOUSE_ARCHIVE_DIR", os.path.join(os.path.dirname(db_path), "archive"))
+
+from sqlalchemy import text
+
+import archive
+import summaries
+from database import get_write_engine
+from seed_data import ensure_schema, seed
+
+SCAN_EXPORTS = """
+    SELECT part_id, SUM(quantity) AS total FROM import_export
+    WHERE im_ex_flag = 0 GROUP BY part_id
+"""
+SCAN_REASONS = "SELECT reason, COUNT(*) FROM import_export GROUP BY reason"
+
+
+def scan_cases():
+    return [
+        ("scan_exports", lambda conn: conn.execute(text(SCAN_EXPORTS)).fetchall()),
+        ("scan_reasons", lambda conn: conn.execute(text(SCAN_REASONS)).fetchall()),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configured", action="store_true",
+                        help="Dùng DB và thư mục archive đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.movements:,} lượt nhập/xuất trong {args.years} năm...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements, days=args.years * 365)
+
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM import_export")).scalar()
+    before = bench_utils.measure_cases(engine, scan_cases(), args.repeat)
+
+    start = time.perf_counter()
+    moved = archive.archive_movements(engine, log=lambda message: None)
+    print(f"Đã chuyển {moved:,}/{total:,} lượt trước {archive.archive_cutoff()} sang Parquet "
+          f"trong {time.perf_counter() - start:.1f} s")
+
+    after = bench_utils.measure_cases(engine, scan_cases(), args.repeat)
+    bench_utils.print_comparison(before, after)
+
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        readable = sum(len(chunk) for chunk in archive.iter_movements(conn, ["id"]))
+        full_ms = (time.perf_counter() - start) * 1000
+        month = date.today() - timedelta(days=args.years * 365 // 2)
+        start = time.perf_counter()
+        in_month = sum(len(chunk) for chunk in archive.iter_movements(
+            conn, ["id"], archive.month_start(month), archive.next_month(month)))
+        month_ms = (time.perf_counter() - start) * 1000
+        mismatches = summaries.check_daily_movements(conn)
+
+    print(f"\nĐọc toàn bộ lịch sử qua iter_movements: {readable:,} lượt, {full_ms:.0f} ms")
+    print(f"Đọc một tháng trong archive ({month:%Y-%m}): {in_month:,} lượt, {month_ms:.1f} ms")
+    ok = readable == total and not mismatches
+    print("Lịch sử đầy đủ, daily_movements khớp." if ok else
+          f"LỖI: đọc được {readable:,}/{total:,} lượt, {len(mismatches)} ngày lệch")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
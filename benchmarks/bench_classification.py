@@ -0,0 +1,86 @@
+"""Benchmark phân loại ABC/XYZ (`classification.py`) trên dữ liệu tiêu thụ giả lập.
+
+Sinh lượng tiêu thụ theo (linh kiện, tháng) cho `--parts` linh kiện trong `--months` tháng, đo
+thời gian xếp nhóm ABC/XYZ cho mọi linh kiện một lượt và đối chiếu với cách xếp từng bước bằng
+pandas (sort, cumsum, groupby). Thoát với mã 1 nếu lệch hoặc chậm hơn `--max-ms`:
+
+    python benchmarks/bench_classification.py
+    python benchmarks/bench_classification.py --parts 200000
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import bench_utils
+
+import classification
+import reorder
+import settings
+
+
+def synthetic_usage(n_parts, months, rng):
+    """Trả về (part_ids, price, usage_ids, usage_qty): mỗi linh kiện xuất một số tháng ngẫu nhiên."""
+    part_ids = np.arange(1, n_parts + 1)
+    price = rng.lognormal(3, 1.5, n_parts).round(2)
+    used = rng.random((n_parts, months)) < rng.uniform(0, 1, n_parts)[:, None]
+    rows, _months = np.nonzero(used)
+    return part_ids, price, part_ids[rows], rng.integers(1, 50, len(rows))
+
+
+def numpy_classes(part_ids, price, usage_ids, usage_qty, months):
+    avg, std = reorder.usage_stats(part_ids, usage_ids, usage_qty, months)
+    abc = classification.abc_classes(avg * months * price, settings.CLASS_A_SHARE, settings.CLASS_B_SHARE)
+    xyz, _cv = classification.xyz_classes(avg, std, settings.CLASS_X_CV, settings.CLASS_Y_CV)
+    return abc, xyz
+
+
+def pandas_classes(part_ids, price, usage_ids, usage_qty, months):
+    usage = pd.DataFrame({'part_id': usage_ids, 'q': usage_qty.astype(float)})
+    usage['q2'] = usage['q'] ** 2
+    sums = usage.groupby('part_id')[['q', 'q2']].sum().reindex(part_ids, fill_value=0.0)
+    mean = sums['q'] / months
+    std = np.sqrt((sums['q2'] / months - mean ** 2).clip(lower=0))
+
+    value = pd.Series(sums['q'].to_numpy() * price, index=part_ids).sort_values(ascending=False, kind="stable")
+    before = (value.cumsum() - value) / value.sum()
+    abc = pd.Series("C", index=value.index)
+    abc[before < settings.CLASS_B_SHARE] = "B"
+    abc[before < settings.CLASS_A_SHARE] = "A"
+    abc[value <= 0] = "C"
+
+    cv = (std / mean).where(mean > 0)
+    xyz = pd.Series("Z", index=part_ids)
+    xyz[cv <= settings.CLASS_Y_CV] = "Y"
+    xyz[cv <= settings.CLASS_X_CV] = "X"
+    return abc.reindex(part_ids).to_numpy(), xyz.to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=50_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    data = synthetic_usage(args.parts, args.months, rng)
+    print(f"{args.parts:,} linh kiện, {len(data[2]):,} dòng tiêu thụ theo tháng trong {args.months} tháng")
+
+    numpy_ms, (abc, xyz) = bench_utils.best_of(lambda: numpy_classes(*data, args.months), args.repeat)
+    pandas_ms, (ref_abc, ref_xyz) = bench_utils.best_of(lambda: pandas_classes(*data, args.months), args.repeat)
+
+    same = (abc == ref_abc).all() and (xyz == ref_xyz).all()
+    counts = pd.crosstab(abc, xyz, rownames=['ABC'], colnames=['XYZ'])
+    print(f"  NumPy    {numpy_ms:9.2f} ms")
+    print(f"  pandas   {pandas_ms:9.2f} ms")
+    print(counts.to_string())
+    print("Kết quả khớp." if same else "LỆCH so với pandas!")
+    if not same or numpy_ms > args.max_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""So sánh dữ liệu Dashboard tính bằng pandas trên toàn bộ danh mục và bằng `load_dashboard_kpis`.
+
+Cách cũ nạp cả bảng spare_parts cùng toàn bộ chuỗi nhập/xuất theo ngày rồi tính tổng, nhóm
+theo mô tả và top 10 trong pandas; cách mới để DB tính hết trong một transaction chỉ đọc và chỉ
+trả về kết quả. In thời gian, dung lượng dữ liệu nhận về và đối chiếu các số tổng:
+
+    python benchmarks/bench_dashboard_kpis.py
+    python benchmarks/bench_dashboard_kpis.py --parts 50000 --movements 500000
+"""
+import argparse
+import sys
+from datetime import date
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_dashboard_kpis")
+
+import repository
+from database import get_write_engine, read_df
+from seed_data import ensure_schema, seed
+
+
+def _nbytes(*frames):
+    return sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+
+
+def pandas_dashboard(conn):
+    """Cách tính trước đây: mọi phép tổng hợp chạy trên DataFrame của toàn bộ danh mục."""
+    parts = repository.load_spare_parts(conn)
+    daily = read_df(conn, """
+        SELECT day AS date, im_ex_flag, SUM(quantity) AS quantity
+        FROM daily_movements GROUP BY day, im_ex_flag ORDER BY day
+    """)
+    conn.rollback()
+    value = parts['stock'] * parts['price']
+    result = {
+        "total_items": int(parts['stock'].sum()),
+        "total_value": float(value.sum()),
+        "total_import": int(daily.loc[daily['im_ex_flag'] == 1, 'quantity'].sum()),
+        "total_export": int(daily.loc[daily['im_ex_flag'] == 0, 'quantity'].sum()),
+        "stock_overview": parts.groupby('description')['stock'].sum().sort_values(ascending=False),
+        "top_value": parts.assign(total_value=value).sort_values('total_value', ascending=False).head(10),
+    }
+    return result, _nbytes(parts, daily)
+
+
+def sql_dashboard(conn, top):
+    kpis = repository.load_dashboard_kpis(conn, date.today().strftime('%Y-%m-%d'), top, ())
+    return kpis, _nbytes(kpis["stock_overview"], kpis["top_value"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=20000)
+    parser.add_argument("--movements", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=30, help="Số mô tả trong biểu đồ Stock Overview")
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.parts:,} linh kiện và {args.movements:,} lượt nhập/xuất...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+
+    with engine.connect() as conn:
+        old_ms, (old, old_bytes) = bench_utils.best_of(lambda: pandas_dashboard(conn), args.repeat)
+        new_ms, (new, new_bytes) = bench_utils.best_of(lambda: sql_dashboard(conn, args.top), args.repeat)
+
+    print(f"  pandas trên danh mục  {old_ms:9.2f} ms   nhận về {old_bytes / 1024:10.1f} KB")
+    print(f"  tổng hợp trong DB     {new_ms:9.2f} ms   nhận về {new_bytes / 1024:10.1f} KB")
+    same = all(old[key] == new[key] for key in ("total_items", "total_import", "total_export"))
+    same = same and abs(old["total_value"] - new["total_value"]) < 0.01 * max(1.0, abs(old["total_value"]))
+    overview = old["stock_overview"].head(args.top)
+    same = same and list(overview.values) == list(new["stock_overview"]["stock"])
+    same = same and list(old["top_value"]["total_value"].round(2)) == list(new["top_value"]["total_value"].round(2))
+    print("Kết quả khớp." if same else "LỆCH giữa hai cách tính!")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark chi phí xuất kho: gộp toàn bộ lịch sử mỗi lần tải trang so với khối export_costs.
+
+Sinh nhiều năm lịch sử trên một file SQLite tạm, rồi so sánh latency và EXPLAIN của cách trang
+Export Stock tính chi phí trước đây (mọi lượt xuất theo ngày và linh kiện, nhân đơn giá trong
+pandas) với `repository.load_export_cost` trên 30 ngày gần nhất theo từng chiều xem. Tổng chi
+phí của khối được đối chiếu với cách tính cũ trên cùng khoảng ngày:
+
+    python benchmarks/bench_export_costs.py
+    python benchmarks/bench_export_costs.py --movements 2000000 --years 5
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_export_costs")
+
+import repository
+from database import get_write_engine, read_df
+from seed_data import ensure_schema, seed
+
+LEGACY_EXPORT_COST = """
+    SELECT dm.export_day, dm.part_id, dm.total_qty, sp.price
+    FROM (
+        SELECT day AS export_day, part_id, SUM(quantity) AS total_qty
+        FROM daily_movements
+        WHERE im_ex_flag = 0
+        GROUP BY day, part_id
+    ) dm
+    JOIN spare_parts sp ON dm.part_id = sp.id
+    ORDER BY dm.export_day
+"""
+
+
+def legacy_cost(conn, start, end):
+    """Tổng chi phí trong [start, end] theo cách cũ: đọc cả lịch sử rồi lọc trong pandas."""
+    df = read_df(conn, LEGACY_EXPORT_COST)
+    df = df[(df['export_day'].astype(str) >= start) & (df['export_day'].astype(str) <= end)]
+    return float((df['total_qty'] * df['price']).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--days", type=int, default=30, help="Độ dài khoảng ngày của báo cáo")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.movements:,} lượt nhập/xuất trong {args.years} năm...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements, days=args.years * 365)
+
+    end = date.today().strftime('%Y-%m-%d')
+    start = (date.today() - timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    before = bench_utils.measure_cases(engine, [
+        ("cost_by_day", lambda conn: legacy_cost(conn, start, end))], args.repeat)
+    after = bench_utils.measure_cases(engine, [
+        (f"cost_by_{dimension}", lambda conn, dimension=dimension: repository.load_export_cost(
+            conn, start, end, dimension, None, None)) for dimension in repository.EXPORT_COST_DIMENSIONS
+    ], args.repeat)
+    bench_utils.print_comparison(before, after)
+    for name in after:
+        if name not in before:
+            print(f"\n■ {name}: {after[name]['ms']:.2f} ms\n   " + " | ".join(after[name]["plan"]))
+
+    with engine.connect() as conn:
+        expected = legacy_cost(conn, start, end)
+        cube = float(repository.load_export_cost(conn, start, end, "day", None, None)['cost'].sum())
+    same = abs(expected - cube) <= 1e-6 * max(1.0, abs(expected))
+    print(f"\nTổng chi phí {start} → {end}: cách cũ {expected:,.2f}, export_costs {cube:,.2f}")
+    print("Kết quả khớp." if same else "LỆCH!")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
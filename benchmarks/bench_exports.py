@@ -0,0 +1,111 @@
+"""Benchmark xuất file View Stock: dựng Excel trong BytesIO so với ghi theo từng phần (`exports.py`).
+
+Sinh một danh mục lớn trên file SQLite tạm rồi, trong từng tiến trình con, đo thời gian và mức
+tăng RSS đỉnh của:
+
+- cách cũ: nạp mọi dòng vào một DataFrame rồi `to_excel` vào BytesIO (trước đây chạy ở mỗi
+  lần rerun trang, kể cả khi không ai bấm tải);
+- cách mới: `repository.iter_stock` + `exports.WRITERS` cho xlsx, CSV và Parquet.
+
+Kiểm tra mọi file ra đủ số linh kiện:
+
+    python benchmarks/bench_exports.py
+    python benchmarks/bench_exports.py --parts 200000
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv and "--child" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_exports")
+# Trang mmap của SQLite được tính vào RSS dù chỉ là page cache của file, nên tắt khi đo
+os.environ.setdefault("WAREHOUSE_SQLITE_MMAP_SIZE", "0")
+
+MODES = ["legacy", "xlsx", "csv", "parquet"]
+
+
+def child(mode):
+    import pandas as pd
+
+    import exports
+    import repository
+
+    today = date.today().strftime('%Y-%m-%d')
+    filters = repository.StockFilters()
+    # Làm ấm cache tuổi lô / đặt hàng lại / phân loại để chỉ đo phần xuất file
+    repository.stock_page(today, filters, page_size=1)
+    before = bench_utils.peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "legacy":
+        df = pd.concat(repository.iter_stock(today, filters, "stock", True), ignore_index=True)
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='Stock')
+        rows, size = len(df), len(buffer.getvalue())
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="warehouse_bench_"), f"stock_view.{mode}")
+        rows = sum(exports.WRITERS[mode](repository.iter_stock(today, filters, "stock", True),
+                                         repository.STOCK_VIEW_COLUMNS, path))
+        size = os.path.getsize(path)
+    elapsed = time.perf_counter() - start
+    if mode != "legacy":
+        # Đếm lại số dòng trong file (ngoài phần đo thời gian)
+        read = {"xlsx": lambda: pd.read_excel(path, usecols=[0]), "csv": lambda: pd.read_csv(path, usecols=[0]),
+                "parquet": lambda: pd.read_parquet(path, columns=["material_no"])}[mode]
+        rows = min(rows, len(read()))
+    print(json.dumps({"mode": mode, "rows": rows, "mb": round(size / 2**20, 1), "seconds": round(elapsed, 2),
+                      "baseline_mb": round(before, 1), "peak_mb": round(bench_utils.peak_rss_mb(), 1)}))
+
+
+def measure(mode):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode],
+                         check=True, capture_output=True, text=True, env=os.environ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["growth_mb"] = round(result["peak_mb"] - result["baseline_mb"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=100_000)
+    parser.add_argument("--movements", type=int, default=200_000)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    import repository
+    from database import get_write_engine
+    from seed_data import ensure_schema, seed
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.parts:,} linh kiện, {args.movements:,} lượt nhập/xuất...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+    with engine.connect() as conn:
+        total = repository.load_stock_summary(conn, date.today().strftime('%Y-%m-%d'),
+                                              repository.StockFilters(), (), ())['count']
+
+    ok = True
+    print(f"\n{'cách':<8} {'dòng':>9} {'file':>8} {'thời gian':>10} {'RSS đỉnh':>10} {'tăng':>9}")
+    for mode in MODES:
+        result = measure(mode)
+        ok &= result["rows"] == total
+        print(f"{mode:<8} {result['rows']:>9,} {result['mb']:>5.1f} MB {result['seconds']:>8.2f} s "
+              f"{result['peak_mb']:>7.0f} MB {result['growth_mb']:>6.1f} MB")
+    print(f"\nMọi file đủ {total:,} linh kiện." if ok else "\nLỖI: file thiếu dòng.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""So sánh thời gian tải dữ liệu của trang khi chạy truy vấn tuần tự và qua query_executor.
+
+Cache truy vấn được xóa trước mỗi lần đo để mọi truy vấn đều chạy xuống DB:
+
+    python benchmarks/bench_fanout.py
+    python benchmarks/bench_fanout.py --seed --movements 500000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import bench_utils  # noqa: F401  (thêm thư mục gốc vào sys.path)
+
+import query_executor
+import repository
+import settings
+from database import get_write_engine
+from seed_data import ensure_schema, seed
+
+
+def page_loads(day):
+    return {
+        "dashboard": [
+            repository.dashboard_kpis,
+            lambda: repository.movement_history(date.today() - timedelta(days=89), date.today()),
+        ],
+        "import_stock": [repository.spare_parts, repository.machine_types, repository.employees],
+        "export_stock": [
+            repository.spare_parts,
+            repository.employees,
+            repository.machine_positions,
+            lambda: repository.export_stats(day),
+            lambda: repository.export_cost(date.today() - timedelta(days=29), date.today()),
+        ],
+        "consumption": [lambda: repository.consumption_rollup(date.today() - timedelta(days=89), date.today())],
+    }
+
+
+def _timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        repository._cached_query.clear()
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Sinh dữ liệu giả lập trước khi đo")
+    parser.add_argument("--parts", type=int, default=2000)
+    parser.add_argument("--movements", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if args.seed:
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+    day = time.strftime('%Y-%m-%d')
+
+    print(f"Backend: {engine.dialect.name}, {settings.QUERY_WORKERS} luồng")
+    for page, calls in page_loads(day).items():
+        sequential = _timed(lambda: [fn() for fn in calls], args.repeat)
+        concurrent = _timed(lambda: query_executor.gather(*calls), args.repeat)
+        slowest = max(_timed(fn, args.repeat) for fn in calls)
+        print(f"  {page:<14} tuần tự {sequential:9.2f} ms   song song {concurrent:9.2f} ms"
+              f"   truy vấn chậm nhất {slowest:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark migration index (001): EXPLAIN và latency của từng truy vấn trang trước/sau.
+
+Mặc định chạy trên một file SQLite tạm với 1 triệu lượt nhập/xuất:
+
+    python benchmarks/bench_indexes.py
+    python benchmarks/bench_indexes.py --movements 200000 --output index_bench.json
+
+Dùng --configured để chạy trên DB đang cấu hình (phải là DB trống dùng riêng cho benchmark).
+"""
+import argparse
+import sys
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_indexes")
+
+from sqlalchemy import text
+
+import migrations
+import repository
+from database import get_write_engine
+from seed_data import ensure_schema, seed
+
+# Các truy vấn trên import_export mà migration 001 nhắm tới (từ migration 003 các trang
+# đọc số liệu theo ngày từ daily_movements), kèm dạng DATE(date) = :day cũ để so sánh
+MOVEMENT_TOTAL = "SELECT SUM(quantity) FROM import_export WHERE im_ex_flag = :flag"
+MOVEMENT_HISTORY = "SELECT date, quantity FROM import_export WHERE im_ex_flag = :flag"
+LEGACY_EXPORT_STATS = """
+    SELECT ie.date, ie.part_id, sp.material_no, sp.description, SUM(ie.quantity) AS total_quantity
+    FROM import_export ie
+    JOIN spare_parts sp ON ie.part_id = sp.id
+    WHERE DATE(ie.date) = :day
+    GROUP BY ie.date, ie.part_id, sp.material_no, sp.description
+"""
+EXPORT_STATS = """
+    SELECT ie.date, ie.part_id, sp.material_no, sp.description, SUM(ie.quantity) AS total_quantity
+    FROM import_export ie
+    JOIN spare_parts sp ON ie.part_id = sp.id
+    WHERE ie.im_ex_flag = 0 AND ie.date >= :start AND ie.date < :end
+    GROUP BY ie.date, ie.part_id, sp.material_no, sp.description
+"""
+LEGACY_IMPORT_STATS = """
+    SELECT DATE(ie.date) AS import_date, sp.material_no, SUM(ie.quantity) AS total_quantity_imported
+    FROM import_export ie
+    JOIN spare_parts sp ON ie.part_id = sp.id
+    WHERE ie.im_ex_flag = 1
+    GROUP BY DATE(ie.date), sp.material_no
+"""
+IMPORT_STATS = """
+    SELECT ie.import_date, sp.material_no, ie.total_quantity_imported
+    FROM (
+        SELECT DATE(date) AS import_date, part_id, SUM(quantity) AS total_quantity_imported
+        FROM import_export
+        WHERE im_ex_flag = 1 AND date >= :start AND date < :end
+        GROUP BY DATE(date), part_id
+    ) ie
+    JOIN spare_parts sp ON ie.part_id = sp.id
+"""
+
+
+def _query(sql, params=None):
+    return lambda conn: conn.execute(text(sql), params or {}).fetchall()
+
+
+def page_cases(day):
+    start, end = repository.day_bounds(day)
+    bounds = {"start": start, "end": end}
+    return [
+        ("dashboard: tổng nhập", _query(MOVEMENT_TOTAL, {"flag": 1})),
+        ("dashboard: lịch sử xuất", _query(MOVEMENT_HISTORY, {"flag": 0})),
+        ("export_stock: export_stats (DATE() = :day, cũ)", _query(LEGACY_EXPORT_STATS, {"day": day})),
+        ("export_stock: export_stats (khoảng ngày)", _query(EXPORT_STATS, bounds)),
+        ("import_stock: import_stats (toàn bộ lịch sử, cũ)", _query(LEGACY_IMPORT_STATS)),
+        ("import_stock: import_stats (khoảng ngày)", _query(IMPORT_STATS, bounds)),
+        ("export_stock: cập nhật tồn kho theo material_no",
+         _query("SELECT stock FROM spare_parts WHERE material_no = :m", {"m": "SP000042"})),
+        ("employees: kiểm tra trùng amann_id",
+         _query("SELECT COUNT(*) FROM employees WHERE amann_id = :a", {"a": "E0007"})),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--target", type=int, default=1, help="Chạy migration đến phiên bản này")
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình thay cho SQLite tạm")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    print(f"Backend: {engine.dialect.name}, sinh {args.movements:,} lượt nhập/xuất...")
+    ensure_schema(engine, migrate=False)
+    seed(engine, args.parts, args.movements)
+
+    with engine.connect() as conn:
+        day = conn.execute(text("SELECT MAX(DATE(date)) FROM import_export")).scalar()
+    cases = page_cases(str(day)[:10])
+
+    before = bench_utils.measure_cases(engine, cases, args.repeat)
+    migrations.upgrade(engine, target=args.target)
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+        else:
+            conn.exec_driver_sql("ANALYZE TABLE import_export, spare_parts, employees")
+    after = bench_utils.measure_cases(engine, cases, args.repeat)
+
+    bench_utils.print_comparison(before, after)
+    if args.output:
+        bench_utils.write_json(args.output, {"backend": engine.dialect.name, "movements": args.movements,
+                                             "before": before, "after": after})
+
+
+if __name__ == "__main__":
+    main()
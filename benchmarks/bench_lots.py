@@ -0,0 +1,108 @@
+"""Benchmark lô tồn kho FIFO (`lots.py`).
+
+Sinh lịch sử trên một file SQLite tạm rồi đo:
+- thời gian tính lại toàn bộ stock_lots từ lịch sử nhập (`rebuild_lots`) và kiểm tra tổng lô
+  khớp tồn kho, lô còn lại đúng là các lượt nhập mới nhất;
+- thời gian ghi thêm một lượt nhập/xuất qua `record_movement` (cập nhật lô trong cùng transaction);
+- cảnh báo tồn kho trên 40 ngày: lọc trên toàn bộ danh mục như trước so với `count_aged_parts`
+  (range scan trên index received_at):
+
+    python benchmarks/bench_lots.py
+    python benchmarks/bench_lots.py --parts 20000 --movements 1000000
+"""
+import argparse
+import random
+import sys
+import time
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_lots")
+
+import pandas as pd
+from sqlalchemy import text
+
+import lots
+from database import get_write_engine, read_df
+from movements import EXPORT, IMPORT, record_movement
+from seed_data import ensure_schema, seed
+
+# Cách View Stock tính trước đây: đọc cả danh mục rồi lọc storage_days > 40 trong pandas
+FULL_FRAME = "SELECT id, stock, import_date, export_date FROM spare_parts"
+
+
+def full_frame_count(conn, days):
+    df = read_df(conn, FULL_FRAME)
+    today = pd.Timestamp.today().normalize()
+    exported = pd.to_datetime(df['export_date']).dt.normalize().fillna(today)
+    storage_days = (exported - pd.to_datetime(df['import_date']).dt.normalize()).dt.days
+    return int((storage_days > days).sum())
+
+
+def check_lots(conn):
+    """Danh sách lỗi: tổng lô khác tồn kho, hoặc lô đã bị trừ một phần không phải lô nhập cũ nhất còn lại."""
+    lot_rows = read_df(conn, "SELECT part_id, receipt_id, received_at, quantity, remaining FROM stock_lots")
+    stock = read_df(conn, "SELECT id AS part_id, stock FROM spare_parts WHERE stock > 0").set_index('part_id')['stock']
+    totals = lot_rows.groupby('part_id')['remaining'].sum().reindex(stock.index, fill_value=0)
+    errors = [f"part {p}: lô {t} ≠ tồn kho {s}" for p, t, s in zip(stock.index, totals, stock) if t != s]
+    receipts = lot_rows.dropna(subset=['receipt_id']).sort_values(['part_id', 'received_at', 'receipt_id'])
+    partial = receipts[receipts['remaining'] < receipts['quantity']]
+    first = receipts.groupby('part_id').head(1)
+    errors += [f"part {p}: lô {r} bị trừ dở nhưng không phải lô cũ nhất"
+               for p, r in zip(partial['part_id'], partial['receipt_id']) if r not in set(first['receipt_id'])]
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=300_000)
+    parser.add_argument("--posts", type=int, default=500, help="Số lượt ghi thêm qua record_movement")
+    parser.add_argument("--days", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.parts:,} linh kiện, {args.movements:,} lượt nhập/xuất...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+
+    with engine.begin() as conn:
+        start = time.perf_counter()
+        count = lots.rebuild_lots(conn)
+        print(f"rebuild_lots: {count:,} lô trong {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rnd = random.Random(7)
+    part_ids = [row[0] for row in engine.connect().execute(text("SELECT id FROM spare_parts")).fetchall()]
+    start = time.perf_counter()
+    for _ in range(args.posts):
+        part_id, quantity, flag = rnd.choice(part_ids), rnd.randint(1, 20), rnd.choice((IMPORT, EXPORT))
+        with engine.begin() as conn:
+            stock = conn.execute(text("SELECT stock FROM spare_parts WHERE id = :id"), {"id": part_id}).scalar()
+            quantity = quantity if flag == IMPORT else min(quantity, stock)
+            if quantity <= 0:
+                continue
+            conn.execute(text("UPDATE spare_parts SET stock = stock + :d WHERE id = :id"),
+                         {"d": quantity if flag == IMPORT else -quantity, "id": part_id})
+            record_movement(conn, part_id, quantity, flag, "E0001", "Nhập kho" if flag == IMPORT else "Sản xuất")
+    print(f"record_movement: {(time.perf_counter() - start) * 1000 / args.posts:.2f} ms/lượt ({args.posts} lượt)")
+
+    before = bench_utils.measure_cases(engine, [
+        ("aged_parts", lambda conn: full_frame_count(conn, args.days))], args.repeat)
+    after = bench_utils.measure_cases(engine, [
+        ("aged_parts", lambda conn: lots.count_aged_parts(conn, args.days))], args.repeat)
+    bench_utils.print_comparison(before, after)
+
+    with engine.connect() as conn:
+        errors = check_lots(conn)
+    for error in errors[:10]:
+        print("  " + error)
+    print("Lô FIFO khớp tồn kho." if not errors else f"LỖI: {len(errors)} linh kiện lệch.")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
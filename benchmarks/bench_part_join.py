@@ -0,0 +1,108 @@
+"""Benchmark migration 002: join import_export với spare_parts theo material_no (cũ) và theo id.
+
+Sinh dữ liệu với part_id là material_no như các trang trước đây, đo các truy vấn join,
+chạy migration 002 để chuyển sang spare_parts.id rồi đo lại cùng các truy vấn join theo id:
+
+    python benchmarks/bench_part_join.py
+    python benchmarks/bench_part_join.py --movements 200000 --output part_join.json
+"""
+import argparse
+import sys
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_part_join")
+
+from sqlalchemy import text
+
+import migrations
+import repository
+from database import get_write_engine
+from seed_data import ensure_schema, seed
+
+LEGACY_EXPORT_COST = """
+    SELECT DATE(ie.date) AS export_day, ie.part_id, SUM(ie.quantity) AS total_qty, sp.price
+    FROM import_export ie
+    JOIN spare_parts sp ON ie.part_id = sp.material_no
+    WHERE ie.im_ex_flag = 0
+    GROUP BY export_day, ie.part_id, sp.price
+    ORDER BY export_day
+"""
+LEGACY_EXPORT_STATS = """
+    SELECT ie.date, ie.part_id, sp.material_no, sp.description, SUM(ie.quantity) AS total_quantity
+    FROM import_export ie
+    JOIN spare_parts sp ON ie.part_id = sp.material_no
+    WHERE ie.im_ex_flag = 0 AND ie.date >= :start AND ie.date < :end
+    GROUP BY ie.date, ie.part_id, sp.material_no, sp.description
+"""
+LEGACY_IMPORT_STATS = """
+    SELECT ie.import_date, sp.material_no, ie.total_quantity_imported
+    FROM (
+        SELECT DATE(date) AS import_date, part_id, SUM(quantity) AS total_quantity_imported
+        FROM import_export
+        WHERE im_ex_flag = 1 AND date >= :start AND date < :end
+        GROUP BY DATE(date), part_id
+    ) ie
+    JOIN spare_parts sp ON ie.part_id = sp.material_no
+"""
+
+
+def legacy_cases(day):
+    start, end = repository.day_bounds(day)
+    bounds = {"start": start, "end": end}
+    return [
+        ("export_cost", lambda conn: conn.execute(text(LEGACY_EXPORT_COST)).fetchall()),
+        ("export_stats", lambda conn: conn.execute(text(LEGACY_EXPORT_STATS), bounds).fetchall()),
+        ("import_stats", lambda conn: conn.execute(text(LEGACY_IMPORT_STATS), bounds).fetchall()),
+    ]
+
+
+def current_cases(day):
+    # Cùng các truy vấn nhưng join theo khóa số nguyên sau migration 002
+    start, end = repository.day_bounds(day)
+    bounds = {"start": start, "end": end}
+    return [
+        (name, lambda conn, sql=sql, params=params: conn.execute(text(_by_id(sql)), params).fetchall())
+        for name, sql, params in (
+            ("export_cost", LEGACY_EXPORT_COST, {}),
+            ("export_stats", LEGACY_EXPORT_STATS, bounds),
+            ("import_stats", LEGACY_IMPORT_STATS, bounds),
+        )
+    ]
+
+
+def _by_id(sql):
+    return sql.replace("ON ie.part_id = sp.material_no", "ON ie.part_id = sp.id")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình thay cho SQLite tạm")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    print(f"Backend: {engine.dialect.name}, sinh {args.movements:,} lượt nhập/xuất (part_id = material_no)...")
+    ensure_schema(engine, migrate=False)
+    seed(engine, args.parts, args.movements, legacy_part_keys=True)
+    migrations.upgrade(engine, target=1)
+
+    with engine.connect() as conn:
+        day = str(conn.execute(text("SELECT MAX(DATE(date)) FROM import_export")).scalar())[:10]
+
+    before = bench_utils.measure_cases(engine, legacy_cases(day), args.repeat)
+    migrations.upgrade(engine, target=2)
+    after = bench_utils.measure_cases(engine, current_cases(day), args.repeat)
+
+    bench_utils.print_comparison(before, after)
+    if args.output:
+        bench_utils.write_json(args.output, {"backend": engine.dialect.name, "movements": args.movements,
+                                             "before": before, "after": after})
+
+
+if __name__ == "__main__":
+    main()
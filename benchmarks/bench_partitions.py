@@ -0,0 +1,110 @@
+"""Benchmark partition theo tháng của import_export (chỉ MySQL).
+
+Chép import_export của DB đang cấu hình sang hai bảng tạm, một bảng giữ nguyên và một bảng chia
+partition như migration 006, rồi so sánh latency và EXPLAIN (cột partitions) của các truy vấn
+lọc theo khoảng ngày, cùng thời gian bỏ dữ liệu của một tháng cũ (DELETE so với TRUNCATE
+PARTITION). Hai bảng tạm được xóa khi chạy xong:
+
+    python benchmarks/bench_partitions.py
+    python benchmarks/bench_partitions.py --seed --movements 2000000 --years 3
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+import bench_utils  # noqa: F401  (thêm thư mục gốc vào sys.path)
+
+from sqlalchemy import text
+
+import partitions
+from archive import month_start, next_month
+from database import get_write_engine
+from seed_data import ensure_schema, seed
+
+PLAIN, PARTITIONED = "bench_ie_plain", "bench_ie_partitioned"
+
+MONTH_TOTALS = """
+    SELECT part_id, SUM(quantity) FROM {table}
+    WHERE im_ex_flag = 0 AND date >= :start AND date < :end
+    GROUP BY part_id
+"""
+DAY_ROWS = "SELECT id, part_id, quantity, reason FROM {table} WHERE date >= :day AND date < :next_day"
+MONTH_COUNT = "SELECT COUNT(*) FROM {table} WHERE date >= :start AND date < :end"
+
+
+def copy_table(conn, name):
+    conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    conn.execute(text(f"CREATE TABLE {name} LIKE import_export"))
+    if partitions.is_partitioned(conn, name):
+        conn.execute(text(f"ALTER TABLE {name} REMOVE PARTITIONING"))
+    conn.execute(text(f"INSERT INTO {name} SELECT * FROM import_export"))
+    conn.commit()
+
+
+def cases(table, month, day):
+    bounds = {"start": month.strftime('%Y-%m-%d'), "end": next_month(month).strftime('%Y-%m-%d')}
+    one_day = {"day": day.strftime('%Y-%m-%d'), "next_day": (day + timedelta(days=1)).strftime('%Y-%m-%d')}
+    return [
+        ("month_totals", lambda conn: conn.execute(text(MONTH_TOTALS.format(table=table)), bounds).fetchall()),
+        ("day_rows", lambda conn: conn.execute(text(DAY_ROWS.format(table=table)), one_day).fetchall()),
+        ("month_count", lambda conn: conn.execute(text(MONTH_COUNT.format(table=table)), bounds).fetchall()),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Sinh dữ liệu giả lập trước khi đo (chỉ dùng với DB thử nghiệm)")
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if engine.dialect.name != "mysql":
+        print("Benchmark này cần MySQL (SQLite không có partition); cấu hình WAREHOUSE_DB_URL rồi chạy lại.")
+        sys.exit(2)
+    if args.seed:
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements, days=args.years * 365)
+
+    with engine.connect() as conn:
+        print("Chép import_export sang hai bảng tạm...")
+        copy_table(conn, PLAIN)
+        copy_table(conn, PARTITIONED)
+        created = partitions.partition_table(conn, PARTITIONED)
+        print(f"  {PARTITIONED}: {created} partition theo tháng")
+
+    # Một tháng và một ngày ở giữa lịch sử
+    month = month_start(date.today() - timedelta(days=args.years * 365 // 2))
+    day = month + timedelta(days=14)
+    try:
+        before = bench_utils.measure_cases(engine, cases(PLAIN, month, day), args.repeat)
+        after = bench_utils.measure_cases(engine, cases(PARTITIONED, month, day), args.repeat)
+        bench_utils.print_comparison(before, after)
+
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            deleted = conn.execute(text(f"DELETE FROM {PLAIN} WHERE date >= :start AND date < :end"), {
+                "start": month.strftime('%Y-%m-%d'), "end": next_month(month).strftime('%Y-%m-%d')}).rowcount
+            conn.commit()
+            delete_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            conn.execute(text(f"ALTER TABLE {PARTITIONED} TRUNCATE PARTITION {partitions.partition_name(month)}"))
+            truncate_ms = (time.perf_counter() - start) * 1000
+        print(f"\n■ bỏ tháng {month:%Y-%m} ({deleted} dòng): DELETE {delete_ms:.2f} ms → "
+              f"TRUNCATE PARTITION {truncate_ms:.2f} ms")
+    finally:
+        with engine.connect() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {PLAIN}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {PARTITIONED}"))
+
+    if args.output:
+        bench_utils.write_json(args.output, {"movements": args.movements, "before": before, "after": after,
+                                             "delete_month_ms": delete_ms, "truncate_partition_ms": truncate_ms})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark engine điểm đặt hàng lại (`reorder.py`) trên dữ liệu tiêu thụ giả lập.
+
+Sinh lượng tiêu thụ theo (linh kiện, ngày) cho `--parts` linh kiện trong `--window` ngày, đo
+thời gian tính tốc độ tiêu thụ, độ lệch chuẩn, điểm đặt hàng lại và số ngày còn đủ dùng cho mọi
+linh kiện, rồi đối chiếu với cách tính bằng pandas groupby. Thoát với mã 1 nếu lệch hoặc
+chậm hơn `--max-ms`:
+
+    python benchmarks/bench_reorder.py
+    python benchmarks/bench_reorder.py --parts 100000 --active 0.5
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import bench_utils
+
+import reorder
+
+
+def synthetic_usage(n_parts, window, active, rng):
+    """Mỗi linh kiện có xác suất xuất trong ngày khác nhau; trả về (part_ids, usage_ids, usage_qty, stock)."""
+    part_ids = rng.permutation(np.arange(1, n_parts + 1))
+    rate = rng.uniform(0, active, n_parts)
+    used = rng.random((n_parts, window)) < rate[:, None]
+    rows, _days = np.nonzero(used)
+    qty = rng.integers(1, 20, len(rows))
+    stock = rng.integers(0, 300, n_parts)
+    return part_ids, part_ids[rows], qty, stock
+
+
+def pandas_reference(part_ids, usage_ids, usage_qty, window):
+    q = usage_qty.astype(float)
+    usage = pd.DataFrame({'part_id': usage_ids, 'total': q, 'total_sq': q * q})
+    grouped = usage.groupby('part_id')[['total', 'total_sq']].sum()
+    grouped = grouped.reindex(part_ids, fill_value=0.0)
+    avg = grouped['total'].to_numpy() / window
+    std = np.sqrt(np.maximum(grouped['total_sq'].to_numpy() / window - avg * avg, 0.0))
+    return avg, std
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=50_000)
+    parser.add_argument("--window", type=int, default=90)
+    parser.add_argument("--active", type=float, default=0.3, help="Xác suất xuất trong ngày lớn nhất")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    part_ids, usage_ids, usage_qty, stock = synthetic_usage(args.parts, args.window, args.active, rng)
+    safety = rng.integers(0, 30, args.parts)
+    print(f"{args.parts:,} linh kiện, {len(usage_ids):,} dòng tiêu thụ theo ngày trong {args.window} ngày")
+
+    def engine():
+        avg, std = reorder.usage_stats(part_ids, usage_ids, usage_qty, args.window)
+        point = reorder.reorder_point(avg, std, safety, 14, 1.65)
+        return avg, std, reorder.days_of_cover(stock, avg), reorder.reorder_now(stock, point)
+
+    engine_ms, (avg, std, _cover, flags) = bench_utils.best_of(engine, args.repeat)
+    pandas_ms, (ref_avg, ref_std) = bench_utils.best_of(
+        lambda: pandas_reference(part_ids, usage_ids, usage_qty, args.window), args.repeat)
+
+    same = np.allclose(avg, ref_avg) and np.allclose(std, ref_std)
+    print(f"  NumPy engine   {engine_ms:9.2f} ms   ({int(flags.sum()):,} linh kiện cần đặt hàng)")
+    print(f"  pandas groupby {pandas_ms:9.2f} ms   (chỉ avg/std)")
+    print("Kết quả khớp." if same else "LỆCH so với pandas!")
+    if not same or engine_ms > args.max_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
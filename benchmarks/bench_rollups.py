@@ -0,0 +1,106 @@
+"""Benchmark tiêu hao theo bộ phận → nhóm máy → máy → vị trí máy (`repository.load_consumption_rollup`).
+
+Sinh lịch sử trên một file SQLite tạm rồi đo thời gian tính cây tiêu hao trên các khoảng ngày
+khác nhau, so với cách gộp thẳng từ import_export (JOIN vị trí máy, máy, nhóm máy, bộ phận và
+đơn giá) rồi ROLLUP cùng cách. Kiểm tra tổng từng cấp khớp nhau và khớp cách tính trực tiếp:
+
+    python benchmarks/bench_rollups.py
+    python benchmarks/bench_rollups.py --movements 2000000
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_rollups")
+
+import rollups
+import repository
+from database import get_write_engine, read_df
+from seed_data import ensure_schema, seed
+
+# Gộp trực tiếp từ import_export theo vị trí máy (đơn giá hiện tại, giống lúc backfill export_costs)
+DIRECT_POSITIONS = """
+    SELECT COALESCE(m.dept_id, 0) AS dept_id, d.mc_of_dept AS dept, COALESCE(m.group_mc_id, 0) AS group_id,
+           g.mc_name AS machine_group, COALESCE(mp.mc_id, 0) AS machine_id, m.name AS machine,
+           COALESCE(ie.mc_pos_id, 0) AS mc_pos_id, mp.mc_pos,
+           SUM(ie.quantity) AS quantity, SUM(ie.quantity * sp.price) AS cost, COUNT(*) AS movements
+    FROM import_export ie
+    JOIN spare_parts sp ON sp.id = ie.part_id
+    LEFT JOIN machine_pos mp ON mp.id = ie.mc_pos_id
+    LEFT JOIN machine m ON m.id = mp.mc_id
+    LEFT JOIN group_mc g ON g.id = m.group_mc_id
+    LEFT JOIN dept d ON d.id = m.dept_id
+    WHERE ie.im_ex_flag = 0 AND ie.date >= :start AND ie.date < :end
+    GROUP BY COALESCE(m.dept_id, 0), d.mc_of_dept, COALESCE(m.group_mc_id, 0), g.mc_name,
+             COALESCE(mp.mc_id, 0), m.name, COALESCE(ie.mc_pos_id, 0), mp.mc_pos
+"""
+
+
+def direct_rollup(conn, start, end):
+    end = (date.fromisoformat(end) + timedelta(days=1)).strftime('%Y-%m-%d')
+    positions = read_df(conn, DIRECT_POSITIONS, {"start": start, "end": end})
+    return rollups.rollup(positions, rollups.CONSUMPTION_LEVELS, rollups.CONSUMPTION_MEASURES)
+
+
+def check(table, expected):
+    """Danh sách lỗi: tổng các nút con khác dòng tổng của nút cha, hoặc khác cách tính trực tiếp."""
+    errors = []
+    keys = [key for key, _ in rollups.CONSUMPTION_LEVELS]
+    for depth in range(len(keys)):
+        parents = table[table['level'] == depth].set_index(keys[:depth] or ['level'])['cost']
+        sums = table[table['level'] == depth + 1].groupby(keys[:depth] or ['level'])['cost'].sum()
+        if depth == 0:
+            sums.index = parents.index
+        diff = (parents - sums.reindex(parents.index, fill_value=0)).abs()
+        errors += [f"cấp {depth}: {index} lệch {value:.2f}" for index, value in diff[diff > 1e-6 * parents.abs().max()].items()]
+    leaves = table[table['level'] == len(keys)].set_index(keys)[['quantity', 'cost']]
+    direct = expected[expected['level'] == len(keys)].set_index(keys)[['quantity', 'cost']]
+    joined = leaves.join(direct, how="outer", rsuffix="_direct").fillna(0)
+    bad = joined[((joined['quantity'] - joined['quantity_direct']).abs() > 0)
+                 | ((joined['cost'] - joined['cost_direct']).abs() > 1e-6 * max(1.0, joined['cost'].abs().max()))]
+    errors += [f"vị trí {index}: {row['quantity']:.0f}/{row['cost']:.2f} ≠ {row['quantity_direct']:.0f}/{row['cost_direct']:.2f}"
+               for index, row in bad.iterrows()]
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.parts:,} linh kiện, {args.movements:,} lượt nhập/xuất...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+
+    today = date.today()
+    ranges = {f"{days}d": ((today - timedelta(days=days - 1)).strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
+              for days in (30, 90, 365, 730)}
+    before = bench_utils.measure_cases(engine, [
+        (name, lambda conn, start=start, end=end: direct_rollup(conn, start, end))
+        for name, (start, end) in ranges.items()], args.repeat)
+    after = bench_utils.measure_cases(engine, [
+        (name, lambda conn, start=start, end=end: repository.load_consumption_rollup(conn, start, end))
+        for name, (start, end) in ranges.items()], args.repeat)
+    bench_utils.print_comparison(before, after)
+
+    errors = []
+    with engine.connect() as conn:
+        for name, (start, end) in ranges.items():
+            errors += [f"{name} {error}" for error in check(repository.load_consumption_rollup(conn, start, end),
+                                                            direct_rollup(conn, start, end))]
+    for error in errors[:10]:
+        print("  " + error)
+    print("\nCây tiêu hao khớp cách tính trực tiếp." if not errors else f"\nLỖI: {len(errors)} nút lệch.")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
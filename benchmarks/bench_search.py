@@ -0,0 +1,69 @@
+"""Benchmark tìm kiếm linh kiện: `str.contains` trên 5 cột so với chỉ mục trigram (`search.TrigramIndex`).
+
+Sinh một danh mục lớn trên file SQLite tạm, đo thời gian dựng chỉ mục (chỉ xảy ra khi danh
+mục đổi) rồi so thời gian một lần gõ từ khóa giữa cách View Stock lọc trước đây (5 lượt
+`astype(str).str.lower().str.contains`) và tra chỉ mục. Kiểm tra hai cách ra cùng tập linh
+kiện với các từ khóa một từ, không dấu:
+
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --parts 300000
+"""
+import argparse
+import sys
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_search")
+
+import search
+from database import get_write_engine, read_df
+from seed_data import ensure_schema, seed
+
+# Mã đầy đủ, đầu mã, một phần mã, từ trong mô tả, cost center, bin, không khớp
+QUERIES = ["SP000123", "sp0012", "0012", "bearing", "cc007", "a17", "xyz"]
+
+
+def contains_filter(df, keyword):
+    """Cách View Stock lọc trước đây."""
+    keyword = keyword.lower()
+    text_match = df[list(search.FIELDS)].apply(
+        lambda column: column.astype(str).str.lower().str.contains(keyword, na=False, regex=False)).any(axis=1)
+    return df[text_match]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.parts:,} linh kiện...")
+        ensure_schema(engine)
+        seed(engine, args.parts, 1000)
+
+    with engine.connect() as conn:
+        build_ms, index = bench_utils.best_of(lambda: search.load_index(conn), 1)
+        catalog = read_df(conn, f"SELECT id, {', '.join(search.FIELDS)} FROM spare_parts")
+    print(f"Dựng chỉ mục {len(index):,} linh kiện, {len(index.grams):,} trigram: {build_ms:,.0f} ms")
+
+    mismatches = []
+    print(f"\n{'từ khóa':<10} {'kết quả':>8} {'str.contains':>13} {'chỉ mục':>9}")
+    for query in QUERIES:
+        before_ms, expected = bench_utils.best_of(lambda: contains_filter(catalog, query), args.repeat)
+        after_ms, found = bench_utils.best_of(lambda: index.search(query), args.repeat)
+        print(f"{query:<10} {len(found):>8,} {before_ms:>10.1f} ms {after_ms:>6.1f} ms")
+        if set(found) != set(expected['id']):
+            mismatches.append(query)
+
+    top = index.search("sp0012", 3)
+    print(f"\nXếp hạng 'sp0012': {catalog.set_index('id').loc[top, 'material_no'].tolist()}")
+    print("Kết quả khớp str.contains." if not mismatches else f"LỆCH với: {', '.join(mismatches)}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark tồn kho tại một ngày: snapshot gần nhất + daily_movements so với đọc lại toàn bộ lịch sử.
+
+Sinh nhiều năm lịch sử trên một file SQLite tạm, ghi snapshot cuối mỗi tháng, rồi với một số
+ngày trong quá khứ đo `stock_history.stock_as_of` và cách đọc lại toàn bộ import_export sau
+ngày đó. Kết quả hai cách được đối chiếu với nhau:
+
+    python benchmarks/bench_stock_as_of.py
+    python benchmarks/bench_stock_as_of.py --movements 500000 --years 3
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_stock_as_of")
+
+import pandas as pd
+
+import stock_history
+from database import get_write_engine, read_df
+from seed_data import ensure_schema, seed
+
+FULL_REPLAY = """
+    SELECT sp.id AS part_id, COALESCE(sp.stock, 0) - COALESCE(d.delta, 0) AS stock
+    FROM spare_parts sp
+    LEFT JOIN (
+        SELECT part_id, SUM(CASE WHEN im_ex_flag = 1 THEN quantity
+                                 WHEN reason = 'FOC' THEN 0
+                                 ELSE -quantity END) AS delta
+        FROM import_export
+        WHERE date >= :after
+        GROUP BY part_id
+    ) d ON d.part_id = sp.id
+"""
+
+
+def month_ends(start, end):
+    day = date(start.year, start.month, 1)
+    while True:
+        next_month = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        if next_month - timedelta(days=1) >= end:
+            return
+        yield next_month - timedelta(days=1)
+        day = next_month
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=2_000_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configured", action="store_true",
+                        help="Dùng DB đang cấu hình (đã có dữ liệu và snapshot, không sinh thêm)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    today = date.today()
+    if not args.configured:
+        print(f"Sinh {args.movements:,} lượt nhập/xuất trong {args.years} năm...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements, days=args.years * 365)
+        with engine.begin() as conn:
+            ends = list(month_ends(today - timedelta(days=args.years * 365), today))
+            for day in ends:
+                stock_history.take_snapshot(conn, day)
+        print(f"Đã ghi {len(ends)} snapshot cuối tháng.")
+
+    offsets = [3, 45, 200, 400, args.years * 365 - 30]
+    with engine.connect() as conn:
+        for offset in offsets:
+            day = today - timedelta(days=offset)
+            anchor = stock_history.nearest_anchor(conn, day)
+            fast_ms, fast = bench_utils.best_of(lambda: stock_history.stock_as_of(conn, day), args.repeat)
+            after = (day + timedelta(days=1)).strftime('%Y-%m-%d')
+            slow_ms, slow = bench_utils.best_of(lambda: read_df(conn, FULL_REPLAY, {"after": after}), args.repeat)
+            merged = pd.merge(fast, slow, on="part_id", suffixes=("_fast", "_full"))
+            same = bool((merged["stock_fast"] == merged["stock_full"]).all())
+            conn.rollback()
+            print(f"  {day}  mốc {anchor[0]:<8} {str(anchor[1] or ''):<10}  as-of {fast_ms:8.2f} ms"
+                  f"   đọc lại lịch sử {slow_ms:9.2f} ms   {'khớp' if same else 'LỆCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark lưới View Stock: gửi cả danh mục cho AgGrid so với chỉ một trang (`repository.load_stock_page`).
+
+Sinh một danh mục lớn trên file SQLite tạm rồi so sánh thời gian tải và kích thước dữ liệu
+gửi xuống trình duyệt (JSON của DataFrame) giữa cách cũ (toàn bộ danh mục) và một trang 50
+dòng. Trang sâu được đo cả với keyset (`after`) lẫn LIMIT/OFFSET để thấy keyset không chậm
+dần theo số trang. Bộ lọc sidebar được đo khi lọc bằng pandas trên cả danh mục và khi ghép
+thành WHERE ... LIMIT. Kiểm tra duyệt hết các trang ra đúng số linh kiện, không trùng, và
+bộ lọc SQL ra cùng tập linh kiện với pandas:
+
+    python benchmarks/bench_stock_grid.py
+    python benchmarks/bench_stock_grid.py --parts 200000
+"""
+import argparse
+import sys
+from datetime import date
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_stock_grid")
+
+import repository
+import search
+from database import get_write_engine, read_df
+from seed_data import ensure_schema, seed
+
+FULL_CATALOG = """
+    SELECT sp.id, sp.material_no, sp.part_no, sp.description, mt.machine AS machine_type, sp.bin,
+           sp.cost_center, sp.price, sp.stock, sp.safety_stock, sp.safety_stock_check, sp.image_url,
+           sp.import_date, sp.export_date
+    FROM spare_parts sp
+    LEFT JOIN machine_type mt ON sp.machine_type_id = mt.id
+"""
+
+
+def offset_page(conn, sort, offset, page_size):
+    """Cùng trang nhưng nhảy bằng OFFSET (DB vẫn phải đọc qua mọi dòng phía trước)."""
+    key = repository.STOCK_SORT_COLUMNS[sort]
+    return read_df(conn, f"""
+        SELECT sp.id, sp.material_no, sp.description, sp.stock, {key} AS sort_key
+        FROM spare_parts sp
+        JOIN (SELECT id AS part_id, COALESCE(stock, 0) AS stock FROM spare_parts) s ON s.part_id = sp.id
+        LEFT JOIN machine_type mt ON mt.id = sp.machine_type_id
+        ORDER BY {key}, sp.id
+        LIMIT :page_size OFFSET :offset
+    """, {"page_size": page_size, "offset": offset})
+
+
+def pandas_filter(conn, keyword, min_stock, max_stock):
+    """Cách View Stock lọc trước đây: đọc cả danh mục rồi lọc trong pandas."""
+    df = read_df(conn, FULL_CATALOG)
+    text_match = df[['material_no', 'part_no', 'description', 'bin', 'cost_center']].apply(
+        lambda column: column.astype(str).str.lower().str.contains(keyword, na=False)).any(axis=1)
+    return df[text_match & (df['stock'] >= min_stock) & (df['stock'] <= max_stock)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=100_000)
+    parser.add_argument("--movements", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    args = parser.parse_args()
+
+    engine = get_write_engine()
+    if not args.configured:
+        print(f"Sinh {args.parts:,} linh kiện, {args.movements:,} lượt nhập/xuất...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+
+    today = date.today().strftime('%Y-%m-%d')
+    filters, size = repository.StockFilters(), args.page_size
+    with engine.connect() as conn:
+        full = read_df(conn, FULL_CATALOG)
+        first = repository.load_stock_page(conn, today, filters, (), (), "stock", False, None, size)
+        # Dòng cuối của trang ở giữa danh mục làm con trỏ keyset
+        middle = offset_page(conn, "stock", len(full) // 2 - 1, 1)
+    after = (middle['sort_key'].iloc[0], int(middle['id'].iloc[0]))
+    print(f"Dữ liệu gửi cho AgGrid: cả danh mục {len(full.to_json(orient='records')) / 1024:,.0f} KB "
+          f"({len(full):,} dòng), một trang {len(first.to_json(orient='records')) / 1024:,.1f} KB ({len(first)} dòng)")
+
+    before = bench_utils.measure_cases(engine, [
+        ("first_page", lambda conn: read_df(conn, FULL_CATALOG)),
+        ("middle_page", lambda conn: offset_page(conn, "stock", len(full) // 2, size)),
+    ], args.repeat)
+    after_cases = bench_utils.measure_cases(engine, [
+        ("first_page", lambda conn: repository.load_stock_page(conn, today, filters, (), (), "stock", False, None, size)),
+        ("middle_page", lambda conn: repository.load_stock_page(conn, today, filters, (), (), "stock", False, after, size)),
+    ], args.repeat)
+    bench_utils.print_comparison(before, after_cases)
+
+    keyword, low, high = "gear", 50, 150
+    narrow = repository.StockFilters(keyword=keyword, min_stock=low, max_stock=high)
+    # Chỉ mục trigram được cache trong app; ở đây dựng một lần, mỗi lượt đo chỉ tính phần tra cứu
+    with engine.connect() as conn:
+        index = search.load_index(conn)
+    before = bench_utils.measure_cases(engine, [
+        ("filtered", lambda conn: pandas_filter(conn, keyword, low, high))], args.repeat)
+    after_cases = bench_utils.measure_cases(engine, [
+        ("filtered", lambda conn: (matches := tuple(sorted(index.search(keyword))),
+                                   repository.load_stock_summary(conn, today, narrow, (), matches),
+                                   repository.load_stock_page(conn, today, narrow, (), matches, "stock", True, None, 2000)))
+    ], args.repeat)
+    bench_utils.print_comparison(before, after_cases)
+
+    seen, cursor, pages = set(), None, 0
+    with engine.connect() as conn:
+        while True:
+            page = repository.load_stock_page(conn, today, filters, (), (), "price", True, cursor, 1000)
+            seen.update(page['id'])
+            pages += 1
+            if len(page) < 1000:
+                break
+            cursor = (page['sort_key'].iloc[-1].item(), int(page['id'].iloc[-1]))
+        expected = set(pandas_filter(conn, keyword, low, high)['id'])
+        matches = tuple(sorted(index.search(keyword)))
+        count = repository.load_stock_summary(conn, today, narrow, (), matches)['count']
+        filtered = set(repository.load_stock_page(conn, today, narrow, (), matches, "stock", True, None, count + 1)['id'])
+    ok = len(seen) == len(full) and filtered == expected
+    print(f"\nDuyệt {pages} trang theo giá giảm dần: {len(seen):,}/{len(full):,} linh kiện; "
+          f"bộ lọc SQL {len(filtered):,}, pandas {len(expected):,}. " + ("Khớp." if ok else "LỆCH!"))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Kiểm tra bộ nhớ đỉnh (RSS) khi tổng hợp lịch sử nhập/xuất theo ngày.
+
+Sinh `--movements` lượt nhập/xuất (mặc định 10 triệu) trên một file SQLite tạm, rồi chạy
+`summaries.daily_totals_from_history` (đọc import_export qua server-side cursor) trong một
+tiến trình con và đo mức tăng RSS đỉnh. Thoát với mã 1 nếu mức tăng vượt `--max-rss-mb`:
+
+    python benchmarks/bench_streaming_rss.py
+    python benchmarks/bench_streaming_rss.py --movements 2000000 --compare-full
+    python benchmarks/bench_streaming_rss.py --configured   # DB đang cấu hình, đã có dữ liệu
+
+`--compare-full` đo thêm cách cũ (nạp toàn bộ date, quantity vào pandas rồi groupby).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import bench_utils
+
+if __name__ == "__main__" and "--configured" not in sys.argv and "--child" not in sys.argv:
+    bench_utils.use_scratch_sqlite("bench_streaming_rss")
+# Trang mmap của SQLite được tính vào RSS dù chỉ là page cache của file, nên tắt khi đo
+os.environ.setdefault("WAREHOUSE_SQLITE_MMAP_SIZE", "0")
+
+
+def child(mode):
+    import pandas as pd
+
+    import summaries
+    from database import get_write_engine, read_df
+
+    engine = get_write_engine()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+        before = bench_utils.peak_rss_mb()
+        start = time.perf_counter()
+        if mode == "streaming":
+            daily = summaries.daily_totals_from_history(conn, 0)
+        else:
+            df = read_df(conn, "SELECT date, quantity FROM import_export WHERE im_ex_flag = 0")
+            df['date'] = pd.to_datetime(df['date']).dt.date
+            daily = df.groupby('date')['quantity'].sum().reset_index()
+        elapsed = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "days": len(daily), "seconds": round(elapsed, 2),
+                      "baseline_mb": round(before, 1), "peak_mb": round(bench_utils.peak_rss_mb(), 1)}))
+
+
+def measure(mode):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode],
+                         check=True, capture_output=True, text=True, env=os.environ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["growth_mb"] = round(result["peak_mb"] - result["baseline_mb"], 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=5000)
+    parser.add_argument("--movements", type=int, default=10_000_000)
+    parser.add_argument("--max-rss-mb", type=float, default=100, help="Mức tăng RSS tối đa cho phép")
+    parser.add_argument("--compare-full", action="store_true", help="Đo thêm cách nạp toàn bộ vào pandas")
+    parser.add_argument("--configured", action="store_true", help="Dùng DB đang cấu hình (không sinh dữ liệu)")
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--child", choices=["streaming", "full"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    if not args.configured:
+        from database import get_write_engine
+        from seed_data import ensure_schema, seed
+
+        engine = get_write_engine()
+        print(f"Sinh {args.movements:,} lượt nhập/xuất...")
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+        engine.dispose()
+
+    modes = ["streaming", "full"] if args.compare_full else ["streaming"]
+    results = {mode: measure(mode) for mode in modes}
+    for r in results.values():
+        print(f"  {r['mode']:<10} {r['days']} ngày  {r['seconds']:8.2f} s  "
+              f"RSS {r['baseline_mb']:.0f} → {r['peak_mb']:.0f} MB (tăng {r['growth_mb']:.1f} MB)")
+
+    if args.output:
+        bench_utils.write_json(args.output, {"movements": args.movements, "max_rss_mb": args.max_rss_mb,
+                                             "results": results})
+    growth = results["streaming"]["growth_mb"]
+    if growth > args.max_rss_mb:
+        print(f"LỖI: RSS tăng {growth:.1f} MB, vượt giới hạn {args.max_rss_mb:.0f} MB")
+        sys.exit(1)
+    print(f"OK: RSS tăng {growth:.1f} MB ≤ {args.max_rss_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Hàm hỗ trợ dùng chung cho các script benchmark."""
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Thêm thư mục gốc vào cuối sys.path để email.py của repo không che module email chuẩn
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from sqlalchemy import event
+
+
+def use_scratch_sqlite(name):
+    """Trỏ app vào một file SQLite tạm (gọi trước khi import database)."""
+    path = os.path.join(tempfile.mkdtemp(prefix="warehouse_bench_"), f"{name}.db")
+    os.environ["WAREHOUSE_DB_BACKEND"] = "sqlite"
+    os.environ["WAREHOUSE_SQLITE_PATH"] = path
+    os.environ.setdefault("WAREHOUSE_QUERY_LOG_PATH", "")
+    return path
+
+
+def peak_rss_mb():
+    """RSS đỉnh (MB) của tiến trình hiện tại.
+
+    Đọc VmHWM trong /proc: ru_maxrss của tiến trình con giữ lại mức đỉnh của tiến trình cha
+    qua fork/exec nên không đo được mức tăng thật."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss tính bằng KB trên Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def best_of(fn, repeat=3):
+    """Chạy `fn` `repeat` lần, trả về (ms nhanh nhất, kết quả lần cuối)."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def capture_statements(conn, fn):
+    """Chạy fn(conn) và trả về các câu SQL (dạng driver) đã được gửi xuống DB."""
+    captured = []
+
+    def listener(_conn, _cursor, statement, parameters, _context, _executemany):
+        captured.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", listener)
+    try:
+        fn(conn)
+    finally:
+        event.remove(conn, "before_cursor_execute", listener)
+    return captured
+
+
+def explain(conn, statement, parameters):
+    """Kế hoạch thực thi rút gọn của một câu SQL, mỗi bước một dòng."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        return [row[-1] for row in rows]
+    rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().fetchall()
+    return [
+        f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}"
+        f"{' partitions=' + row['partitions'] if row.get('partitions') else ''} {row['Extra'] or ''}".strip()
+        for row in rows
+    ]
+
+
+def measure_cases(engine, cases, repeat=3):
+    """Đo latency và EXPLAIN cho từng (tên, hàm nhận conn)."""
+    results = {}
+    with engine.connect() as conn:
+        for name, fn in cases:
+            plans = [line for statement, params in capture_statements(conn, fn)
+                     for line in explain(conn, statement, params)]
+            ms, _ = best_of(lambda: fn(conn), repeat)
+            conn.rollback()
+            results[name] = {"ms": round(ms, 3), "plan": plans}
+    return results
+
+
+def print_comparison(before, after):
+    for name in before:
+        b, a = before[name], after.get(name, {})
+        speedup = b["ms"] / a["ms"] if a.get("ms") else float("nan")
+        print(f"\n■ {name}: {b['ms']:.2f} ms → {a.get('ms', float('nan')):.2f} ms (x{speedup:.1f})")
+        print("   trước: " + " | ".join(b["plan"]))
+        print("   sau:   " + " | ".join(a.get("plan", [])))
+
+
+def write_json(path, payload):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,55 @@
+"""Kiểm tra định tuyến đọc/ghi bằng hai file SQLite đóng vai primary và replica.
+
+    python benchmarks/check_read_write_split.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+workdir = tempfile.mkdtemp(prefix="rw_split_")
+os.environ["WAREHOUSE_DB_BACKEND"] = "sqlite"
+os.environ["WAREHOUSE_SQLITE_PATH"] = os.path.join(workdir, "primary.db")
+os.environ["WAREHOUSE_SQLITE_READ_PATH"] = os.path.join(workdir, "replica.db")
+os.environ["WAREHOUSE_READ_YOUR_WRITES_SECONDS"] = "1"
+os.environ["WAREHOUSE_QUERY_LOG_PATH"] = ""
+
+from sqlalchemy import text
+
+import database
+
+ROLE_SQL = "SELECT role FROM node"
+
+
+def _init(engine, role):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE node (role VARCHAR(16))"))
+        conn.execute(text("INSERT INTO node (role) VALUES (:role)"), {"role": role})
+
+
+def _read_role():
+    with database.connect() as conn:
+        return conn.execute(text(ROLE_SQL)).scalar()
+
+
+if __name__ == "__main__":
+    _init(database.get_write_engine(), "primary")
+    _init(database.get_read_engine(), "replica")
+
+    checks = []
+    checks.append(("đọc mặc định đi vào replica", _read_role() == "replica"))
+
+    with database.write_transaction() as conn:
+        conn.execute(text("UPDATE node SET role = 'primary'"))
+    checks.append(("ngay sau khi ghi, đọc từ primary", _read_role() == "primary"))
+
+    time.sleep(1.1)
+    checks.append(("hết thời gian read-your-writes, quay lại replica", _read_role() == "replica"))
+
+    failed = [name for name, ok in checks if not ok]
+    for name, ok in checks:
+        print(f"  {'ok  ' if ok else 'FAIL'}  {name}")
+    sys.exit(1 if failed else 0)
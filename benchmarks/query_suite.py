@@ -0,0 +1,84 @@
+"""Chạy toàn bộ truy vấn đọc của các trang trên backend đang cấu hình và đo thời gian.
+
+Chạy với MySQL:   python benchmarks/query_suite.py
+Chạy với SQLite:  WAREHOUSE_DB_BACKEND=sqlite WAREHOUSE_SQLITE_PATH=/tmp/bench.db python benchmarks/query_suite.py --seed
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+from seed_data import ensure_schema, seed
+
+import repository
+from database import get_engine
+
+
+def page_queries():
+    """Danh sách (tên, hàm nhận conn) cho mọi truy vấn đọc của các trang (bỏ qua cache)."""
+    today = date.today().strftime('%Y-%m-%d')
+    return [
+        ("spare_parts", repository.load_spare_parts),
+        ("machine_types", repository.load_machine_types),
+        ("employees", repository.load_employees),
+        ("employee_details", repository.load_employee_details),
+        ("machine_positions", repository.load_machine_positions),
+        ("machine_groups", repository.load_machine_groups),
+        ("machines", lambda conn: repository.load_machines(conn, "Tất cả", "Tất cả", "")),
+        ("dashboard_kpis", lambda conn: repository.load_dashboard_kpis(conn, today, 30, ())),
+        *[(f"movement_history({grain})", lambda conn, grain=grain: repository.load_movement_history(
+            conn, "2000-01-01", today, grain, ())) for grain in ("day", "week", "month", "year")],
+        ("export_stats", lambda conn: repository.load_export_stats(conn, today)),
+        *[(f"export_cost({dimension})", lambda conn, dimension=dimension: repository.load_export_cost(
+            conn, "2000-01-01", today, dimension, None, None)) for dimension in repository.EXPORT_COST_DIMENSIONS],
+        ("consumption_rollup", lambda conn: repository.load_consumption_rollup(conn, "2000-01-01", today)),
+        ("import_stats", lambda conn: repository.load_import_stats(conn, today)),
+    ]
+
+
+def _rows(result):
+    return len(result) if hasattr(result, "__len__") else 1
+
+
+def run_suite(engine, repeat=3):
+    """Chạy từng truy vấn `repeat` lần, trả về (tên, số dòng, ms tốt nhất, lỗi)."""
+    results = []
+    with engine.connect() as conn:
+        for name, query in page_queries():
+            best, rows, error = None, 0, None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                try:
+                    rows = _rows(query(conn))
+                except Exception as e:
+                    error = str(e).splitlines()[0]
+                    conn.rollback()
+                    break
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            results.append((name, rows, best, error))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", action="store_true", help="Sinh dữ liệu giả lập trước khi chạy (chỉ dùng với DB thử nghiệm)")
+    parser.add_argument("--parts", type=int, default=2000)
+    parser.add_argument("--movements", type=int, default=100000)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.seed:
+        ensure_schema(engine)
+        seed(engine, args.parts, args.movements)
+
+    print(f"Backend: {engine.dialect.name}")
+    failed = 0
+    for name, rows, best, error in run_suite(engine, args.repeat):
+        if error:
+            failed += 1
+            print(f"  FAIL  {name:<45} {error}")
+        else:
+            print(f"  ok    {name:<45} {rows:>8} dòng  {best:>9.2f} ms")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,149 @@
+"""Sinh dữ liệu giả lập cho benchmark: danh mục linh kiện và lịch sử nhập/xuất kho."""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Thêm thư mục gốc vào cuối sys.path để email.py của repo không che module email chuẩn
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from sqlalchemy import inspect, text
+
+import alerts
+import classification
+import lots
+import migrations
+import summaries
+
+BATCH_SIZE = 10000
+
+
+def ensure_schema(engine, migrate=True):
+    """Tạo schema SQLite nếu chưa có (MySQL dùng schema có sẵn), rồi chạy các migration."""
+    if engine.dialect.name == "sqlite":
+        with open(os.path.join(ROOT, "createdatabase.sqlite"), encoding="utf-8") as f:
+            script = f.read()
+        raw = engine.raw_connection()
+        try:
+            raw.driver_connection.executescript(script)
+            raw.commit()
+        finally:
+            raw.close()
+    if migrate:
+        migrations.upgrade(engine, log=lambda message: None)
+
+
+def refresh_summaries(engine):
+    """Tính lại các bảng tổng hợp đã có, vì seed ghi thẳng vào import_export."""
+    with engine.begin() as conn:
+        if inspect(conn).has_table("daily_movements"):
+            summaries.rebuild_daily_movements(conn)
+        if inspect(conn).has_table("export_costs"):
+            summaries.rebuild_export_costs(conn)
+        if inspect(conn).has_table("position_costs"):
+            summaries.rebuild_position_costs(conn)
+        if inspect(conn).has_table("part_classes"):
+            classification.refresh_part_classes(conn)
+        if inspect(conn).has_table("alerts"):
+            alerts.check_all(conn)
+        if inspect(conn).has_table("stock_lots"):
+            lots.rebuild_lots(conn)
+
+
+def _insert_many(conn, sql, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(text(sql), rows[start:start + BATCH_SIZE])
+
+
+def seed(engine, n_parts=2000, n_movements=100000, days=730, random_seed=42, legacy_part_keys=False):
+    """Ghi dữ liệu giả lập theo đúng cách các trang đang ghi vào import_export.
+
+    `legacy_part_keys=True` ghi material_no vào part_id như các trang trước migration 002.
+    """
+    rnd = random.Random(random_seed)
+    now = datetime.now().replace(microsecond=0)
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO dept (mc_of_dept) VALUES ('Spinning'), ('Dyeing'), ('Finishing')"))
+        _insert_many(conn, "INSERT INTO group_mc (mc_name) VALUES (:name)",
+                     [{"name": f"Group {g}"} for g in range(1, 9)])
+        _insert_many(conn, "INSERT INTO machine (name, group_mc_id, dept_id) VALUES (:name, :group_id, :dept_id)",
+                     [{"name": f"MC-{m}", "group_id": m % 8 + 1, "dept_id": m % 3 + 1} for m in range(1, 41)])
+        _insert_many(conn, "INSERT INTO machine_pos (mc_id, mc_pos) VALUES (:mc_id, :mc_pos)",
+                     [{"mc_id": m, "mc_pos": f"POS-{m}-{p}"} for m in range(1, 41) for p in range(1, 4)])
+        _insert_many(conn, "INSERT INTO machine_type (machine) VALUES (:machine)",
+                     [{"machine": f"Type {t}"} for t in range(1, 12)])
+        _insert_many(conn, """
+            INSERT INTO employees (amann_id, name, title, level, active, gender)
+            VALUES (:amann_id, :name, 'Employee', 'Junior', '1', 'Male')
+        """, [{"amann_id": f"E{e:04d}", "name": f"Employee {e}"} for e in range(1, 51)])
+
+        parts = []
+        for p in range(1, n_parts + 1):
+            parts.append({
+                "material_no": f"SP{p:06d}",
+                "part_no": f"P{p:06d}",
+                "description": f"PART {rnd.choice(['SEAL', 'BEARING', 'BELT', 'GEAR', 'HOSE'])} {p}",
+                "machine_type_id": rnd.randint(1, 11),
+                "bin": f"{rnd.choice('ABCDEF')}{rnd.randint(1, 30)}",
+                "cost_center": f"CC{rnd.randint(1, 20):03d}",
+                "price": round(rnd.uniform(1, 500), 2),
+                "stock": rnd.randint(0, 300),
+                "safety_stock": rnd.randint(5, 40),
+                "import_date": (now - timedelta(days=rnd.randint(0, days))).strftime('%Y-%m-%d %H:%M:%S'),
+            })
+        _insert_many(conn, """
+            INSERT INTO spare_parts (material_no, part_no, description, machine_type_id, bin, cost_center,
+                                     price, stock, safety_stock, safety_stock_check, import_date)
+            VALUES (:material_no, :part_no, :description, :machine_type_id, :bin, :cost_center,
+                    :price, :stock, :safety_stock, 1, :import_date)
+        """, parts)
+        part_ids = dict(conn.execute(text("SELECT material_no, id FROM spare_parts")).fetchall())
+
+    movements = []
+    for _ in range(n_movements):
+        flag = 1 if rnd.random() < 0.4 else 0
+        movements.append({
+            "part_id": _part_key(part_ids, f"SP{rnd.randint(1, n_parts):06d}", legacy_part_keys),
+            "quantity": rnd.randint(1, 20),
+            "mc_pos_id": None if flag else rnd.randint(1, 120),
+            "empl_id": f"E{rnd.randint(1, 50):04d}",
+            "date": (now - timedelta(seconds=rnd.randint(0, days * 86400))).strftime('%Y-%m-%d %H:%M:%S'),
+            "reason": "Nhập kho" if flag else "Sản xuất",
+            "flag": flag,
+        })
+        if len(movements) == BATCH_SIZE:
+            _write_movements(engine, movements)
+            movements = []
+    if movements:
+        _write_movements(engine, movements)
+    refresh_summaries(engine)
+
+
+def _part_key(part_ids, material_no, legacy):
+    return material_no if legacy else part_ids[material_no]
+
+
+def _write_movements(engine, movements):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO import_export (part_id, quantity, mc_pos_id, empl_id, date, reason, im_ex_flag)
+            VALUES (:part_id, :quantity, :mc_pos_id, :empl_id, :date, :reason, :flag)
+        """), movements)
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import get_engine
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=2000)
+    parser.add_argument("--movements", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=730)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    ensure_schema(engine)
+    seed(engine, args.parts, args.movements, args.days)
+    print(f"Đã sinh {args.parts} linh kiện và {args.movements} lượt nhập/xuất.")
@@ -0,0 +1,136 @@
+"""Phân loại ABC/XYZ cho mọi linh kiện, tính theo lô bằng NumPy.
+
+ABC xếp linh kiện theo giá trị tiêu thụ (lượng xuất × đơn giá) trong CLASS_WINDOW_MONTHS tháng
+trọn vẹn gần nhất: nhóm A gồm các linh kiện giá trị cao nhất chiếm tới CLASS_A_SHARE tổng giá
+trị, nhóm B tới CLASS_B_SHARE, còn lại là C. XYZ xếp theo hệ số biến thiên (std / trung bình)
+của lượng tiêu thụ theo tháng: X <= CLASS_X_CV, Y <= CLASS_Y_CV, còn lại (kể cả không tiêu
+thụ) là Z.
+
+Kết quả lưu trong bảng part_classes để các trang chỉ đọc lại. Job định kỳ
+
+    python tools/manage.py classify-parts
+
+tính lại toàn bộ danh mục một lượt nhưng chỉ ghi các dòng đã đổi.
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import reorder
+import settings
+from archive import month_start
+from database import read_df, sql_period_start
+from stock_history import as_date
+
+ABC, XYZ = ("A", "B", "C"), ("X", "Y", "Z")
+
+_UPSERT_CLASS = {
+    "mysql": """
+        INSERT INTO part_classes (part_id, abc_class, xyz_class, consumption_value, demand_cv, updated_at)
+        VALUES (:part_id, :abc_class, :xyz_class, :consumption_value, :demand_cv, :updated_at)
+        ON DUPLICATE KEY UPDATE abc_class = VALUES(abc_class), xyz_class = VALUES(xyz_class),
+                                consumption_value = VALUES(consumption_value), demand_cv = VALUES(demand_cv),
+                                updated_at = VALUES(updated_at)
+    """,
+    "sqlite": """
+        INSERT INTO part_classes (part_id, abc_class, xyz_class, consumption_value, demand_cv, updated_at)
+        VALUES (:part_id, :abc_class, :xyz_class, :consumption_value, :demand_cv, :updated_at)
+        ON CONFLICT (part_id)
+        DO UPDATE SET abc_class = excluded.abc_class, xyz_class = excluded.xyz_class,
+                      consumption_value = excluded.consumption_value, demand_cv = excluded.demand_cv,
+                      updated_at = excluded.updated_at
+    """,
+}
+
+
+def abc_classes(values, a_share, b_share):
+    """Nhóm A/B/C theo tỷ lệ cộng dồn của `values` sắp giảm dần; linh kiện đưa tổng vượt ngưỡng
+    vẫn thuộc nhóm trên, linh kiện không có giá trị tiêu thụ luôn là C."""
+    values = np.asarray(values, dtype=np.float64)
+    classes = np.full(len(values), "C", dtype="<U1")
+    total = values.sum()
+    if total <= 0:
+        return classes
+    order = np.argsort(-values, kind="stable")
+    ranked = values[order]
+    before = (np.cumsum(ranked) - ranked) / total
+    classes[order] = np.where(before < a_share, "A", np.where(before < b_share, "B", "C"))
+    classes[values <= 0] = "C"
+    return classes
+
+
+def xyz_classes(avg, std, x_cv, y_cv):
+    """(nhóm X/Y/Z, hệ số biến thiên) từ trung bình và độ lệch chuẩn tiêu thụ theo kỳ;
+    hệ số là NaN và nhóm là Z khi không tiêu thụ."""
+    avg = np.asarray(avg, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.where(avg > 0, np.asarray(std, dtype=np.float64) / avg, np.nan)
+    classes = np.where(cv <= x_cv, "X", np.where(cv <= y_cv, "Y", "Z"))
+    return classes, cv
+
+
+def class_window(today=None, months=None):
+    """Khoảng [đầu, cuối) gồm `months` tháng trọn vẹn trước tháng của `today`."""
+    months = settings.CLASS_WINDOW_MONTHS if months is None else months
+    end = month_start(as_date(today or date.today()))
+    year, month = divmod(end.year * 12 + end.month - 1 - months, 12)
+    return date(year, month + 1, 1), end
+
+
+def compute_part_classes(conn, today=None) -> pd.DataFrame:
+    """Nhóm ABC/XYZ của mọi linh kiện: cột part_id, abc_class, xyz_class, consumption_value, demand_cv."""
+    start, end = class_window(today)
+    months = (end.year - start.year) * 12 + end.month - start.month
+    parts = read_df(conn, "SELECT id AS part_id, COALESCE(price, 0) AS price FROM spare_parts")
+    # Tiêu thụ theo tháng: lượng xuất làm giảm tồn kho (xuất FOC không tính)
+    usage = read_df(conn, f"""
+        SELECT part_id, {sql_period_start(conn, 'day', 'month')} AS period, -SUM(stock_delta) AS quantity
+        FROM daily_movements
+        WHERE im_ex_flag = 0 AND day >= :start AND day < :end
+        GROUP BY part_id, period
+    """, {"start": start.strftime('%Y-%m-%d'), "end": end.strftime('%Y-%m-%d')})
+
+    part_ids = parts['part_id'].to_numpy()
+    avg, std = reorder.usage_stats(part_ids, usage['part_id'].to_numpy(), usage['quantity'].to_numpy(), months)
+    value = avg * months * parts['price'].to_numpy(dtype=np.float64)
+    xyz, cv = xyz_classes(avg, std, settings.CLASS_X_CV, settings.CLASS_Y_CV)
+    return pd.DataFrame({
+        'part_id': part_ids,
+        'abc_class': abc_classes(value, settings.CLASS_A_SHARE, settings.CLASS_B_SHARE),
+        'xyz_class': xyz,
+        'consumption_value': value.round(2),
+        'demand_cv': cv.round(3),
+    })
+
+
+def _changed_rows(computed, stored):
+    """Các dòng của `computed` chưa có hoặc khác với bảng part_classes hiện tại."""
+    both = computed.merge(stored, on='part_id', how='left', suffixes=('', '_old'), indicator=True)
+    changed = (
+        (both['_merge'] == 'left_only')
+        | (both['abc_class'] != both['abc_class_old'])
+        | (both['xyz_class'] != both['xyz_class_old'])
+        | ~np.isclose(both['consumption_value'], both['consumption_value_old'].astype(float))
+        | ~np.isclose(both['demand_cv'], both['demand_cv_old'].astype(float), equal_nan=True)
+    )
+    return computed[changed.to_numpy()]
+
+
+def refresh_part_classes(conn, today=None):
+    """Tính lại nhóm của mọi linh kiện và chỉ ghi các dòng đã đổi vào part_classes;
+    trả về (số dòng ghi, số dòng xóa của linh kiện không còn trong danh mục)."""
+    computed = compute_part_classes(conn, today)
+    stored = read_df(conn, """
+        SELECT part_id, abc_class, xyz_class, consumption_value, demand_cv FROM part_classes
+    """)
+    changed = _changed_rows(computed, stored)
+    if not changed.empty:
+        rows = changed.astype(object).where(changed.notna(), None).to_dict("records")
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn.execute(text(_UPSERT_CLASS[conn.dialect.name]), [{**row, "updated_at": updated_at} for row in rows])
+    deleted = conn.execute(text(
+        "DELETE FROM part_classes WHERE part_id NOT IN (SELECT id FROM spare_parts)"
+    )).rowcount
+    return len(changed), deleted
@@ -1,5 +1,6 @@
 import sqlite3
 import chardet # Thư viện để tự động phát hiện encoding
+import settings
 
 def execute_sql_from_file(db_name, sql_file_path):
     """
@@ -48,6 +49,6 @@ def execute_sql_from_file(db_name, sql_file_path):
         if conn:
             conn.close()
 
-sql_file_path = 'createdatabase.sql'
-db_name = 'my_database.db'
+sql_file_path = 'createdatabase.sqlite'
+db_name = settings.SQLITE_PATH
 execute_sql_from_file(db_name, sql_file_path)
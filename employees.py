@@ -1,15 +1,14 @@
 import streamlit as st
 import pandas as pd
 from sqlalchemy import text
-from database import get_engine  # Ensure you have a database.py with get_engine()
+from database import write_transaction
+import repository
 import datetime
 import plotly.express as px
 
 # Load employee data from the database
 def load_employees():
-    engine = get_engine()
-    with engine.begin() as conn:
-        return pd.read_sql("SELECT amann_id, name, title, level, active, birthday, start_date, address, phone_number, email, gender FROM employees", conn)
+    return repository.employee_details()
 
 def show_employees():
     st.title("Employee Management")
@@ -191,8 +190,7 @@ def show_employees():
             submit_update = st.button("Update Information")
             if submit_update:
                 try:
-                    engine = get_engine()
-                    with engine.connect() as conn:
+                    with write_transaction("employees") as conn:
                         conn.execute(text(""" 
                             UPDATE employees
                             SET name = :name, title = :title, level = :level, active = :active
@@ -204,8 +202,7 @@ def show_employees():
                             "active": "1" if active == "Active" else "0",
                             "amann_id": employee_id
                         })
-                        conn.commit()
-                        st.success(f"Employee '{name}' information updated successfully!")
+                    st.success(f"Employee '{name}' information updated successfully!")
                 except Exception as e:
                     st.error(f"Update error: {str(e)}")
 
@@ -234,8 +231,8 @@ def show_employees():
                     st.error("Amann ID and Full Name are required!")
                 else:
                     try:
-                        engine = get_engine()
-                        with engine.connect() as conn:
+                        added = False
+                        with write_transaction("employees") as conn:
                             existing = conn.execute(
                                 text("SELECT COUNT(*) FROM employees WHERE amann_id = :amann_id"),
                                 {"amann_id": amann_id.strip()}
@@ -260,9 +257,10 @@ def show_employees():
                                     "email": email,
                                     "gender": gender
                                 })
+                                added = True
 
-                                conn.commit()
-                                st.success(f"Employee '{name.strip()}' added successfully!")
-                                st.rerun()
+                        if added:
+                            st.success(f"Employee '{name.strip()}' added successfully!")
+                            st.rerun()
                     except Exception as e:
                         st.error(f"Add employee error: {str(e)}")
@@ -1,61 +1,36 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import text
-from database import get_engine
+from database import write_transaction
+import query_executor
+import repository
+import search
+from movements import EXPORT, FOC_REASON, part_id_for, record_movement
 import matplotlib.pyplot as plt
 import seaborn as sns
+
 def show_export_stock():
     st.markdown("<h1 style='text-align: center;'>📦 Export Stock</h1>", unsafe_allow_html=True)
-    engine = get_engine()
-
-    # ====== Load dữ liệu cơ bản ======
-    with engine.begin() as conn:
-        spare_parts = pd.read_sql('SELECT material_no, description, stock FROM spare_parts', conn)
-        employees = pd.read_sql('SELECT amann_id, name FROM employees', conn)
-        machine_data = pd.read_sql(''' 
-            SELECT m.name AS machine_name, mp.mc_pos AS mc_pos_id, mp.mc_pos 
-            FROM machine m 
-            JOIN machine_pos mp ON m.group_mc_id = mp.mc_id
-        ''', conn)
 
     # ====== Chọn ngày cần thống kê ======
     selected_date = st.date_input("📅 Chọn ngày để xem thống kê xuất kho", datetime.today())
     today_str = selected_date.strftime('%Y-%m-%d')
 
-    # ====== Hàm lấy dữ liệu xuất kho và chi phí xuất kho ======
-    def fetch_export_data():
-        # Lấy dữ liệu xuất kho
-        with engine.begin() as conn:
-            export_stats = pd.read_sql(''' 
-                SELECT 
-                    ie.date, 
-                    ie.part_id, 
-                    sp.material_no, 
-                    sp.description, 
-                    SUM(ie.quantity) AS total_quantity
-                FROM import_export ie
-                JOIN spare_parts sp ON ie.part_id = sp.material_no
-                WHERE DATE(ie.date) = %s
-                GROUP BY ie.date, ie.part_id, sp.material_no, sp.description
-            ''', conn, params=(today_str,))
-
-        # Lấy chi phí xuất kho
-        with engine.begin() as conn:
-            cost_data = pd.read_sql(''' 
-                SELECT 
-                    DATE(ie.date) AS export_day,
-                    ie.part_id,
-                    SUM(ie.quantity) AS total_qty,
-                    sp.price
-                FROM import_export ie
-                JOIN spare_parts sp ON ie.part_id = sp.material_no
-                WHERE ie.im_ex_flag = 0
-                GROUP BY export_day, ie.part_id, sp.price
-                ORDER BY export_day
-            ''', conn)
-
-        return export_stats, cost_data
+    # ====== Khoảng ngày tính chi phí xuất kho ======
+    cost_period = st.date_input("💰 Khoảng thời gian tính chi phí xuất kho",
+                                (selected_date - timedelta(days=29), selected_date))
+    cost_start, cost_end = cost_period[0], cost_period[-1]
+
+    # ====== Load dữ liệu cơ bản, thống kê và chi phí xuất kho (song song) ======
+    spare_parts, employees, machine_data, export_stats, cost_data = query_executor.gather(
+        repository.spare_parts,
+        repository.employees,
+        repository.machine_positions,
+        lambda: repository.export_stats(today_str),
+        lambda: repository.export_cost(cost_start, cost_end),
+    )
+    spare_parts = spare_parts[['id', 'material_no', 'description', 'stock']]
 
     # ====== Hàm cập nhật biểu đồ xuất kho ======
     def update_bar_chart(export_stats):
@@ -127,9 +102,8 @@ def show_export_stock():
             st.info("ℹ️ Chưa có dữ liệu xuất kho để tính chi phí.")
             return
 
-        # Tính chi phí theo ngày
-        cost_data['export_cost'] = cost_data['total_qty'] * cost_data['price']  # Sử dụng cột price để tính chi phí
-        cost_by_day = cost_data.groupby('export_day')['export_cost'].sum().reset_index()
+        # Chi phí theo ngày đã được tổng hợp sẵn trong export_costs
+        cost_by_day = cost_data.rename(columns={'day': 'export_day', 'cost': 'export_cost'})
 
         # Định dạng lại cột ngày tháng
         cost_by_day['export_day'] = pd.to_datetime(cost_by_day['export_day']).dt.strftime('%d-%m-%Y')
@@ -171,10 +145,7 @@ def show_export_stock():
         fig.tight_layout()
         st.pyplot(fig)
 
-    # ====== Gọi hàm chính và cập nhật biểu đồ ======
-    export_stats, cost_data = fetch_export_data()
-
-    # Hiển thị các biểu đồ
+    # ====== Hiển thị các biểu đồ ======
     col1, col2 = st.columns(2)
 
     with col1:
@@ -183,19 +154,38 @@ def show_export_stock():
     with col2:
         show_export_cost_chart(cost_data)  # Truyền dữ liệu chi phí vào
 
+    # ====== Chi tiết chi phí xuất kho: bộ phận -> vị trí máy / linh kiện ======
+    with st.expander(f"🔎 Chi tiết chi phí xuất kho {cost_start:%d-%m-%Y} → {cost_end:%d-%m-%Y}"):
+        by_dept = repository.export_cost(cost_start, cost_end, "dept")
+        by_dept['dept'] = by_dept['dept'].fillna("Không rõ bộ phận")
+        dept_choice = st.selectbox("🏭 Bộ phận", ["Tất cả"] + by_dept['dept'].tolist())
+        dept_id = None if dept_choice == "Tất cả" else by_dept.loc[by_dept['dept'] == dept_choice, 'dept_id'].iloc[0]
+
+        dimension = st.radio("Xem theo", ["Bộ phận", "Vị trí máy", "Linh kiện"], horizontal=True)
+        if dimension == "Bộ phận":
+            detail = by_dept if dept_id is None else by_dept[by_dept['dept_id'] == dept_id]
+            detail = detail[['dept', 'quantity', 'cost']]
+        elif dimension == "Vị trí máy":
+            detail = repository.export_cost(cost_start, cost_end, "mc_pos", dept_id=dept_id)
+            detail = detail[['machine', 'mc_pos', 'quantity', 'cost']]
+        else:
+            detail = repository.export_cost(cost_start, cost_end, "part", dept_id=dept_id)
+            detail = detail[['material_no', 'description', 'quantity', 'cost']]
+
+        st.dataframe(detail, hide_index=True, use_container_width=True,
+                     column_config={'quantity': 'Số lượng',
+                                    'cost': st.column_config.NumberColumn('Chi phí (VND)', format="%.0f")})
+
 
 
     # ====== Tìm kiếm linh kiện ======
-    search = st.text_input("🔍 Tìm linh kiện theo Material_No/Description")
-    parts = spare_parts[
-        spare_parts['description'].str.contains(search, case=False, na=False) |
-        spare_parts['material_no'].str.contains(search, case=False, na=False)
-    ] if search else spare_parts
+    keyword = st.text_input("🔍 Tìm linh kiện theo Material_No/Description")
+    parts = search.filter_frame(spare_parts, keyword)
 
     if not parts.empty:  # Chỉ hiển thị phần tìm kiếm nếu có linh kiện
         part_choice = st.selectbox("📦 Chọn linh kiện để xuất", parts.apply(
             lambda x: f"{x['material_no']} - {x['description']} (Tồn: {x['stock']})", axis=1))
-        part_id = part_choice.split(' - ')[0]
+        material_no = part_choice.split(' - ')[0]
     else:
         st.warning("⚠️ Không có linh kiện phù hợp.")
 
@@ -224,46 +214,37 @@ def show_export_stock():
     # ====== Thông tin xuất kho ======
     quantity = st.number_input("🔢 Số lượng xuất kho", min_value=1, value=1)
     is_foc = st.checkbox("🎁 Xuất kho miễn phí (FOC)")
-    reason = "FOC" if is_foc else st.text_input("✏️ Nhập lý do xuất kho", "")
+    reason = FOC_REASON if is_foc else st.text_input("✏️ Nhập lý do xuất kho", "")
 
     # ====== Xác nhận xuất kho ======
     if st.button("✅ Xác nhận xuất kho"):
         if not reason and not is_foc:
             st.error("❌ Bạn phải nhập lý do xuất kho!")
         else:
-            with engine.begin() as conn:
+            with write_transaction("import_export", "spare_parts") as conn:
                 # Kiểm tra số lượng tồn kho
-                stock = conn.execute(text("SELECT stock FROM spare_parts WHERE material_no = :material_no"),
-                                     {"material_no": part_id}).scalar()
+                part_id = part_id_for(conn, material_no)
+                stock = conn.execute(text("SELECT stock FROM spare_parts WHERE id = :part_id"),
+                                     {"part_id": part_id}).scalar()
                 if not is_foc and quantity > stock:
                     st.error("❌ Không đủ hàng trong kho!")
                 else:
-                    # Ghi vào bảng xuất kho
-                    conn.execute(text("""
-                        INSERT INTO import_export (part_id, quantity, mc_pos_id, empl_id, date, reason, im_ex_flag)
-                        VALUES (:part_id, :quantity, :mc_pos_id, :empl_id, :date, :reason, 0)
-                    """), {
-                        "part_id": part_id,
-                        "quantity": quantity,
-                        "mc_pos_id": mc_pos_id,
-                        "empl_id": empl_id,
-                        "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        "reason": reason
-                    })
-
                     # Cập nhật kho
                     if not is_foc:
                         conn.execute(text("""
                             UPDATE spare_parts 
                             SET stock = stock - :q, export_date = :date 
-                            WHERE material_no = :material_no
-                        """), {"q": quantity, "material_no": part_id, "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+                            WHERE id = :part_id
+                        """), {"q": quantity, "part_id": part_id, "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
                     else:
                         conn.execute(text("""
                             UPDATE spare_parts 
                             SET export_date = :date 
-                            WHERE material_no = :material_no
-                        """), {"material_no": part_id, "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+                            WHERE id = :part_id
+                        """), {"part_id": part_id, "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+
+                    # Ghi vào bảng xuất kho (sau khi trừ kho để cảnh báo tồn kho dùng số mới)
+                    record_movement(conn, part_id, quantity, EXPORT, empl_id, reason, mc_pos_id=mc_pos_id)
 
             st.success("✅ Đã xuất kho thành công!")
 
@@ -0,0 +1,200 @@
+"""Xuất danh sách tồn kho của View Stock ra file xlsx, CSV hoặc Parquet.
+
+File chỉ được tạo khi người dùng bấm nút. `repository.iter_stock` chạy một truy vấn duy nhất
+và đọc kết quả qua server-side cursor từng `EXPORT_CHUNK_ROWS` dòng; mỗi phần được ghi thẳng
+xuống file tạm: openpyxl ở chế độ write-only, CSV nối từng phần, Parquet ghi từng row group.
+Vì vậy bộ nhớ không tăng theo số linh kiện. Việc ghi chạy trên luồng nền
+(`query_executor.submit`); trang đọc tiến độ từ `ExportJob`. File xong được giữ theo (ngày,
+bộ lọc, sắp xếp, định dạng, data version), nên bấm lại với cùng bộ lọc thì dùng lại file cũ.
+Dữ liệu đổi thì tạo file mới.
+"""
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import wait
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+import query_executor
+import repository
+import settings
+import stock_history
+from database import data_version
+
+# Định dạng -> (nhãn, MIME)
+FORMATS = {
+    "xlsx": ("Excel (.xlsx)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+# Bảng mà nội dung file phụ thuộc (giống cache của repository.stock_page)
+TABLES = ("spare_parts", "machine_type", "import_export", "stock_snapshots", "part_classes")
+
+# Kiểu cột cố định cho Parquet: kiểu pandas của một phần có thể khác phần khác
+# (ví dụ storage_days thành float khi có NaN); cột không có ở đây ghi dạng chuỗi
+ARROW_TYPES = {
+    "price": pa.float64(),
+    "stock": pa.int64(),
+    "safety_stock": pa.int64(),
+    "import_date": pa.timestamp("s"),
+    "export_date": pa.timestamp("s"),
+    "storage_days": pa.int64(),
+    "age_0_30": pa.int64(),
+    "age_31_90": pa.int64(),
+    "age_90_plus": pa.int64(),
+    "avg_daily_usage": pa.float64(),
+    "usage_std": pa.float64(),
+    "days_of_cover": pa.float64(),
+    "reorder_point": pa.int64(),
+    "reorder_now": pa.bool_(),
+}
+
+
+def write_xlsx(chunks, columns, path):
+    """Ghi các DataFrame `chunks` vào một sheet; mỗi phần xong thì yield số dòng đã ghi."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Stock")
+    sheet.append(columns)
+    for chunk in chunks:
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+        yield len(chunk)
+    workbook.save(path)
+
+
+def write_csv(chunks, columns, path):
+    # utf-8-sig để Excel mở đúng tiếng Việt
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write(",".join(columns) + "\n")
+        for chunk in chunks:
+            chunk.to_csv(f, header=False, index=False)
+            yield len(chunk)
+
+
+def _arrow_column(series, type_):
+    if pa.types.is_timestamp(type_):
+        series = pd.to_datetime(series, errors="coerce")
+    elif pa.types.is_string(type_):
+        series = series.map(lambda value: None if pd.isna(value) else str(value))
+    elif not pa.types.is_boolean(type_):
+        series = pd.to_numeric(series, errors="coerce")
+    return pa.array(series, type=type_, from_pandas=True)
+
+
+def write_parquet(chunks, columns, path):
+    schema = pa.schema([(column, ARROW_TYPES.get(column, pa.string())) for column in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            arrays = [_arrow_column(chunk[field.name], field.type) for field in schema]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield len(chunk)
+
+
+WRITERS = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}
+
+
+class ExportJob:
+    """Một lần xuất file chạy nền; `rows`/`total` dùng cho thanh tiến độ."""
+
+    def __init__(self, fmt, total, path):
+        self.fmt = fmt
+        self.total = total
+        self.path = path
+        self.rows = 0
+        self.future = None
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    @property
+    def error(self):
+        return self.future.exception() if self.done else None
+
+    @property
+    def progress(self):
+        return min(1.0, self.rows / self.total) if self.total else 1.0
+
+    @property
+    def file_name(self):
+        return f"stock_view.{self.fmt}"
+
+    @property
+    def mime(self):
+        return FORMATS[self.fmt][1]
+
+    def wait(self, timeout=None):
+        wait([self.future], timeout)
+        return self.done
+
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_export_dir = None
+
+
+def _directory():
+    global _export_dir
+    if _export_dir is None:
+        _export_dir = settings.EXPORT_DIR or tempfile.mkdtemp(prefix="warehouse_export_")
+        os.makedirs(_export_dir, exist_ok=True)
+    return _export_dir
+
+
+def _key(as_of, filters, sort, descending, fmt):
+    as_of = stock_history.as_date(as_of).strftime('%Y-%m-%d')
+    return as_of, filters, sort, bool(descending), fmt, data_version(*TABLES)
+
+
+def _build(job, as_of, filters, sort, descending):
+    # Ghi ra file .part rồi mới đổi tên, để không bao giờ phục vụ file ghi dở
+    partial = job.path + ".part"
+    chunks = repository.iter_stock(as_of, filters, sort, descending)
+    try:
+        for rows in WRITERS[job.fmt](chunks, repository.STOCK_VIEW_COLUMNS, partial):
+            job.rows += rows
+        os.replace(partial, job.path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def _evict():
+    # Giữ EXPORT_CACHE_ENTRIES file gần nhất; file đang ghi thì chưa xóa
+    while len(_jobs) > settings.EXPORT_CACHE_ENTRIES:
+        key = next((key for key, job in _jobs.items() if job.done), None)
+        if key is None:
+            return
+        job = _jobs.pop(key)
+        if os.path.exists(job.path):
+            os.remove(job.path)
+
+
+def find(as_of, filters, sort, descending, fmt):
+    """Lần xuất đã bắt đầu (đang chạy, xong hoặc lỗi) cho đúng bộ lọc này, hoặc None."""
+    with _jobs_lock:
+        return _jobs.get(_key(as_of, filters, sort, descending, fmt))
+
+
+def start(as_of, filters, sort, descending, fmt):
+    """Bắt đầu xuất chạy nền (hoặc trả lại lần xuất đã có nếu chưa lỗi)."""
+    if fmt not in WRITERS:
+        raise ValueError(f"Định dạng xuất không hỗ trợ: {fmt!r}")
+    key = _key(as_of, filters, sort, descending, fmt)
+    total = repository.stock_summary(as_of, filters)['count']
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and job.error is None:
+            _jobs.move_to_end(key)
+            return job
+        job = ExportJob(fmt, total, os.path.join(_directory(), f"{uuid.uuid4().hex}.{fmt}"))
+        _jobs[key] = job
+        _evict()
+    job.future = query_executor.submit(lambda: _build(job, as_of, filters, sort, descending))
+    return job
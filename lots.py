@@ -0,0 +1,158 @@
+"""Lô tồn kho theo FIFO: mỗi lượt nhập tạo một lô, mỗi lượt xuất trừ vào các lô cũ nhất.
+
+Bảng stock_lots chỉ giữ các lô còn hàng (lô hết hàng bị xóa), nên tuổi tồn kho thực tế của
+từng linh kiện là tuổi các lô còn lại chứ không phải ngày nhập gần nhất. `record_movement(...)`
+cập nhật lô trong cùng transaction; xuất FOC không trừ kho nên không trừ lô.
+
+Khi tồn kho bị sửa trực tiếp (trang Quản lý linh kiện) `sync_part(...)` cân lại lô với
+spare_parts.stock. `rebuild_lots(...)` tính lại toàn bộ từ lịch sử nhập (kể cả archive): theo
+FIFO, hàng còn trên kệ là các lượt nhập mới nhất cộng lại bằng tồn kho hiện tại.
+
+    python tools/manage.py rebuild-lots
+"""
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+
+import archive
+from database import read_df
+
+_INSERT_LOT = """
+    INSERT INTO stock_lots (part_id, receipt_id, received_at, quantity, remaining)
+    VALUES (:part_id, :receipt_id, :received_at, :quantity, :remaining)
+"""
+BATCH_SIZE = 10000
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def add_lot(conn, part_id, quantity, received_at=None, receipt_id=None):
+    """Thêm một lô `quantity` đơn vị; `receipt_id` là import_export.id của lượt nhập (None với lô điều chỉnh)."""
+    conn.execute(text(_INSERT_LOT), {
+        "part_id": part_id,
+        "receipt_id": receipt_id,
+        "received_at": received_at or _now(),
+        "quantity": quantity,
+        "remaining": quantity,
+    })
+
+
+def consume_fifo(conn, part_id, quantity):
+    """Trừ `quantity` đơn vị vào các lô cũ nhất của `part_id`; trả về số đơn vị không còn lô để trừ."""
+    lots = conn.execute(text("""
+        SELECT id, remaining FROM stock_lots WHERE part_id = :part_id ORDER BY received_at, id
+    """), {"part_id": part_id}).fetchall()
+    left = quantity
+    for lot_id, remaining in lots:
+        if left <= 0:
+            break
+        if remaining <= left:
+            conn.execute(text("DELETE FROM stock_lots WHERE id = :id"), {"id": lot_id})
+        else:
+            conn.execute(text("UPDATE stock_lots SET remaining = remaining - :q WHERE id = :id"),
+                         {"q": left, "id": lot_id})
+        left -= min(remaining, left)
+    return left
+
+
+def apply_movement(conn, part_id, delta, date, receipt_id):
+    """Cập nhật lô theo thay đổi tồn kho `delta` của một lượt nhập/xuất."""
+    if delta > 0:
+        add_lot(conn, part_id, delta, date, receipt_id)
+    elif delta < 0:
+        consume_fifo(conn, part_id, -delta)
+
+
+def sync_part(conn, part_id):
+    """Cân tổng lô của `part_id` với spare_parts.stock sau khi tồn kho bị sửa trực tiếp:
+    thiếu thì thêm lô điều chỉnh hôm nay, thừa thì trừ vào các lô cũ nhất."""
+    stock, in_lots = conn.execute(text("""
+        SELECT COALESCE(sp.stock, 0),
+               (SELECT COALESCE(SUM(remaining), 0) FROM stock_lots WHERE part_id = sp.id)
+        FROM spare_parts sp WHERE sp.id = :part_id
+    """), {"part_id": part_id}).first() or (0, 0)
+    if stock > in_lots:
+        add_lot(conn, part_id, stock - in_lots)
+    elif stock < in_lots:
+        consume_fifo(conn, part_id, in_lots - stock)
+
+
+def fifo_lots(stock, receipts, fallback_dates) -> pd.DataFrame:
+    """Lô còn lại theo FIFO khi tồn kho hiện tại là `stock` (Series theo part_id): các lượt nhập
+    mới nhất trong `receipts` (cột id, part_id, date, quantity) cộng lại bằng tồn kho. Phần tồn
+    kho không có lượt nhập tương ứng thành một lô điều chỉnh cũ hơn mọi lô còn lại, ghi ngày
+    lượt nhập cũ nhất hoặc `fallback_dates` (Series theo part_id)."""
+    receipts = receipts[receipts['part_id'].isin(stock.index)]
+    receipts = receipts.sort_values(['part_id', 'date', 'id'], ascending=[True, False, False])
+    newer = receipts.groupby('part_id')['quantity'].cumsum() - receipts['quantity']
+    on_hand = receipts['part_id'].map(stock)
+    remaining = (on_hand - newer).clip(lower=0).clip(upper=receipts['quantity'])
+    lots = pd.DataFrame({
+        'part_id': receipts['part_id'],
+        'receipt_id': receipts['id'],
+        'received_at': receipts['date'],
+        'quantity': receipts['quantity'],
+        'remaining': remaining,
+    })[remaining > 0]
+
+    covered = lots.groupby('part_id')['remaining'].sum().reindex(stock.index, fill_value=0)
+    shortfall = (stock - covered)[lambda s: s > 0]
+    oldest = receipts.groupby('part_id')['date'].min()
+    adjustments = pd.DataFrame({
+        'part_id': shortfall.index,
+        'receipt_id': None,
+        'received_at': oldest.reindex(shortfall.index).fillna(fallback_dates.reindex(shortfall.index)).to_numpy(),
+        'quantity': shortfall.to_numpy(),
+        'remaining': shortfall.to_numpy(),
+    })
+    return pd.concat([lots, adjustments], ignore_index=True)
+
+
+def rebuild_lots(conn):
+    """Tính lại toàn bộ stock_lots từ lịch sử nhập và tồn kho hiện tại; trả về số lô."""
+    parts = read_df(conn, "SELECT id AS part_id, stock, import_date FROM spare_parts WHERE stock > 0")
+    stock = parts.set_index('part_id')['stock'].astype("int64")
+    fallback = pd.to_datetime(parts.set_index('part_id')['import_date'], errors="coerce").fillna(pd.Timestamp.now())
+    chunks = list(archive.iter_movements(conn, ["id", "part_id", "date", "quantity"], im_ex_flag=1))
+    receipts = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(
+        {'id': [], 'part_id': [], 'date': pd.Series(dtype="datetime64[ns]"), 'quantity': []})
+    receipts = receipts.dropna(subset=['date'])
+
+    lots = fifo_lots(stock, receipts, fallback)
+    lots['received_at'] = pd.to_datetime(lots['received_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
+    lots = lots.astype({'part_id': "int64", 'quantity': "int64", 'remaining': "int64"}).astype(object)
+    rows = lots.where(lots.notna(), None).to_dict("records")
+
+    conn.execute(text("DELETE FROM stock_lots"))
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(text(_INSERT_LOT), rows[start:start + BATCH_SIZE])
+    return len(rows)
+
+
+def aging_query(today):
+    """(sql, params) số đơn vị còn trên kệ theo tuổi lô 0–30, 31–90, trên 90 ngày và ngày nhập
+    của lô cũ nhất, theo từng linh kiện."""
+    today = pd.Timestamp(today).normalize()
+    return """
+        SELECT part_id,
+               SUM(CASE WHEN received_at >= :d30 THEN remaining ELSE 0 END) AS age_0_30,
+               SUM(CASE WHEN received_at < :d30 AND received_at >= :d90 THEN remaining ELSE 0 END) AS age_31_90,
+               SUM(CASE WHEN received_at < :d90 THEN remaining ELSE 0 END) AS age_90_plus,
+               MIN(received_at) AS oldest_lot
+        FROM stock_lots
+        GROUP BY part_id
+    """, {
+        "d30": (today - pd.Timedelta(days=30)).strftime('%Y-%m-%d'),
+        "d90": (today - pd.Timedelta(days=90)).strftime('%Y-%m-%d'),
+    }
+
+
+def count_aged_parts(conn, days, today=None):
+    """Số linh kiện còn hàng từ lô nhập trên `days` ngày (range scan trên index received_at)."""
+    cutoff = (pd.Timestamp(today or datetime.now()).normalize() - pd.Timedelta(days=days)).strftime('%Y-%m-%d')
+    return conn.execute(text("""
+        SELECT COUNT(DISTINCT part_id) FROM stock_lots WHERE received_at < :cutoff
+    """), {"cutoff": cutoff}).scalar()
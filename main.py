@@ -1,6 +1,8 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import sys
+from database import rerun_connection
+import repository
 
 
 # --- Cấu hình trang ---
@@ -47,6 +49,11 @@ if not st.session_state.authenticated:
     login_page()
     st.stop()
 
+# --- Cảnh báo tồn kho (mọi trang) ---
+alert_count = repository.open_alert_count()
+if alert_count:
+    st.sidebar.markdown(f"🔔 **{alert_count}** linh kiện dưới mức tồn kho an toàn")
+
 # --- MENU chính ---
 menu = st.sidebar.selectbox(
     "",
@@ -63,24 +70,29 @@ if menu != st.session_state.selected_menu:
 
 # --- SUB MENU: Quản lý kho ---
 if menu == "Quản lý kho":
-    sub_menus = ["View Stock", "Import Stock", "Export Stock", "Dashboard"]
+    sub_menus = ["View Stock", "Import Stock", "Export Stock", "Consumption", "Dashboard"]
     for sub in sub_menus:
         if st.sidebar.button(sub, key=sub, type="primary" if st.session_state.selected_sub_menu == sub else "secondary"):
             st.session_state.selected_sub_menu = sub
             st.rerun()
 
-    if st.session_state.selected_sub_menu == "View Stock":
-        from pages.view_stock import show_view_stock
-        show_view_stock()
-    elif st.session_state.selected_sub_menu == "Import Stock":
-        from pages.import_stock import show_material_page
-        show_material_page()
-    elif st.session_state.selected_sub_menu == "Export Stock":
-        from pages.export_stock import show_export_stock
-        show_export_stock()
-    elif st.session_state.selected_sub_menu == "Dashboard":
-        from pages.dashboard import show_dashboard
-        show_dashboard()
+    # Mỗi lần rerun dùng chung một kết nối cho mọi truy vấn đọc của trang
+    with rerun_connection(st.session_state.selected_sub_menu):
+        if st.session_state.selected_sub_menu == "View Stock":
+            from pages.view_stock import show_view_stock
+            show_view_stock()
+        elif st.session_state.selected_sub_menu == "Import Stock":
+            from pages.import_stock import show_material_page
+            show_material_page()
+        elif st.session_state.selected_sub_menu == "Export Stock":
+            from pages.export_stock import show_export_stock
+            show_export_stock()
+        elif st.session_state.selected_sub_menu == "Consumption":
+            from pages.consumption import show_consumption
+            show_consumption()
+        elif st.session_state.selected_sub_menu == "Dashboard":
+            from pages.dashboard import show_dashboard
+            show_dashboard()
 
 # --- SUB MENU: Quản lý hệ thống ---
 elif menu == "Quản lý hệ thống":
@@ -96,21 +108,25 @@ elif menu == "Quản lý hệ thống":
                 st.sidebar.error("❌ Sai mã PIN.")
         st.stop()
 
-    sub_menus = ["Quản lý nhân viên", "Quản lý linh kiện", "Quản lý máy"]
+    sub_menus = ["Quản lý nhân viên", "Quản lý linh kiện", "Quản lý máy", "Giám sát hệ thống"]
     for sub in sub_menus:
         if st.sidebar.button(sub, key=sub, type="primary" if st.session_state.selected_sub_menu == sub else "secondary"):
             st.session_state.selected_sub_menu = sub
             st.rerun()
 
-    if st.session_state.selected_sub_menu == "Quản lý nhân viên":
-        from pages.employees import show_employees
-        show_employees()
-    elif st.session_state.selected_sub_menu == "Quản lý linh kiện":
-        from pages.spare_parts import manage_spare_parts
-        manage_spare_parts()
-    elif st.session_state.selected_sub_menu == "Quản lý máy":
-        from pages.machine import show_machine_page
-        show_machine_page()
+    with rerun_connection(st.session_state.selected_sub_menu):
+        if st.session_state.selected_sub_menu == "Quản lý nhân viên":
+            from pages.employees import show_employees
+            show_employees()
+        elif st.session_state.selected_sub_menu == "Quản lý linh kiện":
+            from pages.spare_parts import manage_spare_parts
+            manage_spare_parts()
+        elif st.session_state.selected_sub_menu == "Quản lý máy":
+            from pages.machine import show_machine_page
+            show_machine_page()
+        elif st.session_state.selected_sub_menu == "Giám sát hệ thống":
+            from pages.db_monitor import show_db_monitor
+            show_db_monitor()
 
     # --- Nút thoát quyền quản lý ---
     st.sidebar.markdown("---")
@@ -120,3 +136,7 @@ elif menu == "Quản lý hệ thống":
         st.session_state.selected_sub_menu = "View Stock"
         
         st.rerun()
+
+# --- Bảng hiệu năng truy vấn của lần tải trang vừa rồi ---
+from pages.query_panel import show_query_panel
+show_query_panel()
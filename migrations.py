@@ -0,0 +1,363 @@
+"""Migration schema có đánh số phiên bản.
+
+Mỗi migration là một hàm `(conn, dialect)` đăng ký bằng `@migration(version, mô_tả)`,
+có thể trả về một dòng ghi chú để in ra khi chạy.
+Phiên bản đã chạy được lưu trong bảng `schema_migrations`. Chạy bằng:
+
+    python tools/manage.py migrate
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+# ---------------------- HÀM HỖ TRỢ ------------------------
+
+def _ensure_version_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER NOT NULL PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """))
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def pending(engine):
+    done = applied_versions(engine)
+    return [(version, description) for version, description, _ in MIGRATIONS if version not in done]
+
+
+def upgrade(engine, target=None, log=print):
+    """Chạy lần lượt các migration chưa áp dụng (đến `target` nếu có)."""
+    done = applied_versions(engine)
+    for version, description, fn in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        log(f"→ {version:03d} {description}")
+        # Lưu ý: trên MySQL các lệnh DDL tự commit nên migration lỗi giữa chừng cần chạy lại;
+        # các hàm hỗ trợ bên dưới đều kiểm tra trước khi tạo nên chạy lại an toàn.
+        with engine.begin() as conn:
+            note = fn(conn, conn.dialect.name)
+            if note:
+                log(f"  {note}")
+            conn.execute(text("""
+                INSERT INTO schema_migrations (version, description, applied_at)
+                VALUES (:version, :description, :applied_at)
+            """), {"version": version, "description": description,
+                   "applied_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+
+
+def has_index(conn, table, name):
+    return any(ix["name"] == name for ix in inspect(conn).get_indexes(table))
+
+
+def create_index(conn, table, name, columns, unique=False):
+    if has_index(conn, table, name):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+def drop_index(conn, table, name):
+    if not has_index(conn, table, name):
+        return
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+
+def _check_unique(conn, table, column):
+    duplicates = conn.execute(text(f"""
+        SELECT {column}, COUNT(*) FROM {table}
+        GROUP BY {column} HAVING COUNT(*) > 1
+    """)).fetchall()
+    if duplicates:
+        sample = ", ".join(str(row[0]) for row in duplicates[:10])
+        raise RuntimeError(f"Không thể tạo unique index: {table}.{column} bị trùng ({sample})")
+
+
+# ---------------------- CÁC MIGRATION ------------------------
+
+@migration(1, "Index cho bộ lọc nhập/xuất theo ngày và unique index cho mã linh kiện, mã nhân viên")
+def _001_lookup_indexes(conn, dialect):
+    # Dashboard lọc WHERE im_ex_flag = ?, các thống kê theo ngày lọc thêm khoảng date;
+    # thêm part_id, quantity để các truy vấn này đọc hết từ index, không phải quay lại bảng
+    create_index(conn, "import_export", "ix_import_export_flag_date",
+                 ["im_ex_flag", "date", "part_id", "quantity"])
+
+    # Mọi lệnh cập nhật tồn kho tìm theo material_no; nhân viên tìm theo amann_id
+    _check_unique(conn, "spare_parts", "material_no")
+    create_index(conn, "spare_parts", "ux_spare_parts_material_no", ["material_no"], unique=True)
+    _check_unique(conn, "employees", "amann_id")
+    create_index(conn, "employees", "ux_employees_amann_id", ["amann_id"], unique=True)
+
+
+@migration(2, "Chuyển import_export.part_id từ material_no sang spare_parts.id")
+def _002_part_id_backfill(conn, dialect):
+    # Các trang trước đây ghi material_no vào part_id. Chỉ đổi dòng mà part_id chưa phải một
+    # spare_parts.id: dòng ghi sau khi code mới chạy (qua part_id_for) đã là id thật, có thể trùng
+    # material_no dạng số của linh kiện khác. So sánh dạng chuỗi để dùng unique index trên material_no.
+    cast = "CHAR" if dialect == "mysql" else "TEXT"
+    ambiguous = conn.execute(text(f"""
+        SELECT COUNT(*) FROM import_export ie
+        JOIN spare_parts sp ON sp.material_no = CAST(ie.part_id AS {cast})
+        WHERE sp.id <> ie.part_id
+          AND EXISTS (SELECT 1 FROM spare_parts s2 WHERE s2.id = ie.part_id)
+    """)).scalar()
+    if dialect == "mysql":
+        updated = conn.execute(text("""
+            UPDATE import_export ie
+            JOIN spare_parts sp ON sp.material_no = CAST(ie.part_id AS CHAR)
+            LEFT JOIN spare_parts s2 ON s2.id = ie.part_id
+            SET ie.part_id = sp.id
+            WHERE s2.id IS NULL
+        """)).rowcount
+    else:
+        updated = conn.execute(text("""
+            UPDATE import_export
+            SET part_id = (SELECT sp.id FROM spare_parts sp
+                           WHERE sp.material_no = CAST(import_export.part_id AS TEXT))
+            WHERE EXISTS (SELECT 1 FROM spare_parts sp
+                          WHERE sp.material_no = CAST(import_export.part_id AS TEXT))
+              AND NOT EXISTS (SELECT 1 FROM spare_parts s2 WHERE s2.id = import_export.part_id)
+        """)).rowcount
+
+    orphans = conn.execute(text("""
+        SELECT COUNT(*) FROM import_export ie
+        LEFT JOIN spare_parts sp ON sp.id = ie.part_id
+        WHERE sp.id IS NULL
+    """)).scalar()
+    note = f"đã đổi {updated} dòng"
+    if ambiguous:
+        note += (f", {ambiguous} dòng có part_id vừa là id vừa trùng material_no của linh kiện khác"
+                 " (giữ nguyên là id, cần kiểm tra tay)")
+    if orphans:
+        note += f", {orphans} dòng không khớp linh kiện nào (giữ nguyên)"
+    return note
+
+
+@migration(3, "Bảng tổng hợp daily_movements theo ngày, linh kiện, nhập/xuất, vị trí máy")
+def _003_daily_movements(conn, dialect):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS daily_movements (
+            day DATE NOT NULL,
+            part_id INTEGER NOT NULL,
+            im_ex_flag SMALLINT NOT NULL,
+            mc_pos_id INTEGER NOT NULL DEFAULT 0,
+            quantity BIGINT NOT NULL,
+            movements INTEGER NOT NULL,
+            PRIMARY KEY (day, part_id, im_ex_flag, mc_pos_id)
+        )
+    """))
+    # Biểu đồ Dashboard đọc theo nhập/xuất trên toàn bộ các ngày
+    create_index(conn, "daily_movements", "ix_daily_movements_flag_day", ["im_ex_flag", "day", "quantity"])
+    # Dữ liệu được tổng hợp ở migration 004 sau khi có đủ các cột
+    return None
+
+
+@migration(4, "Cột stock_delta trong daily_movements và bảng stock_snapshots")
+def _004_stock_snapshots(conn, dialect):
+    from summaries import rebuild_daily_movements
+
+    columns = {c["name"] for c in inspect(conn).get_columns("daily_movements")}
+    if "stock_delta" not in columns:
+        # Thay đổi tồn kho thực tế trong ngày: nhập +, xuất -, xuất FOC không trừ kho
+        conn.execute(text("ALTER TABLE daily_movements ADD COLUMN stock_delta BIGINT NOT NULL DEFAULT 0"))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stock_snapshots (
+            snapshot_date DATE NOT NULL,
+            part_id INTEGER NOT NULL,
+            stock INTEGER NOT NULL,
+            PRIMARY KEY (snapshot_date, part_id)
+        )
+    """))
+    return f"đã tổng hợp {rebuild_daily_movements(conn)} dòng daily_movements"
+
+
+@migration(5, "Bảng movement_archive trỏ tới các file Parquet lưu trữ và index import_export(date)")
+def _005_movement_archive(conn, dialect):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS movement_archive (
+            path VARCHAR(255) NOT NULL PRIMARY KEY,
+            month DATE NOT NULL,
+            row_count INTEGER NOT NULL,
+            min_date DATETIME NOT NULL,
+            max_date DATETIME NOT NULL,
+            archived_at DATETIME NOT NULL
+        )
+    """))
+    create_index(conn, "movement_archive", "ix_movement_archive_dates", ["min_date", "max_date"])
+    # Job lưu trữ đọc và xóa theo từng tháng, không lọc theo nhập/xuất
+    create_index(conn, "import_export", "ix_import_export_date", ["date"])
+
+
+@migration(6, "Chia import_export thành partition theo tháng trên cột date (MySQL)")
+def _006_partition_import_export(conn, dialect):
+    if dialect != "mysql":
+        return "SQLite không hỗ trợ partition, bỏ qua"
+    from partitions import is_partitioned, partition_table
+
+    if is_partitioned(conn):
+        return None
+    # Mọi unique key của bảng có partition phải chứa cột dùng để chia
+    for ix in inspect(conn).get_indexes("import_export"):
+        if ix.get("unique") and "date" not in ix["column_names"]:
+            raise RuntimeError(f"Không thể chia partition: unique index {ix['name']} không chứa cột date")
+    # InnoDB không hỗ trợ khóa ngoại trên bảng có partition; part_id được kiểm tra
+    # khi ghi (movements.part_id_for)
+    for fk in inspect(conn).get_foreign_keys("import_export"):
+        conn.execute(text(f"ALTER TABLE import_export DROP FOREIGN KEY {fk['name']}"))
+    return f"đã tạo {partition_table(conn)} partition theo tháng"
+
+
+@migration(7, "Bảng part_classes lưu nhóm ABC/XYZ của linh kiện")
+def _007_part_classes(conn, dialect):
+    from classification import refresh_part_classes
+
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS part_classes (
+            part_id INTEGER NOT NULL PRIMARY KEY,
+            abc_class CHAR(1) NOT NULL,
+            xyz_class CHAR(1) NOT NULL,
+            consumption_value DOUBLE NOT NULL,
+            demand_cv DOUBLE NULL,
+            updated_at DATETIME NOT NULL
+        )
+    """))
+    # View Stock và Dashboard lọc theo nhóm
+    create_index(conn, "part_classes", "ix_part_classes_abc_xyz", ["abc_class", "xyz_class"])
+    written, _ = refresh_part_classes(conn)
+    return f"đã phân loại {written} linh kiện"
+
+
+@migration(8, "Bảng alerts cho cảnh báo tồn kho dưới mức an toàn")
+def _008_alerts(conn, dialect):
+    from alerts import check_all
+
+    id_column = "id INTEGER PRIMARY KEY AUTOINCREMENT" if dialect == "sqlite" else "id INT NOT NULL AUTO_INCREMENT PRIMARY KEY"
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS alerts (
+            {id_column},
+            part_id INTEGER NOT NULL,
+            kind VARCHAR(32) NOT NULL,
+            active SMALLINT NULL,
+            stock INTEGER NOT NULL,
+            threshold INTEGER NOT NULL,
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL,
+            resolved_at DATETIME NULL
+        )
+    """))
+    # Mỗi linh kiện chỉ có một cảnh báo đang mở cho mỗi loại (active = NULL khi đã đóng)
+    create_index(conn, "alerts", "ux_alerts_open", ["part_id", "kind", "active"], unique=True)
+    # Số cảnh báo đang mở ở sidebar
+    create_index(conn, "alerts", "ix_alerts_active", ["active"])
+    opened, _ = check_all(conn)
+    return f"{opened} linh kiện đang dưới mức tồn kho an toàn"
+
+
+@migration(9, "Bảng stock_lots giữ các lô tồn kho FIFO còn hàng")
+def _009_stock_lots(conn, dialect):
+    from lots import rebuild_lots
+
+    id_column = "id INTEGER PRIMARY KEY AUTOINCREMENT" if dialect == "sqlite" else "id INT NOT NULL AUTO_INCREMENT PRIMARY KEY"
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS stock_lots (
+            {id_column},
+            part_id INTEGER NOT NULL,
+            receipt_id INTEGER NULL,
+            received_at DATETIME NOT NULL,
+            quantity INTEGER NOT NULL,
+            remaining INTEGER NOT NULL
+        )
+    """))
+    # Xuất kho trừ vào lô cũ nhất của linh kiện
+    create_index(conn, "stock_lots", "ix_stock_lots_part_received", ["part_id", "received_at"])
+    # Cảnh báo tồn kho lâu ngày: range scan theo ngày nhập
+    create_index(conn, "stock_lots", "ix_stock_lots_received", ["received_at", "part_id"])
+    return f"đã tạo {rebuild_lots(conn)} lô từ lịch sử nhập kho"
+
+
+@migration(10, "Khối chi phí xuất kho export_costs theo ngày, linh kiện, vị trí máy, bộ phận")
+def _010_export_costs(conn, dialect):
+    from summaries import rebuild_daily_movements, rebuild_export_costs
+
+    note = []
+    if dialect == "sqlite":
+        # Dữ liệu mẫu cũ ghi tên vị trí (mc_pos) thay cho machine_pos.id; chỉ đổi khi tên là duy nhất
+        updated = conn.execute(text("""
+            UPDATE import_export
+            SET mc_pos_id = (SELECT mp.id FROM machine_pos mp WHERE mp.mc_pos = import_export.mc_pos_id)
+            WHERE typeof(mc_pos_id) = 'text'
+              AND (SELECT COUNT(*) FROM machine_pos mp WHERE mp.mc_pos = import_export.mc_pos_id) = 1
+        """)).rowcount
+        left = conn.execute(text("SELECT COUNT(*) FROM import_export WHERE typeof(mc_pos_id) = 'text'")).scalar()
+        if updated:
+            rebuild_daily_movements(conn)
+            note.append(f"đã đổi mc_pos_id của {updated} dòng sang machine_pos.id")
+        if left:
+            note.append(f"{left} dòng có mc_pos_id không khớp vị trí máy nào (giữ nguyên)")
+
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS export_costs (
+            day DATE NOT NULL,
+            part_id INTEGER NOT NULL,
+            mc_pos_id INTEGER NOT NULL DEFAULT 0,
+            dept_id INTEGER NOT NULL DEFAULT 0,
+            quantity BIGINT NOT NULL,
+            cost DOUBLE NOT NULL,
+            movements INTEGER NOT NULL,
+            PRIMARY KEY (day, part_id, mc_pos_id, dept_id)
+        )
+    """))
+    # Lọc theo bộ phận hoặc linh kiện trong một khoảng ngày
+    create_index(conn, "export_costs", "ix_export_costs_dept_day", ["dept_id", "day", "cost"])
+    create_index(conn, "export_costs", "ix_export_costs_part_day", ["part_id", "day", "cost"])
+    note.append(f"đã tổng hợp {rebuild_export_costs(conn)} dòng export_costs")
+    return ", ".join(note)
+
+
+@migration(11, "Bảng position_costs: chi phí xuất kho theo ngày, vị trí máy, bộ phận")
+def _011_position_costs(conn, dialect):
+    from summaries import rebuild_position_costs
+
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS position_costs (
+            day DATE NOT NULL,
+            mc_pos_id INTEGER NOT NULL DEFAULT 0,
+            dept_id INTEGER NOT NULL DEFAULT 0,
+            quantity BIGINT NOT NULL,
+            cost DOUBLE NOT NULL,
+            movements INTEGER NOT NULL,
+            PRIMARY KEY (day, mc_pos_id, dept_id)
+        )
+    """))
+    return f"đã tổng hợp {rebuild_position_costs(conn)} dòng position_costs"
+
+
+@migration(12, "Bảng data_versions: version dữ liệu dùng chung để mọi tiến trình làm mới cache")
+def _012_data_versions(conn, dialect):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name VARCHAR(64) NOT NULL PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """))
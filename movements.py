@@ -0,0 +1,84 @@
+"""Ghi lượt nhập/xuất kho vào bảng import_export.
+
+Mọi trang ghi lịch sử nhập/xuất qua `record_movement(...)` với `part_id` là
+`spare_parts.id` (khóa số nguyên có index) chứ không phải chuỗi material_no;
+`part_id_for(...)` tra material_no -> id qua cache trong tiến trình. Lô tồn kho FIFO
+(`lots.py`) và cảnh báo tồn kho dưới mức an toàn (`alerts.py`) được cập nhật ngay trong
+transaction ghi.
+"""
+import threading
+from datetime import datetime
+
+from sqlalchemy import text
+
+import alerts
+import lots
+from database import data_version, read_scalar
+from summaries import FOC_REASON, add_daily_movement, add_export_cost
+
+IMPORT = 1
+EXPORT = 0
+
+# Cache material_no -> spare_parts.id trong tiến trình. Bị xóa mỗi khi data version của
+# spare_parts thay đổi (thêm/sửa/xóa linh kiện qua write_transaction("spare_parts")).
+_part_ids = {}
+_part_ids_version = None
+_part_ids_lock = threading.Lock()
+
+
+def part_id_for(conn, material_no):
+    """spare_parts.id của `material_no`; KeyError nếu không có linh kiện này."""
+    global _part_ids_version
+    version = data_version("spare_parts")
+    with _part_ids_lock:
+        if version != _part_ids_version:
+            _part_ids.clear()
+            _part_ids_version = version
+        part_id = _part_ids.get(material_no)
+    if part_id is not None:
+        return part_id
+
+    part_id = read_scalar(conn, "SELECT id FROM spare_parts WHERE material_no = :material_no",
+                          {"material_no": material_no})
+    if part_id is None:
+        raise KeyError(material_no)
+    with _part_ids_lock:
+        if _part_ids_version == version:
+            _part_ids[material_no] = part_id
+    return part_id
+
+
+def stock_delta(im_ex_flag, quantity, reason):
+    """Thay đổi tồn kho của một lượt nhập/xuất (xuất FOC không trừ kho)."""
+    if im_ex_flag:
+        return quantity
+    return 0 if reason == FOC_REASON else -quantity
+
+
+def record_movement(conn, part_id, quantity, im_ex_flag, empl_id, reason, mc_pos_id=None, date=None):
+    """Thêm một dòng import_export, cộng vào các bảng tổng hợp (theo ngày, chi phí xuất), cập nhật
+    lô FIFO và đánh giá cảnh báo tồn kho trong cùng transaction. `part_id` là spare_parts.id, lấy từ
+    `part_id_for(...)` hoặc từ lastrowid khi vừa thêm linh kiện mới trong cùng transaction.
+    Gọi sau khi đã cập nhật spare_parts.stock để cảnh báo dùng tồn kho mới."""
+    part_id = int(part_id)
+    quantity = int(quantity)
+    mc_pos_id = None if mc_pos_id is None else int(mc_pos_id)
+    date = date or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    result = conn.execute(text("""
+        INSERT INTO import_export (part_id, quantity, mc_pos_id, empl_id, date, reason, im_ex_flag)
+        VALUES (:part_id, :quantity, :mc_pos_id, :empl_id, :date, :reason, :im_ex_flag)
+    """), {
+        "part_id": part_id,
+        "quantity": quantity,
+        "mc_pos_id": mc_pos_id,
+        "empl_id": empl_id,
+        "date": date,
+        "reason": reason,
+        "im_ex_flag": im_ex_flag,
+    })
+    delta = stock_delta(im_ex_flag, quantity, reason)
+    add_daily_movement(conn, date, part_id, im_ex_flag, mc_pos_id, quantity, delta)
+    if im_ex_flag == EXPORT:
+        add_export_cost(conn, date, part_id, mc_pos_id, quantity)
+    lots.apply_movement(conn, part_id, delta, date, result.lastrowid)
+    alerts.check_part(conn, part_id)
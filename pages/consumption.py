@@ -0,0 +1,58 @@
+import streamlit as st
+import altair as alt
+from datetime import date, timedelta
+import repository
+from rollups import CONSUMPTION_LEVELS, children, node
+
+# Tên hiển thị của từng cấp trong cây bộ phận → nhóm máy → máy → vị trí máy
+LEVEL_TITLES = ["Bộ phận", "Nhóm máy", "Máy", "Vị trí máy"]
+
+def show_consumption():
+    st.markdown("<h1 style='text-align: center;'>🏭 Consumption by Machine</h1>", unsafe_allow_html=True)
+
+    period = st.date_input("📅 Khoảng thời gian", (date.today() - timedelta(days=89), date.today()),
+                           max_value=date.today())
+    start, end = period[0], period[-1]
+    table = repository.consumption_rollup(start, end)
+
+    if table.empty or not table['quantity'].sum():
+        st.info("Không có lượt xuất kho nào trong khoảng thời gian này.")
+        return
+
+    # ====== Drill-down: chọn lần lượt bộ phận, nhóm máy, máy ======
+    path = []
+    cols = st.columns(len(CONSUMPTION_LEVELS) - 1)
+    for depth, col in enumerate(cols):
+        options = children(table, CONSUMPTION_LEVELS, path)
+        key, label = CONSUMPTION_LEVELS[depth]
+        with col:
+            choice = st.selectbox(LEVEL_TITLES[depth], ["Tất cả"] + options[label].tolist(), key=f"consumption_{key}")
+        if choice == "Tất cả":
+            break
+        path.append(options.loc[options[label] == choice, key].iloc[0])
+
+    current = node(table, CONSUMPTION_LEVELS, path)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Số lượng xuất", f"{current['quantity']:,.0f}")
+    col2.metric("Chi phí (VND)", f"{current['cost']:,.0f}")
+    col3.metric("Số lượt xuất", f"{current['movements']:,.0f}")
+
+    # ====== Các nút con của lựa chọn hiện tại ======
+    key, label = CONSUMPTION_LEVELS[len(path)]
+    detail = children(table, CONSUMPTION_LEVELS, path).sort_values('cost', ascending=False)
+    detail = detail.assign(share=detail['cost'] / current['cost'] * 100 if current['cost'] else 0)
+    st.subheader(f"📊 Chi phí theo {LEVEL_TITLES[len(path)].lower()}")
+
+    chart = alt.Chart(detail.head(20)).mark_bar().encode(
+        x=alt.X('cost:Q', title='Chi phí (VND)'),
+        y=alt.Y(f'{label}:N', sort='-x', title=LEVEL_TITLES[len(path)]),
+        tooltip=[label, 'quantity', alt.Tooltip('cost:Q', format=',.0f')],
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    st.dataframe(detail[[label, 'quantity', 'cost', 'share', 'movements']], hide_index=True, use_container_width=True,
+                 column_config={label: LEVEL_TITLES[len(path)],
+                                'quantity': 'Số lượng',
+                                'cost': st.column_config.NumberColumn('Chi phí (VND)', format="%.0f"),
+                                'share': st.column_config.NumberColumn('Tỷ trọng', format="%.1f%%"),
+                                'movements': 'Số lượt xuất'})
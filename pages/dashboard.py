@@ -1,21 +1,27 @@
 import streamlit as st
-import pandas as pd
+from datetime import date, timedelta
 import altair as alt
-from database import get_engine
+import repository
+
+# Kỳ gộp -> (tên hiển thị, timeUnit của Altair, định dạng ngày trên trục)
+ROLLUP_DISPLAY = {
+    "day": ("ngày", "yearmonthdate", "%d/%m/%Y"),
+    "week": ("tuần", "yearweek", "%d/%m/%Y"),
+    "month": ("tháng", "yearmonth", "%m/%Y"),
+    "year": ("năm", "year", "%Y"),
+}
 
 def show_dashboard():
     st.markdown("<h1 style='text-align: center;'>Warehouse Dashboard</h1>", unsafe_allow_html=True)
 
-    engine = get_engine()
-    with engine.begin() as conn:
-        df_stock = pd.read_sql("SELECT material_no, description, stock, price, safety_stock FROM spare_parts", conn)
-        total_import = pd.read_sql("SELECT SUM(quantity) AS total_import FROM import_export WHERE im_ex_flag = 1", conn).iloc[0]['total_import']
-        total_export = pd.read_sql("SELECT SUM(quantity) AS total_export FROM import_export WHERE im_ex_flag = 0", conn).iloc[0]['total_export']
+    as_of = st.date_input("📅 Số liệu tính đến ngày", date.today(), max_value=date.today())
+    abc_classes = st.multiselect("🏷️ Nhóm ABC", ["A", "B", "C"], placeholder="Tất cả linh kiện")
 
-    total_items_in_stock = int(df_stock['stock'].sum())
-    total_import = int(total_import) if total_import is not None else 0
-    total_export = int(total_export) if total_export is not None else 0
-    total_value_in_stock = (df_stock['stock'] * df_stock['price']).sum()
+    kpis = repository.dashboard_kpis(as_of, abc_classes)
+    total_items_in_stock = kpis['total_items']
+    total_value_in_stock = kpis['total_value']
+    total_import = kpis['total_import']
+    total_export = kpis['total_export']
 
     col1, col2, col3, col4 = st.columns(4)
 
@@ -56,58 +62,38 @@ def show_dashboard():
         """, unsafe_allow_html=True)
 
     st.markdown("<h3 style='text-align: center;'>Stock Overview</h3>", unsafe_allow_html=True)
-    stock_overview = df_stock.groupby('description').agg({'stock': 'sum'}).reset_index()
-    stock_overview = stock_overview.sort_values('stock', ascending=False)
-    chart_stock = alt.Chart(stock_overview).mark_bar().encode(
+    chart_stock = alt.Chart(kpis['stock_overview']).mark_bar().encode(
         x=alt.X('description:N', sort='-y'),
         y='stock:Q',
         tooltip=['description', 'stock']
     ).properties(width=800, height=400)
     st.altair_chart(chart_stock, use_container_width=True)
 
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.markdown("<h3 style='text-align: center;'>Nhập kho theo ngày</h3>", unsafe_allow_html=True)
-        with engine.begin() as conn:
-            df_import_history = pd.read_sql("SELECT date, quantity FROM import_export WHERE im_ex_flag = 1", conn)
-
-        df_import_history['date'] = pd.to_datetime(df_import_history['date']).dt.date
-        daily_imports = df_import_history.groupby('date')['quantity'].sum().reset_index()
-        daily_imports = daily_imports.sort_values('date')
-        daily_imports['date'] = daily_imports['date'].apply(lambda x: x.strftime('%d/%m/%Y'))
-
-        chart_imports = alt.Chart(daily_imports).mark_bar(color="#4C78A8", cornerRadius=5).encode(
-            x=alt.X('date:N', title='Ngày', axis=alt.Axis(labelAngle=0)),
-            y=alt.Y('quantity:Q', title='Số lượng nhập'),
-            tooltip=['date:N', 'quantity:Q']
-        ).properties(width=350, height=500)
-
-        st.altair_chart(chart_imports, use_container_width=True)
+    # Biểu đồ nhập/xuất: gộp theo ngày/tuần/tháng/năm tùy độ dài khoảng thời gian
+    period = st.date_input("📆 Khoảng thời gian", (as_of - timedelta(days=89), as_of), max_value=as_of)
+    start, end = period[0], period[-1]
+    grain, history = repository.movement_history(start, end, abc_classes=abc_classes)
+    label, time_unit, date_format = ROLLUP_DISPLAY[grain]
 
-    with col2:
-        st.markdown("<h3 style='text-align: center;'>Xuất kho theo ngày</h3>", unsafe_allow_html=True)
-        with engine.begin() as conn:
-            df_export_history = pd.read_sql("SELECT date, quantity FROM import_export WHERE im_ex_flag = 0", conn)
-
-        df_export_history['date'] = pd.to_datetime(df_export_history['date']).dt.date
-        daily_exports = df_export_history.groupby('date')['quantity'].sum().reset_index()
-        daily_exports = daily_exports.sort_values('date')
-        daily_exports['date'] = daily_exports['date'].apply(lambda x: x.strftime('%d/%m/%Y'))
-
-        chart_exports = alt.Chart(daily_exports).mark_bar(color="#F58518", cornerRadius=5).encode(
-            x=alt.X('date:N', title='Ngày', axis=alt.Axis(labelAngle=0)),
-            y=alt.Y('quantity:Q', title='Số lượng xuất'), 
-            tooltip=['date:N', 'quantity:Q']
-        ).properties(width=350, height=500)
+    col1, col2 = st.columns(2)
 
-        st.altair_chart(chart_exports, use_container_width=True)
+    charts = (
+        (col1, 1, "Nhập kho", "Số lượng nhập", "#4C78A8"),
+        (col2, 0, "Xuất kho", "Số lượng xuất", "#F58518"),
+    )
+    for col, flag, title, y_title, color in charts:
+        with col:
+            st.markdown(f"<h3 style='text-align: center;'>{title} theo {label}</h3>", unsafe_allow_html=True)
+            chart = alt.Chart(history[history['im_ex_flag'] == flag]).mark_bar(color=color, cornerRadius=5).encode(
+                x=alt.X('date:T', timeUnit=time_unit, title=label.capitalize(), axis=alt.Axis(format=date_format)),
+                y=alt.Y('quantity:Q', title=y_title),
+                tooltip=[alt.Tooltip('date:T', title=label.capitalize(), format=date_format), 'quantity:Q']
+            ).properties(width=350, height=500)
+
+            st.altair_chart(chart, use_container_width=True)
 
     st.markdown("<h3 style='text-align: center;'>Top 10 phụ tùng có giá trị tồn kho cao nhất</h3>", unsafe_allow_html=True)
-    df_stock['total_value'] = df_stock['stock'] * df_stock['price']
-    top10_value = df_stock.sort_values('total_value', ascending=False).head(10)
-
-    chart_top10_vertical = alt.Chart(top10_value).mark_bar(
+    chart_top10_vertical = alt.Chart(kpis['top_value']).mark_bar(
         cornerRadiusTopLeft=6,
         cornerRadiusTopRight=6,
         color=alt.Gradient(
@@ -126,4 +112,24 @@ def show_dashboard():
         ]
     ).properties(width=800, height=400)
 
-    st.altair_chart(chart_top10_vertical, use_container_width=True)   
\ No newline at end of file
+    st.altair_chart(chart_top10_vertical, use_container_width=True)   
+
+    # Ma trận ABC × XYZ: số linh kiện và giá trị tiêu thụ mỗi ô
+    matrix = repository.class_matrix()
+    if not matrix.empty:
+        st.markdown("<h3 style='text-align: center;'>Phân loại ABC / XYZ</h3>", unsafe_allow_html=True)
+        chart_classes = alt.Chart(matrix).mark_rect(cornerRadius=4).encode(
+            x=alt.X('xyz_class:N', title='XYZ (độ biến động tiêu thụ)'),
+            y=alt.Y('abc_class:N', title='ABC (giá trị tiêu thụ)'),
+            color=alt.Color('consumption_value:Q', title='Giá trị tiêu thụ', scale=alt.Scale(scheme='blues')),
+            tooltip=[
+                alt.Tooltip('abc_class:N', title='ABC'),
+                alt.Tooltip('xyz_class:N', title='XYZ'),
+                alt.Tooltip('parts:Q', title='Số linh kiện'),
+                alt.Tooltip('consumption_value:Q', title='Giá trị tiêu thụ', format=",.0f")
+            ]
+        ).properties(width=400, height=300)
+        labels = alt.Chart(matrix).mark_text(fontSize=16).encode(
+            x='xyz_class:N', y='abc_class:N', text='parts:Q'
+        )
+        st.altair_chart(chart_classes + labels, use_container_width=True)
@@ -0,0 +1,42 @@
+import streamlit as st
+import settings
+from database import get_engine, get_read_engine, has_replica, pool_status
+
+def show_db_monitor():
+    st.markdown("<h1 style='text-align: center;'>Giám sát cơ sở dữ liệu</h1>", unsafe_allow_html=True)
+
+    # ====== Bộ đếm connection pool ======
+    engines = [("🔌 Connection pool (primary)", get_engine())]
+    if has_replica():
+        engines.append(("🔌 Connection pool (replica chỉ đọc)", get_read_engine()))
+
+    for title, engine in engines:
+        st.subheader(title)
+        status = pool_status(engine)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Đang sử dụng", status["checked_out"])
+        col2.metric("Sẵn sàng trong pool", status["checked_in"])
+        col3.metric("Overflow", f"{status['overflow']} / {status['max_overflow']}")
+        col4.metric("Pool size", status["pool_size"])
+
+        if "checkouts" in status:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Tổng số checkout", status["checkouts"])
+            col2.metric("Chờ trung bình", f"{status['avg_wait_ms']:.2f} ms")
+            col3.metric("Chờ lâu nhất", f"{status['max_wait_ms']:.2f} ms")
+            col4.metric("Checkout timeout", status["checkout_timeouts"])
+
+    # ====== Cấu hình hiện tại ======
+    with st.expander("⚙️ Cấu hình pool"):
+        st.write({
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "pool_recycle (s)": settings.DB_POOL_RECYCLE,
+            "pool_timeout (s)": settings.DB_POOL_TIMEOUT,
+            "read_your_writes (s)": settings.READ_YOUR_WRITES_SECONDS,
+        })
+
+    if st.button("🔄 Làm mới"):
+        st.rerun()
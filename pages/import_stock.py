@@ -1,61 +1,29 @@
-import pandas as pd
 import streamlit as st
 from sqlalchemy import text
-from database import get_engine
+from database import write_transaction
+import alerts
+import query_executor
+import repository
+import search
+from movements import IMPORT, part_id_for, record_movement
 from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# ---------------------- TẢI DỮ LIỆU TỪ DATABASE ------------------------
-
-def load_machine_types(engine):
-    query = "SELECT id, machine FROM machine_type"
-    return pd.read_sql_query(text(query), engine)
-
-def load_spare_parts(engine):
-    query = """
-        SELECT sp.material_no, sp.description, mt.machine, sp.part_no, sp.bin, sp.cost_center,
-               sp.price, sp.stock, sp.safety_stock, sp.safety_stock_check
-        FROM spare_parts sp
-        JOIN machine_type mt ON sp.machine_type_id = mt.id
-    """
-    return pd.read_sql_query(text(query), engine)
-
-def load_employees(engine):
-    query = "SELECT amann_id, name FROM employees"
-    return pd.read_sql_query(text(query), engine)
-
-def load_import_stock_data(engine):
-    query = """
-    SELECT DATE(ie.date) AS import_date, sp.material_no, SUM(ie.quantity) AS total_quantity_imported
-    FROM import_export ie
-    JOIN spare_parts sp ON ie.part_id = sp.material_no
-    WHERE ie.im_ex_flag = 1
-    GROUP BY DATE(ie.date), sp.material_no
-    """
-    return pd.read_sql_query(text(query), engine)
-
 # ---------------------- GIAO DIỆN TRANG VẬT LIỆU ------------------------
 
 def show_material_page():
     st.markdown("<h1 style='text-align: center;'>Import Stock</h1>", unsafe_allow_html=True)
-    engine = get_engine()
-
-    spare_parts = load_spare_parts(engine)
-    machine_types = load_machine_types(engine)
-    employees = load_employees(engine)
-    import_stock_data = load_import_stock_data(engine)
 
-    def plot_import_chart(import_stock_data):
-        import_stock_data = import_stock_data[import_stock_data['total_quantity_imported'] > 0]
+    spare_parts, machine_types, employees = query_executor.gather(
+        repository.spare_parts, repository.machine_types, repository.employees)
 
+    def plot_import_chart():
         selected_date = st.date_input("📅 Chọn ngày để xem thống kê nhập kho", datetime.today())
 
-        # Đảm bảo định dạng ngày đúng
-        import_stock_data['import_date'] = pd.to_datetime(import_stock_data['import_date'])
-        
-        # Lọc theo ngày (không so sánh giờ phút)
-        filtered_data = import_stock_data[import_stock_data['import_date'].dt.date == selected_date]
+        # Chỉ lấy dữ liệu nhập kho của ngày đã chọn
+        filtered_data = repository.import_stats(selected_date)
+        filtered_data = filtered_data[filtered_data['total_quantity_imported'] > 0]
 
         total_stock = filtered_data['total_quantity_imported'].sum() if not filtered_data.empty else 0
 
@@ -105,7 +73,7 @@ def show_material_page():
 
 
     # Gọi hàm
-    plot_import_chart(import_stock_data)
+    plot_import_chart()
     st.markdown("---")
 
     col1, col2 = st.columns(2)
@@ -142,8 +110,8 @@ def show_material_page():
                     empl_id = selected_employee.split(" - ")[0]
                     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-                    with engine.begin() as conn:
-                        conn.execute(text(""" 
+                    with write_transaction("spare_parts", "import_export", search.CATALOG) as conn:
+                        result = conn.execute(text(""" 
                             INSERT INTO spare_parts 
                             (material_no, description, part_no, machine_type_id, bin, cost_center, price, stock, 
                              safety_stock, safety_stock_check, import_date) 
@@ -165,15 +133,10 @@ def show_material_page():
 
                         # Ghi nhận lịch sử nhập kho ban đầu
                         if new_stock > 0:
-                            conn.execute(text("""
-                                INSERT INTO import_export (part_id, quantity, mc_pos_id, empl_id, date, reason, im_ex_flag)
-                                VALUES (:part_id, :quantity, NULL, :empl_id, :date, 'Thêm vật liệu mới', 1)
-                            """), {
-                                "part_id": new_material_no,
-                                "quantity": new_stock,
-                                "empl_id": empl_id,
-                                "date": current_time
-                            })
+                            record_movement(conn, result.lastrowid, new_stock, IMPORT, empl_id,
+                                            'Thêm vật liệu mới', date=current_time)
+                        else:
+                            alerts.check_part(conn, result.lastrowid)
 
                     st.success(f"✅ Đã thêm vật liệu {new_material_no} và cập nhật lịch sử nhập kho.")
                     st.rerun()
@@ -185,10 +148,7 @@ def show_material_page():
         st.subheader("Nhập kho linh kiện")
         with st.expander("Form nhập kho"):
             keyword = st.text_input("Tìm kiếm linh kiện (Material No hoặc Description)")
-            filtered = spare_parts[
-                spare_parts['material_no'].str.contains(keyword, case=False, na=False) |
-                spare_parts['description'].str.contains(keyword, case=False, na=False)
-            ] if keyword else spare_parts
+            filtered = search.filter_frame(spare_parts, keyword)
 
             if not filtered.empty:
                 part_options = filtered.apply(lambda x: f"{x['part_no']} - {x['material_no']} - {x['description']}", axis=1).tolist()
@@ -206,30 +166,24 @@ def show_material_page():
 
             if st.button("📥 Xác nhận nhập kho"):
                 if selected_part:
-                    part_id = selected_part.split(" - ")[1]  # material_no
+                    material_no = selected_part.split(" - ")[1]
                     empl_id = import_employee.split(" - ")[0]
                     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-                    with engine.begin() as conn:
-                        conn.execute(text(""" 
-                            INSERT INTO import_export (part_id, quantity, mc_pos_id, empl_id, date, reason, im_ex_flag)
-                            VALUES (:part_id, :quantity, NULL, :empl_id, :date, 'Nhập kho', 1)
-                        """), {
-                            "part_id": part_id,
-                            "quantity": quantity,
-                            "empl_id": empl_id,
-                            "date": current_time
-                        })
-
+                    with write_transaction("spare_parts", "import_export") as conn:
+                        part_id = part_id_for(conn, material_no)
                         conn.execute(text(""" 
                             UPDATE spare_parts 
                             SET stock = stock + :quantity, import_date = :import_date 
-                            WHERE material_no = :part_id
+                            WHERE id = :part_id
                         """), {
                             "quantity": quantity,
                             "part_id": part_id,
                             "import_date": current_time
                         })
 
+                        # Ghi lịch sử sau khi cộng kho để cảnh báo tồn kho dùng số mới
+                        record_movement(conn, part_id, quantity, IMPORT, empl_id, 'Nhập kho', date=current_time)
+
                     st.success("✅ Nhập kho thành công.")
                     st.rerun()
@@ -3,38 +3,15 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.express as px
 from sqlalchemy import text
-from database import get_engine
-
-def load_machines(engine, selected_group, selected_pos, search_name):
-    query = """
-    SELECT m.name AS machine_name, g.mc_name AS group_mc_name,
-           mp.mc_pos AS machine_pos
-    FROM machine m
-    JOIN group_mc g ON m.group_mc_id = g.id
-    LEFT JOIN machine_pos mp ON m.group_mc_id = mp.mc_id
-    WHERE (:group_name = 'Tất cả' OR g.mc_name = :group_name)
-      AND (:pos = 'Tất cả' OR mp.mc_pos = :pos)
-      AND (:search_name = '' OR m.name LIKE :search_name)
-    ORDER BY m.name DESC
-    LIMIT 1000
-    """
-    df = pd.read_sql_query(text(query), engine, params={
-        "group_name": selected_group,
-        "pos": selected_pos,
-        "search_name": f"%{search_name}%"
-    })
-    return df
+from database import write_transaction
+import repository
 
 def show_machine_page():
     st.markdown("<h1 style='text-align: center;'>🔧 Machine Management</h1>", unsafe_allow_html=True)
-    engine = get_engine()
 
-    with engine.connect() as conn:
-        group_list = conn.execute(text("SELECT mc_name FROM group_mc")).scalars().all()
-        pos_list = conn.execute(text("SELECT DISTINCT mc_pos FROM machine_pos WHERE mc_pos IS NOT NULL")).scalars().all()
-
-        group_data = conn.execute(text("SELECT id, mc_name FROM group_mc")).fetchall()
-        group_name_to_id = {g.mc_name: g.id for g in group_data}
+    groups = repository.machine_groups()
+    group_list = groups['mc_name'].tolist()
+    group_name_to_id = dict(zip(groups['mc_name'].tolist(), groups['id'].tolist()))
 
     # ======== State mặc định ========
     if 'search_name' not in st.session_state:
@@ -57,7 +34,7 @@ def show_machine_page():
         st.session_state.reload_machines = False
 
     # ======== Lấy danh sách máy ========
-    df = load_machines(engine, selected_group, "Tất cả", search_name)
+    df = repository.machines(selected_group, "Tất cả", search_name)
 
     st.subheader("📋 Danh sách máy")
     if not df.empty:
@@ -100,7 +77,7 @@ def show_machine_page():
                 st.warning("⚠️ Vui lòng nhập đầy đủ tên máy và vị trí.")
             else:
                 try:
-                    with engine.begin() as conn:
+                    with write_transaction("machine", "machine_pos") as conn:
                         group_id = group_name_to_id[selected_group_new]
                         dept_id_default = 1
 
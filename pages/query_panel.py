@@ -0,0 +1,23 @@
+import streamlit as st
+import pandas as pd
+import query_stats
+
+def show_query_panel():
+    log = query_stats.last_log()
+
+    with st.sidebar.expander("⏱️ Hiệu năng truy vấn", expanded=False):
+        if log is None or not log.records:
+            st.caption("Chưa có truy vấn nào trong lần tải trang này.")
+        else:
+            st.markdown(f"**{log.page}**: {len(log.records)} truy vấn, {log.total_ms():.1f} ms")
+            df = pd.DataFrame(log.records)[["elapsed_ms", "rows", "bytes", "sql"]]
+            # Truy vấn không đọc qua read_df/read_rows (SQLite trả rowcount -1 cho SELECT) thì không rõ số dòng
+            for column in ("rows", "bytes"):
+                df[column] = df[column].map(lambda value: "n/a" if pd.isna(value) else f"{int(value):,}")
+            st.dataframe(df.sort_values("elapsed_ms", ascending=False), hide_index=True, use_container_width=True)
+
+        # Trang nào tốn thời gian truy vấn nhất gần đây
+        summary = query_stats.page_summary()
+        if summary:
+            st.markdown("**Theo trang (gần đây)**")
+            st.dataframe(pd.DataFrame(summary), hide_index=True, use_container_width=True)
@@ -1,112 +1,172 @@
 import streamlit as st
 import pandas as pd
-import io
-from database import get_engine
+import math
+from datetime import date
+import exports
+import repository
+import settings
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
 from st_aggrid.shared import JsCode
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Cột có thể sắp xếp trên lưới (sắp xếp chạy trong SQL, xem repository.STOCK_SORT_COLUMNS)
+SORT_LABELS = {
+    "material_no": "Material No",
+    "part_no": "Part No",
+    "description": "Description",
+    "machine_type": "Machine Type",
+    "bin": "Bin",
+    "cost_center": "Cost Center",
+    "price": "Price",
+    "stock": "Stock",
+    "safety_stock": "Safety Stock",
+    "import_date": "Import Date",
+}
+PAGE_SIZES = [25, 50, 100, 200]
+
+
+def _export_progress(job):
+    if job.done:
+        st.rerun()  # chạy lại cả trang để hiện nút tải
+    st.progress(job.progress, text=f"⏳ Đang xuất {job.rows:,}/{job.total:,} dòng...")
+
+
+def show_export(as_of, filters, sort, descending):
+    """Xuất toàn bộ các dòng khớp bộ lọc ra file; chỉ tạo khi bấm nút và chạy nền (xem exports.py)."""
+    col_format, col_button = st.columns([2, 1])
+    with col_format:
+        fmt = st.selectbox("Định dạng file", list(exports.FORMATS), format_func=lambda f: exports.FORMATS[f][0])
+    job = exports.find(as_of, filters, sort, descending, fmt)
+    with col_button:
+        if st.button("📤 Tạo file", disabled=job is not None and job.error is None):
+            job = exports.start(as_of, filters, sort, descending, fmt)
+            job.wait(1)  # file nhỏ thường xong ngay, khỏi chờ lượt cập nhật tiến độ
+
+    if job is None:
+        return
+    if not job.done:
+        st.fragment(_export_progress, run_every=1)(job)
+    elif job.error is not None:
+        st.error(f"❌ Xuất file lỗi: {job.error}")
+    else:
+        with open(job.path, "rb") as f:
+            st.download_button(f"📥 Download {exports.FORMATS[fmt][0]}", f, file_name=job.file_name,
+                               mime=job.mime, on_click="ignore")
+
 def show_view_stock():
     st.markdown("<h1 style='text-align: center;'>View Stock</h1>", unsafe_allow_html=True)
 
-    # Kết nối cơ sở dữ liệu
-    engine = get_engine()
-    with engine.begin() as conn:
-        df_stock = pd.read_sql(''' 
-        SELECT 
-            sp.material_no, sp.part_no, sp.description, 
-            mt.machine AS machine_type, 
-            sp.bin, sp.cost_center, 
-            sp.price, sp.stock, sp.safety_stock, 
-            sp.safety_stock_check, sp.image_url,
-            sp.import_date, sp.export_date,
-            DATEDIFF(IFNULL(sp.export_date, CURDATE()), sp.import_date) AS storage_days
-        FROM spare_parts sp
-        JOIN machine_type mt ON sp.machine_type_id = mt.id
-        ''', conn)
-        
-        # Tính tổng tồn kho và tổng giá trị của tồn kho
-        total_stock = int(df_stock['stock'].sum())
-        total_value = int((df_stock['stock'] * df_stock['price']).sum())
-
-        col1, col2 = st.columns(2)
-
-        # Hiển thị tổng tồn kho và giá trị tồn kho
-        with col1:
-            st.markdown(
-                f"""
-                <div style="border:1px solid #ccc; border-radius:7px; padding:5px; text-align:center; background-color:#008080;">
-                    <h4>Total Stock</h4>
-                    <p style="font-size:24px; font-weight:bold;">{total_stock}</p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+    st.sidebar.header("Lọc Dữ Liệu")
+    as_of = st.sidebar.date_input("📅 Tồn kho tại ngày", date.today(), max_value=date.today())
 
-        with col2:
-            st.markdown(
-                f"""
-                <div style="border:1px solid #ccc; border-radius:7px; padding:5px; text-align:center; background-color:#008080;">
-                    <h4>Total Value</h4>
-                    <p style="font-size:24px; font-weight:bold;">{total_value:,.0f} đ</p>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
+    # Tổng tồn kho và tổng giá trị của toàn bộ kho (tính trong SQL, đã cache)
+    totals = repository.stock_summary(as_of, repository.StockFilters())
+    total_stock = totals['total_stock']
+    total_value = int(totals['total_value'])
+
+    col1, col2 = st.columns(2)
+
+    # Hiển thị tổng tồn kho và giá trị tồn kho
+    with col1:
+        st.markdown(
+            f"""
+            <div style="border:1px solid #ccc; border-radius:7px; padding:5px; text-align:center; background-color:#008080;">
+                <h4>Total Stock</h4>
+                <p style="font-size:24px; font-weight:bold;">{total_stock}</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    with col2:
+        st.markdown(
+            f"""
+            <div style="border:1px solid #ccc; border-radius:7px; padding:5px; text-align:center; background-color:#008080;">
+                <h4>Total Value</h4>
+                <p style="font-size:24px; font-weight:bold;">{total_value:,.0f} đ</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
 
     # Lọc và tìm kiếm dữ liệu
-    machine_types = df_stock['machine_type'].dropna().unique()
-    machine_types = ['Tất cả'] + sorted(machine_types.tolist())
+    machine_types = ['Tất cả'] + sorted(repository.machine_types()['machine'].dropna().tolist())
 
     # Thanh tìm kiếm và lọc nằm ở đầu trang
-    st.sidebar.header("Lọc Dữ Liệu")
     keyword = st.sidebar.text_input("🔍 Tìm kiếm", placeholder="Nhập mã, mô tả, cost center...")
     min_stock_str = st.sidebar.text_input("🔽 Tồn kho tối thiểu", placeholder="Nhập tồn kho tối thiểu")
     max_stock_str = st.sidebar.text_input("🔼 Tồn kho tối đa", placeholder="Nhập tồn kho tối đa")
     selected_machine = st.sidebar.selectbox("🛠️ Loại máy", machine_types)
+    reorder_only = st.sidebar.checkbox("🛒 Chỉ hiện hàng cần đặt lại")
+    selected_abc = st.sidebar.multiselect("🏷️ Nhóm ABC (giá trị tiêu thụ)", ["A", "B", "C"])
+    selected_xyz = st.sidebar.multiselect("📈 Nhóm XYZ (độ biến động)", ["X", "Y", "Z"])
 
     # Kiểm tra và chuyển đổi giá trị tồn kho tối thiểu và tối đa thành số
     try:
-        min_stock = int(min_stock_str) if min_stock_str else 0
+        min_stock = int(min_stock_str) if min_stock_str else None
     except ValueError:
-        min_stock = 0
-        st.sidebar.warning("⚠️ Tồn kho tối thiểu không hợp lệ, sử dụng giá trị mặc định là 0.")
+        min_stock = None
+        st.sidebar.warning("⚠️ Tồn kho tối thiểu không hợp lệ, bỏ qua bộ lọc này.")
 
     try:
-        max_stock = int(max_stock_str) if max_stock_str else 100000
+        max_stock = int(max_stock_str) if max_stock_str else None
     except ValueError:
-        max_stock = 100000
-        st.sidebar.warning("⚠️ Tồn kho tối đa không hợp lệ, sử dụng giá trị mặc định là 100000.")
-
-    # Lọc dữ liệu
-    df_filtered = df_stock.copy()
-
-    if keyword.strip():
-        kw = keyword.strip().lower()
-        df_filtered = df_filtered[ 
-            df_filtered['material_no'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['part_no'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['description'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['bin'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['cost_center'].astype(str).str.lower().str.contains(kw, na=False)
-        ]
-
-    df_filtered = df_filtered[
-        (df_filtered['stock'] >= min_stock) & (df_filtered['stock'] <= max_stock)
-    ]
-
-    if selected_machine != 'Tất cả':
-        df_filtered = df_filtered[df_filtered['machine_type'] == selected_machine]
-
-    # Cảnh báo khi tồn kho thấp (<= 5)
-    low_stock_items = df_filtered[df_filtered['stock'] <= 5]
+        max_stock = None
+        st.sidebar.warning("⚠️ Tồn kho tối đa không hợp lệ, bỏ qua bộ lọc này.")
+
+    # Các bộ lọc được ghép thành một mệnh đề WHERE; kết quả cache theo bộ lọc (ô để trống thì không lọc)
+    filters = repository.StockFilters(
+        keyword=keyword.strip(),
+        min_stock=min_stock,
+        max_stock=max_stock,
+        machine_type=None if selected_machine == 'Tất cả' else selected_machine,
+        reorder_only=reorder_only,
+        abc_classes=tuple(selected_abc),
+        xyz_classes=tuple(selected_xyz),
+    )
+
+    # Các dòng khớp bộ lọc cho biểu đồ: tồn kho lớn nhất trước, tối đa STOCK_VIEW_LIMIT dòng
+    summary = repository.stock_summary(as_of, filters)
+    df_filtered = repository.stock_page(as_of, filters, "stock", True, None, settings.STOCK_VIEW_LIMIT)
+
+    # Cảnh báo tồn kho dưới mức an toàn (ghi khi nhập/xuất, xem alerts.py)
+    low_stock_items = repository.open_alerts()
     if not low_stock_items.empty:
-        st.warning("⚠️ Một số mặt hàng có tồn kho thấp! Vui lòng kiểm tra các sản phẩm dưới đây.")
+        with st.expander(f"⚠️ {len(low_stock_items)} mặt hàng dưới mức tồn kho an toàn"):
+            st.dataframe(
+                low_stock_items[['material_no', 'description', 'stock', 'threshold', 'created_at']],
+                hide_index=True, use_container_width=True,
+                column_config={
+                    'stock': 'Tồn kho',
+                    'threshold': 'Safety stock',
+                    'created_at': 'Từ lúc',
+                },
+            )
+
+    # Mặt hàng đã chạm điểm đặt hàng lại (theo tốc độ tiêu thụ gần đây)
+    reorder_filter = repository.StockFilters(reorder_only=True)
+    reorder_count = repository.stock_summary(as_of, reorder_filter)['count']
+    if reorder_count:
+        reorder_items = repository.stock_page(as_of, reorder_filter, "stock", False, None, settings.STOCK_VIEW_LIMIT)
+        reorder_items = reorder_items.sort_values('days_of_cover', na_position='first')
+        with st.expander(f"🛒 Cần đặt hàng ngay: {reorder_count} mặt hàng"):
+            st.dataframe(
+                reorder_items[['material_no', 'description', 'stock', 'reorder_point',
+                               'avg_daily_usage', 'days_of_cover', 'safety_stock']],
+                hide_index=True, use_container_width=True,
+                column_config={
+                    'stock': 'Tồn kho',
+                    'reorder_point': 'Điểm đặt hàng',
+                    'avg_daily_usage': 'Tiêu thụ/ngày',
+                    'days_of_cover': 'Số ngày còn đủ dùng',
+                    'safety_stock': 'Safety stock',
+                },
+            )
 
     # Hiển thị biểu đồ và thông tin tổng quan
     # Biểu đồ thanh: tồn kho theo material_no (giới hạn 10 sản phẩm đầu)
-    df_chart = df_filtered.nlargest(10, 'stock')
+    df_chart = df_filtered.head(10)
 
     col1, col2, col3 = st.columns(3)
 
@@ -179,40 +239,66 @@ def show_view_stock():
         )
 
         st.plotly_chart(fig_days_in_stock, use_container_width=False)
-    # Lọc dữ liệu
-    df_filtered = df_stock.copy()
-
-    if keyword.strip():
-        kw = keyword.strip().lower()
-        df_filtered = df_filtered[
-            df_filtered['material_no'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['part_no'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['description'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['bin'].astype(str).str.lower().str.contains(kw, na=False) |
-            df_filtered['cost_center'].astype(str).str.lower().str.contains(kw, na=False)
-        ]
-
-    df_filtered = df_filtered[
-        (df_filtered['stock'] >= min_stock) & (df_filtered['stock'] <= max_stock)
-    ]
-
-    if selected_machine != 'Tất cả':
-        df_filtered = df_filtered[df_filtered['machine_type'] == selected_machine]
+    # ====== Lưới phân trang: chỉ tải trang đang xem, sắp xếp và phân trang keyset trong SQL ======
+    col_sort, col_order, col_size = st.columns([2, 1, 1])
+    with col_sort:
+        sort = st.selectbox("↕️ Sắp xếp theo", list(SORT_LABELS), format_func=SORT_LABELS.get)
+    with col_order:
+        descending = st.radio("Thứ tự", ["Tăng dần", "Giảm dần"], horizontal=True) == "Giảm dần"
+    with col_size:
+        page_size = st.selectbox("Số dòng mỗi trang", PAGE_SIZES, index=1)
+
+    # Mỗi trang bắt đầu sau (sort_key, id) của dòng cuối trang trước; đổi bộ lọc/sắp xếp thì về trang đầu
+    grid_key = (as_of, filters, sort, descending, page_size)
+    if st.session_state.get("stock_grid_key") != grid_key:
+        st.session_state.stock_grid_key = grid_key
+        st.session_state.stock_grid_cursors = [None]
+    cursors = st.session_state.stock_grid_cursors
+
+    df_page = repository.stock_page(as_of, filters, sort, descending, cursors[-1], page_size)
+    total_rows = summary['count']
+    total_pages = max(1, math.ceil(total_rows / page_size))
+
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("◀ Trang trước", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col_info:
+        st.markdown(f"<div style='text-align: center;'>Trang {len(cursors)}/{total_pages} · {total_rows} linh kiện</div>",
+                    unsafe_allow_html=True)
+    with col_next:
+        if st.button("Trang sau ▶", disabled=len(df_page) < page_size or len(cursors) >= total_pages):
+            cursors.append((df_page['sort_key'].iloc[-1], df_page['id'].iloc[-1]))
+            st.rerun()
+
+    df_page = df_page.drop(columns=['sort_key'])
 
-    
     # Cấu hình bảng AgGrid
-    gb = GridOptionsBuilder.from_dataframe(df_filtered)
+    gb = GridOptionsBuilder.from_dataframe(df_page)
 
-    # Ẩn cột image_url và ẩn cột index
+    # Ẩn cột image_url và cột id
     gb.configure_column("image_url", hide=True)
-    gb.configure_column("index", hide=True)  # Ẩn cột index
+    gb.configure_column("id", hide=True)
 
     # Hiển thị số ngày tồn kho như bình thường
     gb.configure_column("storage_days", header_name="Days in Stock", type=["numericColumn"])
-
-    # Cấu hình cột mặc định
+    gb.configure_column("age_0_30", header_name="Qty 0-30d", type=["numericColumn"])
+    gb.configure_column("age_31_90", header_name="Qty 31-90d", type=["numericColumn"])
+    gb.configure_column("age_90_plus", header_name="Qty 90d+", type=["numericColumn"])
+
+    # Các cột đặt hàng lại
+    gb.configure_column("avg_daily_usage", header_name="Avg Usage/Day", type=["numericColumn"])
+    gb.configure_column("usage_std", header_name="Usage Std", type=["numericColumn"])
+    gb.configure_column("days_of_cover", header_name="Days of Cover", type=["numericColumn"])
+    gb.configure_column("reorder_point", header_name="Reorder Point", type=["numericColumn"])
+    gb.configure_column("reorder_now", header_name="Reorder Now")
+    gb.configure_column("abc_class", header_name="ABC")
+    gb.configure_column("xyz_class", header_name="XYZ")
+
+    # Cấu hình cột mặc định (sắp xếp làm ở SQL qua ô "Sắp xếp theo", không sắp trong trình duyệt)
     gb.configure_default_column(
-        filter=False, sortable=True, editable=False, resizable=True,
+        filter=False, sortable=False, editable=False, resizable=True,
         cellStyle=JsCode(""" 
             function(params) { 
                 return { 
@@ -224,7 +310,7 @@ def show_view_stock():
         """)
     )
 
-    # Cấu hình cột stock để tô màu khi giá trị nhỏ hơn hoặc bằng 5
+    # Tô màu cột stock theo đúng quy tắc cảnh báo của alerts.BREACH_SQL (stock < safety_stock)
     gb.configure_column(
         "stock",
         cellStyle=JsCode(""" 
@@ -234,8 +320,10 @@ def show_view_stock():
                     border: '1px solid black',  // Viền vẫn giữ
                     padding: '10px'  // Tăng padding ô
                 };
-                if (params.value <= 30) {
-                    style.backgroundColor = '#ffff99';  // Tô màu đỏ nhạt cho các giá trị <= 5
+                const safety = Number(params.data.safety_stock) || 0;
+                const check = String(params.data.safety_stock_check ?? '1');
+                if (safety > 0 && params.value < safety && check !== '0' && check !== 'No') {
+                    style.backgroundColor = '#ffff99';  // Tô vàng linh kiện dưới safety stock
                     style.fontWeight = 'bold';
                 }
                 return style;
@@ -243,28 +331,29 @@ def show_view_stock():
         """)
     )
 
-    # Cảnh báo nếu có sản phẩm tồn kho trên 60 ngày
-    long_stock_items = df_stock[df_stock['storage_days'] > 40]
-    if not long_stock_items.empty:
+    # Cảnh báo nếu có sản phẩm còn lô nhập quá AGING_WARNING_DAYS ngày (tra theo index của stock_lots)
+    long_stock_count = repository.aged_part_count()
+    if long_stock_count:
         st.markdown(
-            f"<div style='background-color: #ff4d4d; padding: 20px; font-size: 20px; color: white; font-weight: bold; text-align: center; border-radius: 10px;'>⚠️ Cảnh báo! Có {len(long_stock_items)} sản phẩm đã tồn kho trên 40 ngày! Xử lý ngay!</div>", 
+            f"<div style='background-color: #ff4d4d; padding: 20px; font-size: 20px; color: white; font-weight: bold; text-align: center; border-radius: 10px;'>⚠️ Cảnh báo! Có {long_stock_count} sản phẩm đã tồn kho trên {settings.AGING_WARNING_DAYS} ngày! Xử lý ngay!</div>", 
             unsafe_allow_html=True)
 
     # Cấu hình các cột đặc biệt
     gb.configure_selection('single')
 
     # Cập nhật chiều rộng cột description và các cột có thể chứa văn bản dài
-    gb.configure_column("description", width=300, autoHeight=True)  # Đặt chiều rộng lớn hơn cho description
+    gb.configure_column("description", width=300, tooltipField="description")  # Đặt chiều rộng lớn hơn cho description
 
-    # Cấu hình bảng và các cài đặt chiều rộng
-    gb.configure_grid_options(domLayout='autoHeight', rowHeight=40)  # Tăng chiều cao dòng
+    # Chiều cao cố định để AgGrid chỉ vẽ các dòng đang hiện (bỏ domLayout='autoHeight')
+    gb.configure_grid_options(rowHeight=40)
 
     grid_options = gb.build()
 
     # Hiển thị bảng
     grid_response = AgGrid(
-        df_filtered,
+        df_page,
         gridOptions=grid_options,
+        height=min(600, 40 * len(df_page) + 60),
         update_mode=GridUpdateMode.SELECTION_CHANGED,
         data_return_mode=DataReturnMode.FILTERED_AND_SORTED,
         theme="streamlit",
@@ -333,17 +422,8 @@ def show_view_stock():
         # Hiển thị bảng theo dạng dọc
         st.markdown(detail_df.to_html(escape=False, index=False), unsafe_allow_html=True)
 
-    # Nút tải Excel
-    if not df_filtered.empty:
-        excel_buffer = io.BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df_filtered.to_excel(writer, index=False, sheet_name='Stock')
-
-        st.download_button(
-            label="📥 Download Excel",
-            data=excel_buffer.getvalue(),
-            file_name="stock_view.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+    # Xuất file (xlsx/CSV/Parquet) theo bộ lọc và thứ tự sắp xếp của lưới
+    if summary['count']:
+        show_export(as_of, filters, sort, descending)
     else:
         st.warning("⚠️ Không tìm thấy kết quả phù hợp.")
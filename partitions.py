@@ -0,0 +1,115 @@
+"""Chia bảng import_export theo tháng trên MySQL (PARTITION BY RANGE COLUMNS(date)).
+
+Mỗi tháng là một partition tên `pYYYYMM`; `p_start` chứa các dòng trước tháng đầu tiên (và
+dòng có date NULL), `p_future` nhận các dòng sau tháng cuối cùng đã tạo. Truy vấn lọc `date`
+theo khoảng [đầu, cuối) chỉ đọc các partition liên quan, và bỏ một tháng cũ là DROP PARTITION
+thay cho DELETE trên cả bảng. Job bảo trì (chạy hằng ngày hoặc hằng tháng):
+
+    python tools/manage.py maintain-partitions
+
+tạo trước partition cho `settings.PARTITION_MONTHS_AHEAD` tháng tới và xóa partition của các
+tháng trước mốc lưu trữ đã được `archive-movements` chuyển hết sang Parquet. SQLite không có
+partition nên mọi hàm ở đây bỏ qua khi chạy trên SQLite.
+"""
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+import settings
+from archive import archive_cutoff, month_start, next_month
+from stock_history import as_date
+
+START, FUTURE = "p_start", "p_future"
+_MONTHLY = re.compile(r"^p\d{6}$")
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def _partition_def(month):
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{next_month(month):%Y-%m-%d}')"
+
+
+def _months(first, stop):
+    """Các tháng từ `first` đến trước `stop`."""
+    month = first
+    while month < stop:
+        yield month
+        month = next_month(month)
+
+
+def _months_ahead(months_ahead):
+    """Đầu tháng ngay sau tháng cuối cùng cần có partition."""
+    month = month_start(date.today())
+    for _ in range(months_ahead + 1):
+        month = next_month(month)
+    return month
+
+
+def list_partitions(conn, table="import_export"):
+    """[(tên, giới hạn trên dạng date hoặc None với MAXVALUE)] theo thứ tự; rỗng nếu bảng không chia."""
+    if conn.dialect.name != "mysql":
+        return []
+    rows = conn.execute(text("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """), {"table": table}).fetchall()
+    return [(name, None if bound == "MAXVALUE" else as_date(bound.strip("'"))) for name, bound in rows]
+
+
+def is_partitioned(conn, table="import_export"):
+    return bool(list_partitions(conn, table))
+
+
+def partition_table(conn, table="import_export", months_ahead=None):
+    """Chuyển `table` sang partition theo tháng, từ tháng của dòng cũ nhất đến
+    `months_ahead` tháng tới. Bảng được ghi lại toàn bộ nên cần chạy lúc vắng người dùng."""
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = conn.execute(text(f"SELECT MIN(date) FROM {table}")).scalar()
+    first = month_start(as_date(first)) if first is not None else month_start(date.today())
+    months = list(_months(first, _months_ahead(months_ahead)))
+    definitions = [
+        f"PARTITION {START} VALUES LESS THAN ('{first:%Y-%m-%d}')",
+        *map(_partition_def, months),
+        f"PARTITION {FUTURE} VALUES LESS THAN (MAXVALUE)",
+    ]
+    conn.execute(text(f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(date) ({', '.join(definitions)})"))
+    return len(months)
+
+
+def maintain_partitions(engine, table="import_export", months_ahead=None, log=print):
+    """Tạo trước partition cho các tháng tới và xóa partition rỗng của các tháng đã lưu trữ.
+    Trả về (số partition tạo thêm, số partition đã xóa)."""
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    with engine.connect() as conn:
+        partitions = list_partitions(conn, table)
+        if not partitions:
+            log(f"{table} không được chia partition (SQLite hoặc chưa chạy migration 006), bỏ qua.")
+            return 0, 0
+
+        # Tách các tháng mới ra khỏi p_future; dòng đã nằm trong p_future được chuyển theo
+        last_bound = max(bound for name, bound in partitions if bound is not None)
+        months = list(_months(last_bound, _months_ahead(months_ahead)))
+        if months:
+            definitions = [*map(_partition_def, months), f"PARTITION {FUTURE} VALUES LESS THAN (MAXVALUE)"]
+            conn.execute(text(f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE} INTO ({', '.join(definitions)})"))
+            log(f"  đã tạo {', '.join(partition_name(m) for m in months)}")
+
+        # Chỉ xóa partition đã rỗng, tức các dòng đã được archive-movements chuyển sang Parquet
+        dropped = 0
+        cutoff = archive_cutoff()
+        for name, bound in partitions:
+            if not _MONTHLY.match(name) or bound is None or bound > cutoff:
+                continue
+            remaining = conn.execute(text(f"SELECT COUNT(*) FROM {table} PARTITION ({name})")).scalar()
+            if remaining:
+                log(f"  bỏ qua {name}: còn {remaining} dòng chưa lưu trữ (chạy archive-movements trước)")
+                continue
+            conn.execute(text(f"ALTER TABLE {table} DROP PARTITION {name}"))
+            log(f"  đã xóa {name}")
+            dropped += 1
+        conn.commit()
+    return len(months), dropped
@@ -0,0 +1,58 @@
+"""Chạy song song các truy vấn đọc độc lập của một trang.
+
+    stock, employees = query_executor.gather(repository.spare_parts, repository.employees)
+
+Mỗi hàm chạy trên một luồng của pool dùng chung (giới hạn bởi `QUERY_WORKERS`) và mượn
+kết nối riêng từ connection pool, nên thời gian tải trang gần bằng truy vấn chậm nhất
+thay vì tổng của tất cả.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import query_stats
+import settings
+
+_executor = ThreadPoolExecutor(max_workers=settings.QUERY_WORKERS, thread_name_prefix="query")
+_background = ThreadPoolExecutor(max_workers=settings.BACKGROUND_WORKERS, thread_name_prefix="background")
+_local = threading.local()
+
+
+def _run(ctx, log, fn):
+    # Gắn ngữ cảnh Streamlit (session, cache) và QueryLog của trang vào luồng phụ
+    thread = threading.current_thread()
+    add_script_run_ctx(thread, ctx)
+    query_stats.attach(log)
+    _local.in_worker = True
+    try:
+        return fn()
+    finally:
+        _local.in_worker = False
+        query_stats.attach(None)
+        add_script_run_ctx(thread, None)
+
+
+def gather(*calls):
+    """Chạy các hàm không tham số trong `calls` đồng thời, trả về kết quả theo đúng thứ tự.
+
+    Lỗi của hàm nào thì được ném lại ở đây sau khi mọi hàm đã chạy xong."""
+    if len(calls) <= 1 or settings.QUERY_WORKERS <= 1 or getattr(_local, "in_worker", False):
+        # Gọi lồng từ luồng phụ thì chạy tuần tự để không chờ chính pool đang bận
+        return [fn() for fn in calls]
+
+    ctx = get_script_run_ctx()
+    log = query_stats.current()
+    futures = [_executor.submit(_run, ctx, log, fn) for fn in calls]
+    errors = [f.exception() for f in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [f.result() for f in futures]
+
+
+def submit(fn):
+    """Chạy hàm không tham số `fn` trên luồng nền mà không chờ, trả về Future.
+
+    Dùng cho việc lâu hơn một lần chạy trang (xuất file); trang hỏi lại kết quả ở các lần rerun sau."""
+    return _background.submit(_run, get_script_run_ctx(), None, fn)
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+import settings
+
+# Các truy vấn gần đây của toàn tiến trình (để tổng hợp theo trang)
+recent = deque(maxlen=settings.QUERY_STATS_RECENT)
+
+_local = threading.local()
+_logger_lock = threading.Lock()
+_logger = None
+
+
+class QueryLog:
+    """Danh sách truy vấn của một lần rerun, gắn với tên trang."""
+
+    def __init__(self, page):
+        self.page = page
+        self.records = []
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            self.records.append(record)
+
+    def total_ms(self):
+        return sum(r["elapsed_ms"] for r in self.records)
+
+
+def _get_logger():
+    global _logger
+    if _logger is None and settings.QUERY_LOG_PATH:
+        with _logger_lock:
+            if _logger is None:
+                os.makedirs(os.path.dirname(settings.QUERY_LOG_PATH) or ".", exist_ok=True)
+                handler = RotatingFileHandler(
+                    settings.QUERY_LOG_PATH,
+                    maxBytes=settings.QUERY_LOG_MAX_BYTES,
+                    backupCount=settings.QUERY_LOG_BACKUPS,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("warehouse.query_stats")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _short_sql(statement):
+    return re.sub(r"\s+", " ", statement).strip()[:500]
+
+
+# --- Gắn vào engine ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    log = current()
+    record = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "page": log.page if log else None,
+        "sql": _short_sql(statement),
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "rows": cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None,
+        "bytes": None,
+    }
+    if log is not None:
+        log.add(record)
+    _local.last_record = record
+    recent.append(record)
+
+
+def _handle_error(context):
+    # Truy vấn lỗi không đi qua after_cursor_execute, bỏ mốc thời gian đã đẩy vào
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def install(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# --- Theo dõi theo từng lần rerun ---
+def current():
+    return getattr(_local, "log", None)
+
+
+def start(page):
+    """Bắt đầu ghi nhận truy vấn cho lần rerun của một trang."""
+    _local.log = QueryLog(page)
+    return _local.log
+
+
+def attach(log):
+    """Gắn QueryLog có sẵn vào luồng hiện tại (dùng cho luồng phụ của trang)."""
+    _local.log = log
+
+
+def finish():
+    """Kết thúc lần rerun: ghi ra file JSONL và giữ lại để hiển thị."""
+    log = current()
+    _local.log = None
+    if log is None:
+        return None
+    _local.last_log = log
+    logger = _get_logger()
+    if logger is not None:
+        for record in log.records:
+            logger.info(json.dumps(record, ensure_ascii=False, default=str))
+    return log
+
+
+def last_log():
+    return getattr(_local, "last_log", None)
+
+
+def annotate_last(rows, nbytes, elapsed):
+    """Bổ sung số dòng, dung lượng và thời gian tính cả fetch cho truy vấn vừa chạy trên luồng này."""
+    record = getattr(_local, "last_record", None)
+    if record is not None:
+        record["rows"] = rows
+        record["bytes"] = nbytes
+        record["elapsed_ms"] = max(record["elapsed_ms"], round(elapsed * 1000, 3))
+
+
+def page_summary():
+    """Tổng hợp thời gian truy vấn theo trang từ các truy vấn gần đây."""
+    summary = {}
+    for record in list(recent):
+        page = record["page"] or "(ngoài trang)"
+        item = summary.setdefault(page, {"page": page, "queries": 0, "total_ms": 0.0, "max_ms": 0.0})
+        item["queries"] += 1
+        item["total_ms"] += record["elapsed_ms"]
+        item["max_ms"] = max(item["max_ms"], record["elapsed_ms"])
+    return sorted(summary.values(), key=lambda item: item["total_ms"], reverse=True)
@@ -0,0 +1,57 @@
+"""Tốc độ tiêu thụ và điểm đặt hàng lại cho mọi linh kiện, tính một lượt bằng NumPy.
+
+Đầu vào là lượng tiêu thụ theo (linh kiện, ngày) trong cửa sổ `window_days` ngày gần nhất;
+ngày không xuất được tính là tiêu thụ 0. Với mỗi linh kiện:
+
+    avg_daily_usage = tổng tiêu thụ / window_days
+    usage_std       = độ lệch chuẩn tiêu thụ theo ngày
+    reorder_point   = max(safety_stock, ⌈avg · L + z · std · √L⌉)   (L: lead time, z: hệ số phục vụ)
+    days_of_cover   = stock / avg_daily_usage                      (NaN khi không tiêu thụ)
+    reorder_now     = stock <= reorder_point
+"""
+import numpy as np
+
+
+def usage_stats(part_ids, usage_part_ids, usage_qty, window_days):
+    """(avg, std) theo thứ tự `part_ids`, từ các dòng tiêu thụ theo ngày (usage_part_ids, usage_qty);
+    dòng của linh kiện không có trong `part_ids` bị bỏ qua."""
+    part_ids = np.asarray(part_ids)
+    usage_part_ids = np.asarray(usage_part_ids)
+    usage_qty = np.asarray(usage_qty, dtype=np.float64)
+
+    if len(part_ids) == 0:
+        return np.zeros(0), np.zeros(0)
+
+    order = np.argsort(part_ids, kind="stable")
+    sorted_ids = part_ids[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, usage_part_ids), len(sorted_ids) - 1)
+    known = sorted_ids[pos] == usage_part_ids
+    idx = order[pos[known]]
+    qty = usage_qty[known]
+
+    total = np.bincount(idx, weights=qty, minlength=len(part_ids))
+    total_sq = np.bincount(idx, weights=qty * qty, minlength=len(part_ids))
+    avg = total / window_days
+    std = np.sqrt(np.maximum(total_sq / window_days - avg * avg, 0.0))
+    return avg, std
+
+
+def reorder_point(avg, std, safety_stock, lead_time_days, service_z):
+    """Điểm đặt hàng lại: nhu cầu trong lead time cộng tồn kho an toàn theo độ biến động,
+    không thấp hơn safety_stock đã khai báo."""
+    demand = np.asarray(avg) * lead_time_days + service_z * np.asarray(std) * np.sqrt(lead_time_days)
+    return np.maximum(np.ceil(demand - 1e-9), np.asarray(safety_stock, dtype=np.float64)).astype(np.int64)
+
+
+def days_of_cover(stock, avg):
+    """Số ngày tồn kho hiện có còn đủ dùng với tốc độ tiêu thụ `avg` (NaN nếu không tiêu thụ)."""
+    stock = np.asarray(stock, dtype=np.float64)
+    avg = np.asarray(avg, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg > 0, stock / avg, np.nan)
+
+
+def reorder_now(stock, point):
+    """Linh kiện cần đặt hàng: tồn kho đã chạm điểm đặt hàng lại (điểm > 0)."""
+    point = np.asarray(point)
+    return (np.asarray(stock) <= point) & (point > 0)
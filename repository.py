@@ -0,0 +1,631 @@
+"""Các truy vấn đọc dùng chung cho mọi trang.
+
+Mỗi truy vấn gồm hàm `load_*(conn, ...)` chạy SQL trực tiếp và hàm công khai cùng tên
+(không có tiền tố `load_`) đọc qua cache. Cache dùng chung giữa các phiên, được khóa theo
+data version của các bảng liên quan nên mọi lần ghi qua `write_transaction(...)`
+làm mới đúng những truy vấn bị ảnh hưởng.
+"""
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+import alerts
+import lots
+import reorder
+import rollups
+import search
+import settings
+import stock_history
+from database import (connect, data_version, read_chunks, read_df, read_rows, read_snapshot, recently_written,
+                      sql_period_start)
+
+
+@st.cache_data(ttl=settings.CACHE_TTL_SECONDS, max_entries=settings.CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_query(name, version, args, primary):
+    with connect(primary=primary) as conn:
+        return globals()[name](conn, *args)
+
+
+def _cached(loader, tables, *args):
+    # Bảng vừa bị ghi thì đọc từ primary để không lưu kết quả cũ của replica vào cache
+    primary = recently_written(*tables)
+    return _cached_query(loader.__name__, data_version(*tables), args, primary)
+
+
+def day_bounds(day):
+    """Khoảng [đầu ngày, đầu ngày hôm sau) để lọc `date` bằng so sánh có dùng được index
+    thay cho DATE(date) = :day."""
+    if isinstance(day, str):
+        day = datetime.strptime(day[:10], '%Y-%m-%d').date()
+    elif isinstance(day, datetime):
+        day = day.date()
+    return day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+# ---------------------- DANH MỤC ------------------------
+
+def load_spare_parts(conn) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT sp.id, sp.material_no, sp.part_no, sp.description,
+               sp.machine_type_id, mt.machine AS machine_type,
+               sp.bin, sp.cost_center, sp.price, sp.stock, sp.safety_stock,
+               sp.safety_stock_check, sp.image_url, sp.import_date, sp.export_date
+        FROM spare_parts sp
+        LEFT JOIN machine_type mt ON sp.machine_type_id = mt.id
+    """)
+
+def spare_parts() -> pd.DataFrame:
+    """Danh mục linh kiện kèm tên loại máy."""
+    return _cached(load_spare_parts, ("spare_parts", "machine_type"))
+
+
+def load_stock_as_of(conn, day) -> pd.DataFrame:
+    return stock_history.stock_as_of(conn, day)
+
+def stock_as_of(day) -> pd.DataFrame:
+    """Tồn kho cuối ngày `day` của mọi linh kiện: cột part_id, stock."""
+    return _cached(load_stock_as_of, ("import_export", "spare_parts", "stock_snapshots"), str(day)[:10])
+
+
+def load_stock_aging(conn, today) -> pd.DataFrame:
+    sql, params = lots.aging_query(today)
+    return read_df(conn, sql, params)
+
+def stock_aging() -> pd.DataFrame:
+    """Số đơn vị còn trên kệ theo tuổi lô FIFO (age_0_30, age_31_90, age_90_plus) và ngày nhập
+    của lô cũ nhất (oldest_lot) của từng linh kiện còn hàng."""
+    return _cached(load_stock_aging, ("stock_lots", "import_export", "spare_parts"),
+                   date.today().strftime('%Y-%m-%d'))
+
+
+def with_stock_aging(df) -> pd.DataFrame:
+    """Thêm vào danh mục `df` (có cột id) các cột tuổi lô và storage_days là số ngày của đơn vị
+    cũ nhất còn trên kệ (NaN khi hết hàng)."""
+    aging = stock_aging().set_index('part_id')
+    df = df.copy()
+    for column in ('age_0_30', 'age_31_90', 'age_90_plus'):
+        df[column] = df['id'].map(aging[column]).fillna(0).astype("int64")
+    oldest = pd.to_datetime(df['id'].map(aging['oldest_lot'])).dt.normalize()
+    df['storage_days'] = (pd.Timestamp.today().normalize() - oldest).dt.days
+    return df
+
+
+def load_aged_part_count(conn, days, today) -> int:
+    return lots.count_aged_parts(conn, days, today)
+
+def aged_part_count(days=None) -> int:
+    """Số linh kiện còn hàng từ lô nhập trên `days` ngày (mặc định AGING_WARNING_DAYS)."""
+    return _cached(load_aged_part_count, ("stock_lots", "import_export", "spare_parts"),
+                   days or settings.AGING_WARNING_DAYS, date.today().strftime('%Y-%m-%d'))
+
+
+def load_reorder_stats(conn, today, window_days, lead_time_days, service_z) -> pd.DataFrame:
+    parts = read_df(conn, "SELECT id AS part_id, COALESCE(safety_stock, 0) AS safety_stock FROM spare_parts")
+    # Tiêu thụ thực tế theo ngày: lượng xuất làm giảm tồn kho (xuất FOC không tính)
+    start = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=window_days)).strftime('%Y-%m-%d')
+    usage = read_df(conn, """
+        SELECT part_id, -SUM(stock_delta) AS quantity
+        FROM daily_movements
+        WHERE im_ex_flag = 0 AND day > :start AND day <= :today
+        GROUP BY part_id, day
+    """, {"start": start, "today": today})
+    part_ids = parts['part_id'].to_numpy()
+    avg, std = reorder.usage_stats(part_ids, usage['part_id'].to_numpy(), usage['quantity'].to_numpy(), window_days)
+    return pd.DataFrame({
+        'part_id': part_ids,
+        'avg_daily_usage': avg.round(3),
+        'usage_std': std.round(3),
+        'reorder_point': reorder.reorder_point(avg, std, parts['safety_stock'].to_numpy(),
+                                               lead_time_days, service_z),
+    })
+
+def reorder_stats() -> pd.DataFrame:
+    """Tốc độ tiêu thụ trung bình, độ lệch chuẩn theo ngày và điểm đặt hàng lại của mọi linh kiện,
+    tính trên REORDER_WINDOW_DAYS ngày gần nhất."""
+    return _cached(load_reorder_stats, ("import_export", "spare_parts"), date.today().strftime('%Y-%m-%d'),
+                   settings.REORDER_WINDOW_DAYS, settings.REORDER_LEAD_TIME_DAYS, settings.REORDER_SERVICE_Z)
+
+
+def with_reorder_points(df) -> pd.DataFrame:
+    """Thêm vào danh mục `df` (có cột id, stock) các cột avg_daily_usage, usage_std, reorder_point,
+    days_of_cover và reorder_now tính theo cột stock của `df`."""
+    stats = reorder_stats().set_index('part_id')
+    df = df.copy()
+    for column in ('avg_daily_usage', 'usage_std', 'reorder_point'):
+        df[column] = df['id'].map(stats[column]).fillna(0)
+    df['reorder_point'] = df['reorder_point'].astype("int64")
+    stock = df['stock'].fillna(0).to_numpy()
+    df['days_of_cover'] = reorder.days_of_cover(stock, df['avg_daily_usage'].to_numpy()).round(1)
+    df['reorder_now'] = reorder.reorder_now(stock, df['reorder_point'].to_numpy())
+    return df
+
+
+def load_part_classes(conn) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT part_id, abc_class, xyz_class, consumption_value, demand_cv FROM part_classes
+    """)
+
+def part_classes() -> pd.DataFrame:
+    """Nhóm ABC/XYZ đã lưu của các linh kiện (tính lại bằng `tools/manage.py classify-parts`)."""
+    return _cached(load_part_classes, ("part_classes",))
+
+
+def with_part_classes(df) -> pd.DataFrame:
+    """Thêm vào danh mục `df` (có cột id) các cột abc_class, xyz_class; linh kiện chưa được
+    phân loại để trống."""
+    classes = part_classes().set_index('part_id')
+    df = df.copy()
+    for column in ('abc_class', 'xyz_class'):
+        df[column] = df['id'].map(classes[column]).fillna('')
+    return df
+
+
+def _class_filter(column, classes, kind="abc"):
+    """Điều kiện SQL (bắt đầu bằng AND) giữ các dòng có `column` thuộc nhóm ABC (hoặc XYZ khi
+    `kind="xyz"`) đã chọn; không chọn nhóm nào thì không lọc."""
+    if not classes:
+        return "", {}
+    params = {f"{kind}_{i}": cls for i, cls in enumerate(classes)}
+    placeholders = ", ".join(f":{name}" for name in params)
+    return f" AND {column} IN (SELECT part_id FROM part_classes WHERE {kind}_class IN ({placeholders}))", params
+
+
+# ---------------------- LƯỚI TỒN KHO ------------------------
+
+class StockFilters(NamedTuple):
+    """Bộ lọc sidebar của View Stock; là tuple nên dùng thẳng làm khóa cache."""
+    keyword: str = ""
+    min_stock: int | None = None
+    max_stock: int | None = None
+    machine_type: str | None = None
+    reorder_only: bool = False
+    abc_classes: tuple = ()
+    xyz_classes: tuple = ()
+
+
+# Cột của View Stock (lưới, biểu đồ, file Excel)
+STOCK_VIEW_COLUMNS = [
+    'material_no', 'part_no', 'description', 'machine_type', 'bin', 'cost_center',
+    'price', 'stock', 'safety_stock', 'safety_stock_check', 'image_url',
+    'import_date', 'export_date', 'storage_days', 'age_0_30', 'age_31_90', 'age_90_plus',
+    'avg_daily_usage', 'usage_std', 'days_of_cover', 'reorder_point', 'reorder_now',
+    'abc_class', 'xyz_class',
+]
+
+
+# Cột được sắp xếp trên lưới -> biểu thức ORDER BY (không NULL để phân trang keyset so sánh được)
+STOCK_SORT_COLUMNS = {
+    "material_no": "sp.material_no",
+    "part_no": "COALESCE(sp.part_no, '')",
+    "description": "COALESCE(sp.description, '')",
+    "machine_type": "COALESCE(mt.machine, '')",
+    "bin": "COALESCE(sp.bin, '')",
+    "cost_center": "COALESCE(sp.cost_center, '')",
+    "price": "COALESCE(sp.price, 0)",
+    "stock": "s.stock",
+    "safety_stock": "COALESCE(sp.safety_stock, 0)",
+    "import_date": "COALESCE(sp.import_date, '1970-01-01')",
+}
+
+
+def _id_filter(column, ids):
+    """Điều kiện SQL (bắt đầu bằng AND) giữ các dòng có `column` thuộc `ids`; không có id nào
+    thì không dòng nào khớp. Id được ép int rồi ghi thẳng vào SQL (an toàn, và danh sách dài
+    không vướng giới hạn số tham số của SQLite)."""
+    return f" AND {column} IN ({', '.join(str(int(i)) for i in ids)})" if ids else " AND 1 = 0"
+
+
+def _stock_filter_sql(conn, as_of, filters, reorder_ids, match_ids):
+    """(FROM ... WHERE ..., params) của danh mục theo `filters`, với s.stock là tồn kho cuối ngày `as_of`;
+    `match_ids` là kết quả tìm từ khóa qua chỉ mục trigram (search.py)."""
+    stock_sql, params = stock_history.stock_as_of_query(conn, as_of)
+    sql = f"""
+        FROM spare_parts sp
+        JOIN ({stock_sql}) s ON s.part_id = sp.id
+        LEFT JOIN machine_type mt ON mt.id = sp.machine_type_id
+        WHERE 1 = 1"""
+    if filters.keyword:
+        sql += _id_filter("sp.id", match_ids)
+    if filters.min_stock is not None:
+        sql += " AND s.stock >= :min_stock"
+        params["min_stock"] = filters.min_stock
+    if filters.max_stock is not None:
+        sql += " AND s.stock <= :max_stock"
+        params["max_stock"] = filters.max_stock
+    if filters.machine_type:
+        sql += " AND mt.machine = :machine_type"
+        params["machine_type"] = filters.machine_type
+    if filters.reorder_only:
+        sql += _id_filter("sp.id", reorder_ids)
+    for kind, classes in (("abc", filters.abc_classes), ("xyz", filters.xyz_classes)):
+        class_sql, class_params = _class_filter("sp.id", classes, kind)
+        sql += class_sql
+        params.update(class_params)
+    return sql, params
+
+
+def _stock_rows_sql(from_sql, key, direction):
+    return f"""
+        SELECT sp.id, sp.material_no, sp.part_no, sp.description, mt.machine AS machine_type,
+               sp.bin, sp.cost_center, sp.price, s.stock, sp.safety_stock, sp.safety_stock_check,
+               sp.image_url, sp.import_date, sp.export_date, {key} AS sort_key
+        {from_sql}
+        ORDER BY {key} {direction}, sp.id {direction}
+    """
+
+
+def load_stock_page(conn, as_of, filters, reorder_ids, match_ids, sort, descending, after,
+                    page_size) -> pd.DataFrame:
+    from_sql, params = _stock_filter_sql(conn, as_of, filters, reorder_ids, match_ids)
+    key = STOCK_SORT_COLUMNS[sort]
+    op, direction = ("<", "DESC") if descending else (">", "ASC")
+    if after is not None:
+        # Keyset: tiếp tục sau dòng cuối của trang trước, id phân định các dòng cùng giá trị sắp xếp
+        from_sql += f" AND ({key} {op} :after_key OR ({key} = :after_key AND sp.id {op} :after_id))"
+        params.update(after_key=after[0], after_id=after[1])
+    return read_df(conn, _stock_rows_sql(from_sql, key, direction) + " LIMIT :page_size",
+                   {**params, "page_size": page_size})
+
+def stock_page(as_of, filters, sort="material_no", descending=False, after=None, page_size=50) -> pd.DataFrame:
+    """Một trang của lưới View Stock theo `filters` (StockFilters), sắp xếp theo `sort` (khóa của
+    STOCK_SORT_COLUMNS) trong SQL. `after` là (sort_key, id) của dòng cuối trang trước; trang
+    đầu dùng None; `page_size` cũng là LIMIT khi chỉ cần N dòng đầu. Trả về các cột
+    STOCK_VIEW_COLUMNS kèm id, sort_key."""
+    if sort not in STOCK_SORT_COLUMNS:
+        raise ValueError(f"Không sắp xếp được theo cột {sort!r}")
+    as_of = stock_history.as_date(as_of or date.today()).strftime('%Y-%m-%d')
+    if after is not None:
+        after = (getattr(after[0], "item", lambda: after[0])(), int(after[1]))
+    df = _cached(load_stock_page, ("spare_parts", "machine_type", "import_export", "stock_snapshots", "part_classes"),
+                 as_of, filters, _reorder_ids(as_of, filters), _match_ids(filters), sort, bool(descending), after,
+                 int(page_size))
+    df = with_part_classes(with_reorder_points(with_stock_aging(df)))
+    return df[['id'] + STOCK_VIEW_COLUMNS + ['sort_key']]
+
+
+def iter_stock(as_of, filters, sort="material_no", descending=False, chunk_rows=None):
+    """Mọi dòng khớp `filters` (cột STOCK_VIEW_COLUMNS) theo từng DataFrame tối đa `chunk_rows`
+    dòng, để xuất file không nạp cả danh mục. Một truy vấn đọc qua server-side cursor, không cache."""
+    if sort not in STOCK_SORT_COLUMNS:
+        raise ValueError(f"Không sắp xếp được theo cột {sort!r}")
+    as_of = stock_history.as_date(as_of or date.today()).strftime('%Y-%m-%d')
+    reorder, matches = _reorder_ids(as_of, filters), _match_ids(filters)
+    with connect() as conn:
+        from_sql, params = _stock_filter_sql(conn, as_of, filters, reorder, matches)
+        query = _stock_rows_sql(from_sql, STOCK_SORT_COLUMNS[sort], "DESC" if descending else "ASC")
+        for df in read_chunks(conn, query, params, chunk_rows or settings.EXPORT_CHUNK_ROWS):
+            yield with_part_classes(with_reorder_points(with_stock_aging(df)))[STOCK_VIEW_COLUMNS]
+
+
+def load_stock_summary(conn, as_of, filters, reorder_ids, match_ids) -> dict:
+    from_sql, params = _stock_filter_sql(conn, as_of, filters, reorder_ids, match_ids)
+    row = read_rows(conn, f"""
+        SELECT COUNT(*) AS parts, COALESCE(SUM(s.stock), 0) AS total_stock,
+               COALESCE(SUM(s.stock * sp.price), 0) AS total_value
+        {from_sql}
+    """, params)[0]
+    return {"count": int(row.parts), "total_stock": int(row.total_stock), "total_value": float(row.total_value)}
+
+def stock_summary(as_of, filters) -> dict:
+    """Số linh kiện, tổng tồn kho và tổng giá trị tồn kho cuối ngày `as_of` của các linh kiện khớp `filters`."""
+    as_of = stock_history.as_date(as_of or date.today()).strftime('%Y-%m-%d')
+    return _cached(load_stock_summary, ("spare_parts", "machine_type", "import_export", "stock_snapshots", "part_classes"),
+                   as_of, filters, _reorder_ids(as_of, filters), _match_ids(filters))
+
+
+def load_reorder_ids(conn, as_of, today, window_days, lead_time_days, service_z) -> tuple:
+    stats = load_reorder_stats(conn, today, window_days, lead_time_days, service_z).set_index('part_id')
+    stock = stock_history.stock_as_of(conn, as_of).set_index('part_id')['stock']
+    point = stats['reorder_point'].reindex(stock.index, fill_value=0)
+    return tuple(int(part_id) for part_id in stock.index[reorder.reorder_now(stock.to_numpy(), point.to_numpy())])
+
+def reorder_ids(as_of) -> tuple:
+    """id các linh kiện có tồn kho cuối ngày `as_of` đã chạm điểm đặt hàng lại."""
+    return _cached(load_reorder_ids, ("import_export", "spare_parts", "stock_snapshots"), str(as_of)[:10],
+                   date.today().strftime('%Y-%m-%d'), settings.REORDER_WINDOW_DAYS,
+                   settings.REORDER_LEAD_TIME_DAYS, settings.REORDER_SERVICE_Z)
+
+
+def _reorder_ids(as_of, filters):
+    # Chỉ tính khi bộ lọc cần; tuple để làm khóa cache
+    return reorder_ids(as_of) if filters.reorder_only else ()
+
+
+def _match_ids(filters):
+    # Sắp theo id để cùng tập kết quả dùng chung một khóa cache
+    return tuple(sorted(search.search_parts(filters.keyword))) if filters.keyword else ()
+
+def load_machine_types(conn) -> pd.DataFrame:
+    return read_df(conn, "SELECT id, machine FROM machine_type")
+
+def machine_types() -> pd.DataFrame:
+    return _cached(load_machine_types, ("machine_type",))
+
+
+def load_employees(conn) -> pd.DataFrame:
+    return read_df(conn, "SELECT amann_id, name FROM employees")
+
+def employees() -> pd.DataFrame:
+    """Danh sách nhân viên rút gọn cho các ô chọn người thực hiện."""
+    return _cached(load_employees, ("employees",))
+
+
+def load_employee_details(conn) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT amann_id, name, title, level, active, birthday, start_date,
+               address, phone_number, email, gender
+        FROM employees
+    """)
+
+def employee_details() -> pd.DataFrame:
+    return _cached(load_employee_details, ("employees",))
+
+
+# ---------------------- CẢNH BÁO ------------------------
+# Cảnh báo được mở/đóng trong cùng transaction cập nhật tồn kho, nên khóa cache theo cả
+# spare_parts để không phụ thuộc việc trang ghi có liệt kê bảng alerts hay không.
+
+def load_open_alert_count(conn) -> int:
+    return alerts.open_alert_count(conn)
+
+def open_alert_count() -> int:
+    """Số cảnh báo tồn kho đang mở (đếm trên index, dùng cho sidebar mọi trang)."""
+    return _cached(load_open_alert_count, ("alerts", "spare_parts"))
+
+
+def load_open_alerts(conn) -> pd.DataFrame:
+    return alerts.open_alerts(conn)
+
+def open_alerts() -> pd.DataFrame:
+    """Các cảnh báo tồn kho đang mở kèm mã, mô tả linh kiện."""
+    return _cached(load_open_alerts, ("alerts", "spare_parts"))
+
+
+# ---------------------- MÁY ------------------------
+
+def load_machine_positions(conn) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT m.name AS machine_name, mp.id AS mc_pos_id, mp.mc_pos
+        FROM machine m
+        JOIN machine_pos mp ON m.id = mp.mc_id
+    """)
+
+def machine_positions() -> pd.DataFrame:
+    """Máy và vị trí máy cho form xuất kho."""
+    return _cached(load_machine_positions, ("machine", "machine_pos"))
+
+
+def load_machine_groups(conn) -> pd.DataFrame:
+    return read_df(conn, "SELECT id, mc_name FROM group_mc")
+
+def machine_groups() -> pd.DataFrame:
+    return _cached(load_machine_groups, ("group_mc",))
+
+
+def load_machines(conn, group_name, pos, search_name) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT m.name AS machine_name, g.mc_name AS group_mc_name,
+               mp.mc_pos AS machine_pos
+        FROM machine m
+        JOIN group_mc g ON m.group_mc_id = g.id
+        LEFT JOIN machine_pos mp ON m.id = mp.mc_id
+        WHERE (:group_name = 'Tất cả' OR g.mc_name = :group_name)
+          AND (:pos = 'Tất cả' OR mp.mc_pos = :pos)
+          AND (:search_name = '' OR m.name LIKE :search_name)
+        ORDER BY m.name DESC
+        LIMIT 1000
+    """, {"group_name": group_name, "pos": pos, "search_name": f"%{search_name}%"})
+
+def machines(group_name, pos, search_name) -> pd.DataFrame:
+    """Danh sách máy theo bộ lọc của trang Quản lý máy."""
+    return _cached(load_machines, ("machine", "machine_pos", "group_mc"), group_name, pos, search_name)
+
+
+# ---------------------- DASHBOARD ------------------------
+
+def load_dashboard_kpis(conn, as_of, top_descriptions, abc_classes) -> dict:
+    part_filter, class_params = _class_filter("sp.id", abc_classes)
+    movement_filter, _ = _class_filter("part_id", abc_classes)
+    # Mọi truy vấn chạy trong một transaction chỉ đọc để các số liệu khớp nhau
+    with read_snapshot(conn):
+        stock_sql, params = stock_history.stock_as_of_query(conn, as_of)
+        params = {**params, **class_params, "as_of": as_of, "top": top_descriptions}
+        totals = read_df(conn, f"""
+            SELECT st.total_items, st.total_value, mv.total_import, mv.total_export
+            FROM (
+                SELECT SUM(s.stock) AS total_items, SUM(s.stock * sp.price) AS total_value
+                FROM ({stock_sql}) s
+                JOIN spare_parts sp ON sp.id = s.part_id{part_filter}
+            ) st
+            CROSS JOIN (
+                SELECT SUM(CASE WHEN im_ex_flag = 1 THEN quantity ELSE 0 END) AS total_import,
+                       SUM(CASE WHEN im_ex_flag = 0 THEN quantity ELSE 0 END) AS total_export
+                FROM daily_movements
+                WHERE day <= :as_of{movement_filter}
+            ) mv
+        """, params).iloc[0].fillna(0)
+        stock_overview = read_df(conn, f"""
+            SELECT sp.description, SUM(s.stock) AS stock
+            FROM ({stock_sql}) s
+            JOIN spare_parts sp ON sp.id = s.part_id{part_filter}
+            GROUP BY sp.description
+            ORDER BY stock DESC
+            LIMIT :top
+        """, params)
+        top_value = read_df(conn, f"""
+            SELECT sp.description, s.stock, sp.price, s.stock * sp.price AS total_value
+            FROM ({stock_sql}) s
+            JOIN spare_parts sp ON sp.id = s.part_id{part_filter}
+            ORDER BY total_value DESC
+            LIMIT 10
+        """, params)
+
+    return {
+        "total_items": int(totals['total_items']),
+        "total_value": float(totals['total_value']),
+        "total_import": int(totals['total_import']),
+        "total_export": int(totals['total_export']),
+        "stock_overview": stock_overview,
+        "top_value": top_value,
+    }
+
+def dashboard_kpis(as_of=None, abc_classes=()) -> dict:
+    """Toàn bộ số liệu của Dashboard tính đến hết ngày `as_of` (mặc định hôm nay): tổng tồn kho,
+    giá trị, tổng nhập/xuất, tồn kho theo mô tả và top 10 giá trị; `abc_classes` giới hạn
+    vào các linh kiện thuộc nhóm ABC đã chọn."""
+    as_of = day_bounds(as_of or date.today())[0]
+    return _cached(load_dashboard_kpis, ("import_export", "spare_parts", "stock_snapshots", "part_classes"),
+                   as_of, settings.DASHBOARD_TOP_DESCRIPTIONS, tuple(sorted(abc_classes)))
+
+
+def load_class_matrix(conn) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT abc_class, xyz_class, COUNT(*) AS parts, SUM(consumption_value) AS consumption_value
+        FROM part_classes
+        GROUP BY abc_class, xyz_class
+    """)
+
+def class_matrix() -> pd.DataFrame:
+    """Số linh kiện và giá trị tiêu thụ theo từng ô ABC × XYZ."""
+    return _cached(load_class_matrix, ("part_classes",))
+
+
+def rollup_grain(start, end, max_points):
+    """Kỳ gộp nhỏ nhất ('day', 'week', 'month', 'year') để khoảng [start, end] không quá `max_points` điểm."""
+    weeks = ((end - timedelta(days=end.weekday())) - (start - timedelta(days=start.weekday()))).days // 7 + 1
+    months = (end.year - start.year) * 12 + end.month - start.month + 1
+    for grain, points in (("day", (end - start).days + 1), ("week", weeks), ("month", months)):
+        if points <= max_points:
+            return grain
+    return "year"
+
+
+def load_movement_history(conn, start, end, grain, abc_classes) -> pd.DataFrame:
+    class_filter, params = _class_filter("part_id", abc_classes)
+    history = read_df(conn, f"""
+        SELECT {sql_period_start(conn, 'day', grain)} AS period, im_ex_flag, SUM(quantity) AS quantity
+        FROM daily_movements
+        WHERE day >= :start AND day <= :end{class_filter}
+        GROUP BY period, im_ex_flag
+        ORDER BY period
+    """, {**params, "start": start, "end": end})
+    history = history.rename(columns={'period': 'date'})
+    history['date'] = pd.to_datetime(history['date'])
+    history['quantity'] = history['quantity'].astype("int64")
+    return history
+
+def movement_history(start, end, max_points=None, abc_classes=()) -> tuple:
+    """Số lượng nhập/xuất trong [start, end] gộp theo kỳ chọn từ độ dài khoảng:
+    trả về (kỳ, DataFrame date, im_ex_flag, quantity) với không quá `max_points` kỳ."""
+    start, end = stock_history.as_date(start), stock_history.as_date(end)
+    grain = rollup_grain(start, end, max_points or settings.DASHBOARD_MAX_POINTS)
+    return grain, _cached(load_movement_history, ("import_export", "part_classes"),
+                          start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), grain,
+                          tuple(sorted(abc_classes)))
+
+
+# ---------------------- NHẬP / XUẤT KHO ------------------------
+
+def load_export_stats(conn, day) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT dm.day AS date, dm.part_id, sp.material_no, sp.description, dm.total_quantity
+        FROM (
+            SELECT day, part_id, SUM(quantity) AS total_quantity
+            FROM daily_movements
+            WHERE day = :day AND im_ex_flag = 0
+            GROUP BY day, part_id
+        ) dm
+        JOIN spare_parts sp ON dm.part_id = sp.id
+    """, {"day": day_bounds(day)[0]})
+
+def export_stats(day) -> pd.DataFrame:
+    """Số lượng xuất kho theo linh kiện trong một ngày ('YYYY-MM-DD')."""
+    return _cached(load_export_stats, ("import_export", "spare_parts"), day)
+
+
+# Chiều xem chi phí xuất kho -> (cột nhãn, JOIN lấy nhãn, GROUP BY)
+EXPORT_COST_DIMENSIONS = {
+    "day": ("ec.day", "", "ec.day"),
+    "dept": ("ec.dept_id, d.mc_of_dept AS dept", "LEFT JOIN dept d ON d.id = ec.dept_id",
+             "ec.dept_id, d.mc_of_dept"),
+    "mc_pos": ("ec.mc_pos_id, m.name AS machine, mp.mc_pos",
+               "LEFT JOIN machine_pos mp ON mp.id = ec.mc_pos_id LEFT JOIN machine m ON m.id = mp.mc_id",
+               "ec.mc_pos_id, m.name, mp.mc_pos"),
+    "part": ("ec.part_id, sp.material_no, sp.description", "JOIN spare_parts sp ON sp.id = ec.part_id",
+             "ec.part_id, sp.material_no, sp.description"),
+}
+
+
+def load_export_cost(conn, start, end, dimension, dept_id, mc_pos_id) -> pd.DataFrame:
+    columns, joins, group_by = EXPORT_COST_DIMENSIONS[dimension]
+    filters, params = "", {"start": start, "end": end}
+    if dept_id is not None:
+        filters += " AND ec.dept_id = :dept_id"
+        params["dept_id"] = dept_id
+    if mc_pos_id is not None:
+        filters += " AND ec.mc_pos_id = :mc_pos_id"
+        params["mc_pos_id"] = mc_pos_id
+    return read_df(conn, f"""
+        SELECT {columns}, SUM(ec.quantity) AS quantity, SUM(ec.cost) AS cost
+        FROM export_costs ec
+        {joins}
+        WHERE ec.day >= :start AND ec.day <= :end{filters}
+        GROUP BY {group_by}
+        ORDER BY {"ec.day" if dimension == "day" else "cost DESC"}
+    """, params)
+
+def export_cost(start, end, dimension="day", dept_id=None, mc_pos_id=None) -> pd.DataFrame:
+    """Chi phí xuất kho (theo đơn giá lúc xuất) trong [start, end] gộp theo `dimension`
+    ('day', 'dept', 'mc_pos', 'part'); `dept_id`, `mc_pos_id` giới hạn vào một bộ phận
+    hoặc vị trí máy khi xem chi tiết."""
+    start, end = stock_history.as_date(start), stock_history.as_date(end)
+    return _cached(load_export_cost, ("import_export", "spare_parts", "machine", "machine_pos", "dept"),
+                   start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), dimension,
+                   None if dept_id is None else int(dept_id), None if mc_pos_id is None else int(mc_pos_id))
+
+
+def load_consumption_rollup(conn, start, end) -> pd.DataFrame:
+    # Gộp position_costs theo vị trí máy trong SQL, rồi ROLLUP lên máy / nhóm máy / bộ phận bằng pandas
+    positions = read_df(conn, """
+        SELECT ec.dept_id, d.mc_of_dept AS dept, COALESCE(m.group_mc_id, 0) AS group_id,
+               g.mc_name AS machine_group, COALESCE(mp.mc_id, 0) AS machine_id, m.name AS machine,
+               ec.mc_pos_id, mp.mc_pos, ec.quantity, ec.cost, ec.movements
+        FROM (
+            SELECT dept_id, mc_pos_id, SUM(quantity) AS quantity, SUM(cost) AS cost, SUM(movements) AS movements
+            FROM position_costs
+            WHERE day >= :start AND day <= :end
+            GROUP BY dept_id, mc_pos_id
+        ) ec
+        LEFT JOIN dept d ON d.id = ec.dept_id
+        LEFT JOIN machine_pos mp ON mp.id = ec.mc_pos_id
+        LEFT JOIN machine m ON m.id = mp.mc_id
+        LEFT JOIN group_mc g ON g.id = m.group_mc_id
+    """, {"start": start, "end": end})
+    return rollups.rollup(positions, rollups.CONSUMPTION_LEVELS, rollups.CONSUMPTION_MEASURES)
+
+def consumption_rollup(start, end) -> pd.DataFrame:
+    """Số lượng và chi phí xuất kho trong [start, end] theo bộ phận → nhóm máy → máy → vị trí
+    máy, kèm dòng tổng của từng cấp (xem `rollups.rollup`)."""
+    start, end = stock_history.as_date(start), stock_history.as_date(end)
+    return _cached(load_consumption_rollup, ("import_export", "machine", "machine_pos", "group_mc", "dept"),
+                   start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+
+
+def load_import_stats(conn, day) -> pd.DataFrame:
+    return read_df(conn, """
+        SELECT dm.import_date, sp.material_no, dm.total_quantity_imported
+        FROM (
+            SELECT day AS import_date, part_id, SUM(quantity) AS total_quantity_imported
+            FROM daily_movements
+            WHERE day = :day AND im_ex_flag = 1
+            GROUP BY day, part_id
+        ) dm
+        JOIN spare_parts sp ON dm.part_id = sp.id
+    """, {"day": day_bounds(day)[0]})
+
+def import_stats(day) -> pd.DataFrame:
+    """Số lượng nhập kho theo linh kiện trong một ngày."""
+    return _cached(load_import_stats, ("import_export", "spare_parts"), day)
@@ -0,0 +1,56 @@
+"""Gộp tiêu hao theo cây bộ phận → nhóm máy → máy → vị trí máy.
+
+`rollup(...)` tương đương GROUP BY ROLLUP nhưng chạy bằng pandas trên kết quả đã gộp sẵn theo
+vị trí máy (vài trăm dòng), nên dùng chung cho MySQL và SQLite (SQLite không có ROLLUP). Mỗi
+dòng có cột `level`: 0 là tổng cộng, `len(levels)` là dòng chi tiết; cột của các cấp dưới
+`level` để trống. Các dòng được sắp theo cây: dòng tổng của một nút đứng ngay trước các nút con.
+"""
+import pandas as pd
+
+# Cấp gộp -> (cột khóa, cột nhãn)
+CONSUMPTION_LEVELS = [
+    ("dept_id", "dept"),
+    ("group_id", "machine_group"),
+    ("machine_id", "machine"),
+    ("mc_pos_id", "mc_pos"),
+]
+CONSUMPTION_MEASURES = ["quantity", "cost", "movements"]
+UNKNOWN = "Không rõ"
+
+
+def rollup(df, levels, measures) -> pd.DataFrame:
+    """Tổng `measures` của `df` theo mọi tiền tố của `levels` (danh sách (cột khóa, cột nhãn))."""
+    keys = [key for key, _ in levels]
+    frames = []
+    for depth in range(len(levels) + 1):
+        if depth:
+            frame = df.groupby(keys[:depth], sort=False)[measures].sum().reset_index()
+        else:
+            frame = df[measures].sum().to_frame().T
+        frame['level'] = depth
+        frames.append(frame)
+    result = pd.concat(frames, ignore_index=True).astype(df[measures].dtypes.to_dict())
+
+    for key, label in levels:
+        names = df.drop_duplicates(key).set_index(key)[label].fillna(UNKNOWN)
+        result[label] = result[key].map(names)
+    # Khóa trống (cấp gộp) đứng trước các nút con khi sắp xếp
+    result = result.sort_values(keys, na_position="first", kind="stable", ignore_index=True)
+    return result[['level'] + [column for level in levels for column in level] + measures]
+
+
+def children(table, levels, path) -> pd.DataFrame:
+    """Các nút con trực tiếp của nút `path` (giá trị khóa từ cấp trên xuống) trong bảng `rollup(...)`."""
+    depth = len(path)
+    mask = table['level'] == depth + 1
+    for (key, _), value in zip(levels, path):
+        mask &= table[key] == value
+    return table[mask]
+
+
+def node(table, levels, path) -> pd.Series:
+    """Dòng tổng của nút `path`."""
+    mask = table['level'] == len(path)
+    for (key, _), value in zip(levels, path):
+        mask &= table[key] == value
+    return table[mask].iloc[0]
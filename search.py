@@ -0,0 +1,180 @@
+"""Tìm kiếm linh kiện theo mã, mô tả, bin, cost center bằng chỉ mục trigram trong bộ nhớ.
+
+Mỗi linh kiện được chuẩn hóa (chữ thường, bỏ dấu tiếng Việt) và tách thành các cụm 3 ký tự;
+chỉ mục ngược trigram -> danh sách linh kiện cho phép tìm chuỗi con bất kỳ (kể cả một phần
+mã như "0012") chỉ bằng phép giao vài mảng, rồi xác nhận và xếp hạng trên số ít ứng viên.
+Truy vấn nhiều từ yêu cầu mọi từ đều khớp. Từ ngắn hơn 3 ký tự được so khớp trực tiếp.
+
+Chỉ mục được dựng lại khi data version `CATALOG` đổi: các transaction thêm/sửa/xóa linh
+kiện ghi thêm `CATALOG` vào `write_transaction(...)`; nhập/xuất chỉ đổi tồn kho nên không
+làm dựng lại. Dùng được cho cả MySQL và SQLite.
+"""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import settings
+from database import connect, data_version, read_df, recently_written
+
+# Data version của phần văn bản danh mục (không tăng khi chỉ đổi tồn kho)
+CATALOG = "catalog"
+
+# Trường được tìm -> trọng số khi xếp hạng
+FIELDS = {
+    "material_no": 5,
+    "part_no": 4,
+    "description": 3,
+    "bin": 1,
+    "cost_center": 1,
+}
+# Hệ số theo kiểu khớp: trùng cả trường, khớp đầu trường, khớp giữa trường
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+
+def normalize(value):
+    """Chữ thường, bỏ dấu (kể cả đ) để "bạc đạn" khớp "bac dan"."""
+    text = str(value)
+    if text.isascii():
+        return text.lower().strip()
+    text = unicodedata.normalize("NFKD", text).replace("đ", "d").replace("Đ", "d")
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower().strip()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _gram_code(gram):
+    # Ba mã ký tự (mỗi mã < 2^21) gói vào một số nguyên 63 bit
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+def _field_grams(values, offset):
+    """(mã trigram, vị trí linh kiện) của một trường, tính bằng numpy trên mảng ký tự."""
+    chars = np.array(values)
+    if chars.dtype.itemsize < 12:  # mọi giá trị ngắn hơn 3 ký tự
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int32)
+    chars = chars.view(np.uint32).reshape(len(values), -1).astype(np.int64)
+    codes = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+    # Ký tự 0 là phần đệm sau cuối chuỗi
+    valid = (chars[:, :-2] != 0) & (chars[:, 1:-1] != 0) & (chars[:, 2:] != 0)
+    return codes[valid], (np.nonzero(valid)[0] + offset).astype(np.int32)
+
+
+class TrigramIndex:
+    """Chỉ mục trigram trên các cột FIELDS của `df` (có cột id)."""
+
+    CHUNK = 20_000
+
+    def __init__(self, df):
+        self.ids = df['id'].to_numpy()
+        self.fields = {name: [normalize(v) if pd.notna(v) else "" for v in df[name]] for name in FIELDS}
+        # Ghép các trường bằng ký tự không gõ được để từ khóa không khớp vắt qua hai trường
+        self.docs = ["\x00".join(values) for values in zip(*self.fields.values())]
+        codes, owners = [], []
+        for values in self.fields.values():
+            # Theo từng khúc để mảng ký tự tạm không phình theo cả danh mục
+            for start in range(0, len(values), self.CHUNK):
+                chunk_codes, chunk_owners = _field_grams(values[start:start + self.CHUNK], start)
+                codes.append(chunk_codes)
+                owners.append(chunk_owners)
+        codes, owners = np.concatenate(codes), np.concatenate(owners)
+        order = np.lexsort((owners, codes))
+        codes, owners = codes[order], owners[order]
+        # Một linh kiện chỉ xuất hiện một lần trong danh sách của mỗi trigram
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = (codes[1:] != codes[:-1]) | (owners[1:] != owners[:-1])
+        codes, self.owners = codes[first], owners[first]
+        # Chỉ mục ngược: trigram thứ k (đã sắp) có danh sách owners[starts[k]:starts[k + 1]]
+        self.grams, starts = np.unique(codes, return_index=True)
+        self.starts = np.append(starts, len(codes))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _postings(self, gram):
+        k = np.searchsorted(self.grams, _gram_code(gram))
+        if k == len(self.grams) or self.grams[k] != _gram_code(gram):
+            return None
+        return self.owners[self.starts[k]:self.starts[k + 1]]
+
+    def _candidates(self, term):
+        grams = trigrams(term)
+        if not grams:
+            return np.array([i for i, doc in enumerate(self.docs) if term in doc], dtype=np.int32)
+        lists = sorted((self._postings(gram) for gram in grams), key=lambda p: 0 if p is None else len(p))
+        if lists[0] is None:
+            return np.array([], dtype=np.int32)
+        found = lists[0]
+        for positions in lists[1:]:
+            found = np.intersect1d(found, positions, assume_unique=True)
+            if not len(found):
+                break
+        # Trigram đều có mặt chưa chắc là chuỗi con liền nhau: xác nhận lại
+        return np.array([i for i in found if term in self.docs[i]], dtype=np.int32)
+
+    def _score(self, position, term):
+        best = 0
+        for name, weight in FIELDS.items():
+            value = self.fields[name][position]
+            if value == term:
+                best = max(best, weight * EXACT)
+            elif value.startswith(term):
+                best = max(best, weight * PREFIX)
+            elif term in value:
+                best = max(best, weight * SUBSTRING)
+        return best
+
+    def search(self, query, limit=None):
+        """id các linh kiện khớp mọi từ của `query`, điểm cao trước (trùng mã > khớp đầu mã > mô tả ...)."""
+        terms = normalize(query).split()
+        if not terms:
+            return []
+        found = None
+        for term in sorted(terms, key=len, reverse=True):
+            positions = self._candidates(term)
+            found = positions if found is None else np.intersect1d(found, positions, assume_unique=True)
+            if not len(found):
+                return []
+        scores = np.array([sum(self._score(p, term) for term in terms) for p in found])
+        order = np.lexsort((self.ids[found], -scores))
+        ranked = self.ids[found][order]
+        return [int(part_id) for part_id in (ranked if limit is None else ranked[:limit])]
+
+
+def load_index(conn):
+    return TrigramIndex(read_df(conn, f"SELECT id, {', '.join(FIELDS)} FROM spare_parts"))
+
+
+@st.cache_resource(max_entries=1, ttl=settings.CACHE_TTL_SECONDS, show_spinner=False)
+def _part_index(version, primary):
+    with connect(primary=primary) as conn:
+        return load_index(conn)
+
+
+def part_index():
+    """Chỉ mục của danh mục hiện tại (dựng lại khi data version CATALOG đổi)."""
+    # Danh mục vừa bị ghi thì đọc từ primary để không dựng chỉ mục từ replica chưa cập nhật
+    return _part_index(data_version(CATALOG), recently_written(CATALOG))
+
+
+@st.cache_data(max_entries=256, ttl=settings.CACHE_TTL_SECONDS, show_spinner=False)
+def _search(version, primary, query, limit):
+    return _part_index(version, primary).search(query, limit)
+
+
+def search_parts(query, limit=None):
+    """id linh kiện khớp `query`, đã xếp hạng (kết quả được cache theo data version CATALOG)."""
+    return _search(data_version(CATALOG), recently_written(CATALOG), normalize(query), limit)
+
+
+def filter_frame(df, query, limit=None):
+    """Các dòng của `df` (có cột id) khớp `query` theo thứ tự xếp hạng; `query` rỗng thì trả nguyên `df`."""
+    if not query or not query.strip():
+        return df
+    ids = search_parts(query, limit)
+    rank = pd.Series(range(len(ids)), index=ids)
+    matched = df[df['id'].isin(rank.index)]
+    return matched.iloc[matched['id'].map(rank).to_numpy().argsort(kind="stable")]
@@ -1,18 +1,20 @@
 import streamlit as st
 import pandas as pd
 from sqlalchemy import text
-from database import get_engine
+from database import write_transaction
+import alerts
+import lots
+import repository
+import search
 import altair as alt
 
 # Hàm load các loại máy từ cơ sở dữ liệu
 def load_machine_types():
-    engine = get_engine()
-    return pd.read_sql("SELECT id, machine FROM machine_type", engine)
+    return repository.machine_types()
 
 # Hàm load dữ liệu spare parts từ cơ sở dữ liệu
 def load_spare_parts():
-    engine = get_engine()
-    return pd.read_sql("SELECT * FROM spare_parts", engine)
+    return repository.spare_parts()
 
 def manage_spare_parts():
     st.title("Quản lý linh kiện")
@@ -136,7 +138,7 @@ def manage_spare_parts():
                     return
 
                 # Cập nhật thông tin vật liệu và trừ số lượng xuất kho
-                with get_engine().begin() as conn:
+                with write_transaction("spare_parts", search.CATALOG) as conn:
                     # Cập nhật dữ liệu trong cơ sở dữ liệu
                     conn.execute(text(""" 
                         UPDATE spare_parts
@@ -150,8 +152,9 @@ def manage_spare_parts():
                             stock = :stock,
                             safety_stock = :safety_stock,
                             safety_stock_check = :safety_stock_check
-                        WHERE material_no = :material_no
+                        WHERE id = :part_id
                     """), {
+                        "part_id": int(selected_data['id']),
                         "material_no": material_no,
                         "description": description,
                         "part_no": part_no,
@@ -163,6 +166,9 @@ def manage_spare_parts():
                         "safety_stock": safety_stock,
                         "safety_stock_check": safety_stock_check
                     })
+                    # Tồn kho hoặc mức an toàn vừa đổi: cân lại lô FIFO và mở/đóng cảnh báo tương ứng
+                    lots.sync_part(conn, int(selected_data['id']))
+                    alerts.check_part(conn, int(selected_data['id']))
 
                 # Cập nhật lại parts_data sau khi thay đổi
                 st.session_state.reload_parts_data = True
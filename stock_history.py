@@ -0,0 +1,105 @@
+"""Tồn kho tại một ngày bất kỳ.
+
+Snapshot ngày S (bảng stock_snapshots) là tồn kho cuối ngày S của mọi linh kiện. Tồn kho cuối
+ngày D được tính từ mốc gần D nhất trong: snapshot gần nhất trước D, snapshot gần nhất sau D
+và tồn kho hiện tại (spare_parts.stock), bằng cách cộng hoặc trừ `stock_delta` của
+daily_movements trong các ngày nằm giữa mốc và D. Nhờ vậy chỉ phải đọc lại một khoảng ngắn
+của lịch sử, dù lịch sử dài bao nhiêu năm.
+
+Tạo snapshot định kỳ (ví dụ cuối mỗi tháng) bằng:
+
+    python tools/manage.py snapshot-stock --date 2025-01-31
+"""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from database import read_df, read_scalar
+
+_FAR_FUTURE = "9999-12-31"
+
+
+def as_date(day):
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return datetime.strptime(str(day)[:10], '%Y-%m-%d').date()
+
+
+def take_snapshot(conn, day=None):
+    """Ghi snapshot cuối ngày `day` (mặc định hôm qua), tính ngược từ tồn kho hiện tại.
+    Trả về số linh kiện đã ghi."""
+    day = as_date(day) if day else date.today() - timedelta(days=1)
+    params = {"day": day.strftime('%Y-%m-%d')}
+    conn.execute(text("DELETE FROM stock_snapshots WHERE snapshot_date = :day"), params)
+    return conn.execute(text("""
+        INSERT INTO stock_snapshots (snapshot_date, part_id, stock)
+        SELECT :day, sp.id, COALESCE(sp.stock, 0) - COALESCE(d.delta, 0)
+        FROM spare_parts sp
+        LEFT JOIN (
+            SELECT part_id, SUM(stock_delta) AS delta
+            FROM daily_movements
+            WHERE day > :day
+            GROUP BY part_id
+        ) d ON d.part_id = sp.id
+    """), params).rowcount
+
+
+def nearest_anchor(conn, day):
+    """Mốc gần `day` nhất: ("snapshot", ngày) hoặc ("current", None)."""
+    day = as_date(day)
+    today = date.today()
+    if day >= today:
+        return "current", None
+    params = {"day": day.strftime('%Y-%m-%d')}
+    before = read_scalar(conn, "SELECT MAX(snapshot_date) FROM stock_snapshots WHERE snapshot_date <= :day", params)
+    after = read_scalar(conn, "SELECT MIN(snapshot_date) FROM stock_snapshots WHERE snapshot_date > :day", params)
+    candidates = [((today - day).days, "current", None)]
+    for snapshot in (before, after):
+        if snapshot is not None:
+            snapshot = as_date(snapshot)
+            candidates.append((abs((snapshot - day).days), "snapshot", snapshot))
+    _, kind, snapshot = min(candidates, key=lambda c: c[0])
+    return kind, snapshot
+
+
+def stock_as_of_query(conn, day):
+    """(SQL, params) trả về các dòng (part_id, stock): tồn kho cuối ngày `day`, để dùng
+    làm bảng con trong các truy vấn tổng hợp."""
+    day = as_date(day)
+    kind, snapshot = nearest_anchor(conn, day)
+    if kind == "current" and day >= date.today():
+        return "SELECT id AS part_id, COALESCE(stock, 0) AS stock FROM spare_parts", {}
+
+    day_str = day.strftime('%Y-%m-%d')
+    if kind == "current":
+        # Lùi từ tồn kho hiện tại: trừ thay đổi của các ngày sau D
+        base, sign, low, high = "COALESCE(sp.stock, 0)", -1, day_str, _FAR_FUTURE
+        params = {}
+    else:
+        anchor = snapshot.strftime('%Y-%m-%d')
+        base = "COALESCE(s.stock, 0)"
+        # Tiến từ snapshot trước D, hoặc lùi từ snapshot sau D
+        sign, low, high = (1, anchor, day_str) if snapshot <= day else (-1, day_str, anchor)
+        params = {"anchor": anchor}
+    snapshot_join = ("LEFT JOIN stock_snapshots s ON s.part_id = sp.id AND s.snapshot_date = :anchor"
+                     if kind == "snapshot" else "")
+    params.update({"low": low, "high": high})
+    return f"""
+        SELECT sp.id AS part_id, {base} + {sign} * COALESCE(d.delta, 0) AS stock
+        FROM spare_parts sp
+        {snapshot_join}
+        LEFT JOIN (
+            SELECT part_id, SUM(stock_delta) AS delta
+            FROM daily_movements
+            WHERE day > :low AND day <= :high
+            GROUP BY part_id
+        ) d ON d.part_id = sp.id
+    """, params
+
+
+def stock_as_of(conn, day):
+    """DataFrame (part_id, stock): tồn kho cuối ngày `day` của mọi linh kiện hiện có."""
+    query, params = stock_as_of_query(conn, day)
+    return read_df(conn, query, params)
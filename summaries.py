@@ -0,0 +1,196 @@
+"""Bảng tổng hợp được cập nhật cùng transaction với mỗi lượt nhập/xuất.
+
+`daily_movements` giữ tổng số lượng theo (ngày, linh kiện, nhập/xuất, vị trí máy) để
+các biểu đồ theo ngày không phải GROUP BY DATE(date) trên toàn bộ import_export.
+Vị trí máy rỗng được lưu là 0 để dùng được trong khóa chính. `stock_delta` là thay đổi
+tồn kho thực tế (xuất FOC không trừ kho), dùng để tính tồn kho tại một ngày bất kỳ.
+Các lượt đã chuyển sang archive Parquet vẫn được tính khi tổng hợp lại hoặc đối chiếu.
+
+`export_costs` là khối chi phí xuất kho theo (ngày, linh kiện, vị trí máy, bộ phận của máy),
+chi phí tính theo đơn giá lúc xuất; báo cáo chi phí theo khoảng ngày chỉ đọc các ngày được chọn.
+`position_costs` là cùng khối đó gộp bỏ chiều linh kiện, dùng cho báo cáo tiêu hao theo máy.
+"""
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import archive
+
+NO_MC_POS = 0
+NO_DEPT = 0
+# Lý do của lượt xuất miễn phí: ghi lịch sử nhưng không trừ tồn kho
+FOC_REASON = "FOC"
+
+_UPSERT_DAILY = {
+    "mysql": """
+        INSERT INTO daily_movements (day, part_id, im_ex_flag, mc_pos_id, quantity, movements, stock_delta)
+        VALUES (:day, :part_id, :im_ex_flag, :mc_pos_id, :quantity, :movements, :stock_delta)
+        ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity), movements = movements + VALUES(movements),
+                                stock_delta = stock_delta + VALUES(stock_delta)
+    """,
+    "sqlite": """
+        INSERT INTO daily_movements (day, part_id, im_ex_flag, mc_pos_id, quantity, movements, stock_delta)
+        VALUES (:day, :part_id, :im_ex_flag, :mc_pos_id, :quantity, :movements, :stock_delta)
+        ON CONFLICT (day, part_id, im_ex_flag, mc_pos_id)
+        DO UPDATE SET quantity = quantity + excluded.quantity, movements = movements + excluded.movements,
+                      stock_delta = stock_delta + excluded.stock_delta
+    """,
+}
+
+
+_UPSERT_EXPORT_COST = {
+    "mysql": """
+        INSERT INTO export_costs (day, part_id, mc_pos_id, dept_id, quantity, cost, movements)
+        VALUES (:day, :part_id, :mc_pos_id, :dept_id, :quantity, :cost, 1)
+        ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity), cost = cost + VALUES(cost),
+                                movements = movements + 1
+    """,
+    "sqlite": """
+        INSERT INTO export_costs (day, part_id, mc_pos_id, dept_id, quantity, cost, movements)
+        VALUES (:day, :part_id, :mc_pos_id, :dept_id, :quantity, :cost, 1)
+        ON CONFLICT (day, part_id, mc_pos_id, dept_id)
+        DO UPDATE SET quantity = quantity + excluded.quantity, cost = cost + excluded.cost,
+                      movements = movements + 1
+    """,
+}
+
+_UPSERT_POSITION_COST = {
+    "mysql": """
+        INSERT INTO position_costs (day, mc_pos_id, dept_id, quantity, cost, movements)
+        VALUES (:day, :mc_pos_id, :dept_id, :quantity, :cost, 1)
+        ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity), cost = cost + VALUES(cost),
+                                movements = movements + 1
+    """,
+    "sqlite": """
+        INSERT INTO position_costs (day, mc_pos_id, dept_id, quantity, cost, movements)
+        VALUES (:day, :mc_pos_id, :dept_id, :quantity, :cost, 1)
+        ON CONFLICT (day, mc_pos_id, dept_id)
+        DO UPDATE SET quantity = quantity + excluded.quantity, cost = cost + excluded.cost,
+                      movements = movements + 1
+    """,
+}
+
+
+def add_daily_movement(conn, date, part_id, im_ex_flag, mc_pos_id, quantity, stock_delta):
+    """Cộng một lượt nhập/xuất vào daily_movements (`date` dạng 'YYYY-MM-DD HH:MM:SS')."""
+    conn.execute(text(_UPSERT_DAILY[conn.dialect.name]), {
+        "day": date[:10],
+        "part_id": part_id,
+        "im_ex_flag": im_ex_flag,
+        "mc_pos_id": NO_MC_POS if mc_pos_id is None else mc_pos_id,
+        "quantity": quantity,
+        "movements": 1,
+        "stock_delta": stock_delta,
+    })
+
+
+def add_export_cost(conn, date, part_id, mc_pos_id, quantity):
+    """Cộng một lượt xuất vào export_costs và position_costs theo đơn giá hiện tại và bộ phận
+    của vị trí máy."""
+    mc_pos_id = NO_MC_POS if mc_pos_id is None else mc_pos_id
+    price, dept_id = conn.execute(text(f"""
+        SELECT COALESCE(sp.price, 0),
+               COALESCE((SELECT m.dept_id FROM machine_pos mp JOIN machine m ON m.id = mp.mc_id
+                         WHERE mp.id = :mc_pos_id), {NO_DEPT})
+        FROM spare_parts sp WHERE sp.id = :part_id
+    """), {"part_id": part_id, "mc_pos_id": mc_pos_id}).first() or (0, NO_DEPT)
+    params = {
+        "day": date[:10],
+        "part_id": part_id,
+        "mc_pos_id": mc_pos_id,
+        "dept_id": dept_id,
+        "quantity": quantity,
+        "cost": quantity * price,
+    }
+    conn.execute(text(_UPSERT_EXPORT_COST[conn.dialect.name]), params)
+    conn.execute(text(_UPSERT_POSITION_COST[conn.dialect.name]), params)
+
+
+def rebuild_export_costs(conn):
+    """Tính lại export_costs từ daily_movements (đã gồm archive) theo đơn giá hiện tại;
+    trả về số dòng."""
+    conn.execute(text("DELETE FROM export_costs"))
+    conn.execute(text(f"""
+        INSERT INTO export_costs (day, part_id, mc_pos_id, dept_id, quantity, cost, movements)
+        SELECT dm.day, dm.part_id, dm.mc_pos_id, COALESCE(m.dept_id, {NO_DEPT}),
+               dm.quantity, dm.quantity * COALESCE(sp.price, 0), dm.movements
+        FROM daily_movements dm
+        JOIN spare_parts sp ON sp.id = dm.part_id
+        LEFT JOIN machine_pos mp ON mp.id = dm.mc_pos_id
+        LEFT JOIN machine m ON m.id = mp.mc_id
+        WHERE dm.im_ex_flag = 0
+    """))
+    return conn.execute(text("SELECT COUNT(*) FROM export_costs")).scalar()
+
+
+def rebuild_position_costs(conn):
+    """Tính lại position_costs từ export_costs; trả về số dòng."""
+    conn.execute(text("DELETE FROM position_costs"))
+    conn.execute(text("""
+        INSERT INTO position_costs (day, mc_pos_id, dept_id, quantity, cost, movements)
+        SELECT day, mc_pos_id, dept_id, SUM(quantity), SUM(cost), SUM(movements)
+        FROM export_costs
+        GROUP BY day, mc_pos_id, dept_id
+    """))
+    return conn.execute(text("SELECT COUNT(*) FROM position_costs")).scalar()
+
+
+def _archived_daily_groups(conn):
+    """Tổng theo (ngày, linh kiện, nhập/xuất, vị trí máy) của các lượt trong archive, theo từng phần."""
+    columns = ["date", "part_id", "im_ex_flag", "mc_pos_id", "quantity", "reason"]
+    for chunk in archive.iter_movements(conn, columns, include_hot=False):
+        chunk = chunk.assign(
+            day=chunk['date'].dt.strftime('%Y-%m-%d'),
+            mc_pos_id=chunk['mc_pos_id'].fillna(NO_MC_POS).astype("int64"),
+            stock_delta=np.where(chunk['im_ex_flag'] == 1, chunk['quantity'],
+                                 np.where(chunk['reason'] == FOC_REASON, 0, -chunk['quantity'])),
+        )
+        groups = chunk.groupby(['day', 'part_id', 'im_ex_flag', 'mc_pos_id'], as_index=False).agg(
+            quantity=('quantity', 'sum'), movements=('quantity', 'size'), stock_delta=('stock_delta', 'sum'))
+        yield groups.astype({c: "int64" for c in groups.columns if c != 'day'})
+
+
+def rebuild_daily_movements(conn):
+    """Tính lại toàn bộ daily_movements từ import_export và archive; trả về số dòng tổng hợp."""
+    conn.execute(text("DELETE FROM daily_movements"))
+    conn.execute(text(f"""
+        INSERT INTO daily_movements (day, part_id, im_ex_flag, mc_pos_id, quantity, movements, stock_delta)
+        SELECT DATE(date), part_id, im_ex_flag + 0, COALESCE(mc_pos_id, {NO_MC_POS}), SUM(quantity), COUNT(*),
+               SUM(CASE WHEN im_ex_flag = 1 THEN quantity
+                        WHEN reason = '{FOC_REASON}' THEN 0
+                        ELSE -quantity END)
+        FROM import_export
+        WHERE date IS NOT NULL
+        GROUP BY DATE(date), part_id, im_ex_flag + 0, COALESCE(mc_pos_id, {NO_MC_POS})
+    """))
+    for groups in _archived_daily_groups(conn):
+        conn.execute(text(_UPSERT_DAILY[conn.dialect.name]), groups.to_dict("records"))
+    return conn.execute(text("SELECT COUNT(*) FROM daily_movements")).scalar()
+
+
+def daily_totals_from_history(conn, im_ex_flag) -> pd.DataFrame:
+    """Tổng theo ngày tính thẳng từ archive và import_export (đọc theo chunk, bộ nhớ không đổi
+    theo kích thước bảng); dùng để đối chiếu với daily_movements."""
+    totals = pd.Series(dtype="int64")
+    for chunk in archive.iter_movements(conn, ["date", "quantity"], im_ex_flag=im_ex_flag):
+        day = chunk['date'].dt.normalize()
+        totals = totals.add(chunk['quantity'].groupby(day).sum(), fill_value=0)
+    daily = totals.astype("int64").rename_axis('date').reset_index(name='quantity')
+    daily['date'] = pd.to_datetime(daily['date']).dt.date
+    return daily.sort_values('date', ignore_index=True)
+
+
+def check_daily_movements(conn):
+    """Danh sách (nhập/xuất, ngày, số trong bảng tổng hợp, số tính lại) bị lệch."""
+    mismatches = []
+    for flag in (1, 0):
+        expected = daily_totals_from_history(conn, flag).set_index('date')['quantity']
+        stored = pd.read_sql_query(text("""
+            SELECT day, SUM(quantity) AS quantity FROM daily_movements
+            WHERE im_ex_flag = :flag GROUP BY day
+        """), conn, params={"flag": flag})
+        stored = stored.set_index(pd.to_datetime(stored['day']).dt.date)['quantity']
+        both = pd.concat([stored.rename('stored'), expected.rename('expected')], axis=1).fillna(0)
+        for day, row in both[both['stored'] != both['expected']].iterrows():
+            mismatches.append((flag, day, int(row['stored']), int(row['expected'])))
+    return mismatches
@@ -0,0 +1,11 @@
+"""Cấu hình chung cho test: thêm thư mục gốc vào cuối sys.path (để email.py của repo không che
+module email chuẩn) và trỏ app vào SQLite, không ghi log truy vấn."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+os.environ.setdefault("WAREHOUSE_DB_BACKEND", "sqlite")
+os.environ.setdefault("WAREHOUSE_QUERY_LOG_PATH", "")
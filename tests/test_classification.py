@@ -0,0 +1,30 @@
+"""Phân loại ABC/XYZ (`classification.py`) so với số tính tay."""
+import numpy as np
+
+import classification
+
+
+def test_abc_cumulative_share_cut_offs():
+    # Tổng 100, tỷ lệ cộng dồn trước mỗi linh kiện: 0, .5, .8, .9, .95
+    # Linh kiện 30 đưa tổng lên đúng .8 vẫn là A; bắt đầu từ .8 là B; từ .95 là C; 0 luôn là C.
+    # Hai linh kiện cùng giá trị 5 giữ thứ tự đầu vào
+    values = [5, 30, 0, 10, 50, 5]
+    classes = classification.abc_classes(values, a_share=0.8, b_share=0.95)
+    assert classes.tolist() == ["B", "A", "C", "B", "A", "C"]
+
+
+def test_abc_without_consumption_is_all_c():
+    assert classification.abc_classes([0, 0], 0.8, 0.95).tolist() == ["C", "C"]
+
+
+def test_xyz_by_coefficient_of_variation():
+    # CV = std / avg: .2 -> X, .5 đúng ngưỡng -> X, .7 -> Y, 2 -> Z
+    classes, cv = classification.xyz_classes([10, 10, 10, 10], [2, 5, 7, 20], x_cv=0.5, y_cv=1.0)
+    assert classes.tolist() == ["X", "X", "Y", "Z"]
+    np.testing.assert_allclose(cv, [0.2, 0.5, 0.7, 2.0])
+
+
+def test_xyz_with_zero_mean_demand_is_z():
+    classes, cv = classification.xyz_classes([0, 0], [0, 3], x_cv=0.5, y_cv=1.0)
+    assert classes.tolist() == ["Z", "Z"]
+    assert np.isnan(cv).all()
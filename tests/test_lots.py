@@ -0,0 +1,77 @@
+"""Lô tồn kho theo FIFO (`lots.py`) so với số tính tay."""
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import lots
+
+
+@pytest.fixture
+def conn():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE stock_lots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                part_id INTEGER NOT NULL,
+                receipt_id INTEGER,
+                received_at DATETIME NOT NULL,
+                quantity INTEGER NOT NULL,
+                remaining INTEGER NOT NULL
+            )
+        """))
+        yield conn
+
+
+def _remaining(conn, part_id):
+    return conn.execute(text("""
+        SELECT received_at, remaining FROM stock_lots WHERE part_id = :part_id ORDER BY received_at
+    """), {"part_id": part_id}).fetchall()
+
+
+def test_consume_fifo_takes_oldest_lots_first(conn):
+    lots.add_lot(conn, 1, 3, "2024-01-01 00:00:00")
+    lots.add_lot(conn, 1, 4, "2024-03-01 00:00:00")
+    lots.add_lot(conn, 1, 5, "2024-02-01 00:00:00")
+    lots.add_lot(conn, 2, 9, "2023-01-01 00:00:00")
+
+    # Hết lô tháng 1 (3), trừ 3 vào lô tháng 2
+    assert lots.consume_fifo(conn, 1, 6) == 0
+    assert _remaining(conn, 1) == [("2024-02-01 00:00:00", 2), ("2024-03-01 00:00:00", 4)]
+    assert _remaining(conn, 2) == [("2023-01-01 00:00:00", 9)]
+
+
+def test_consume_fifo_over_consumption_returns_shortfall(conn):
+    lots.add_lot(conn, 1, 2, "2024-01-01 00:00:00")
+    lots.add_lot(conn, 1, 4, "2024-02-01 00:00:00")
+
+    assert lots.consume_fifo(conn, 1, 10) == 4
+    assert _remaining(conn, 1) == []
+    assert lots.consume_fifo(conn, 1, 1) == 1
+
+
+def test_fifo_lots_keeps_newest_receipts():
+    stock = pd.Series({1: 7, 2: 10, 3: 4})
+    receipts = pd.DataFrame({
+        "id": [11, 12, 13, 21, 91],
+        "part_id": [1, 1, 1, 2, 9],
+        "date": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01", "2024-01-05", "2024-01-01"]),
+        "quantity": [5, 4, 2, 3, 8],
+    })
+    fallback = pd.Series(pd.to_datetime(["2023-06-01"] * 3), index=[1, 2, 3])
+
+    result = lots.fifo_lots(stock, receipts, fallback)
+    rows = sorted(((int(r.part_id), int(r.receipt_id) if pd.notna(r.receipt_id) else None,
+                    pd.Timestamp(r.received_at).strftime("%Y-%m-%d"), int(r.remaining))
+                   for r in result.itertuples()), key=lambda row: (row[0], row[2], row[1] or 0))
+    # Linh kiện 1: 2 + 4 từ hai lượt mới nhất, lượt cũ nhất chỉ còn 1
+    # Linh kiện 2: tồn 10 nhưng chỉ nhập 3, phần thiếu 7 là lô điều chỉnh ghi ngày lượt nhập cũ nhất
+    # Linh kiện 3: không có lượt nhập, lô điều chỉnh ghi ngày dự phòng; linh kiện 9 không còn tồn kho
+    assert rows == [
+        (1, 11, "2024-01-01", 1),
+        (1, 12, "2024-02-01", 4),
+        (1, 13, "2024-03-01", 2),
+        (2, None, "2024-01-05", 7),
+        (2, 21, "2024-01-05", 3),
+        (3, None, "2023-06-01", 4),
+    ]
@@ -0,0 +1,34 @@
+"""Tốc độ tiêu thụ và điểm đặt hàng lại (`reorder.py`) so với số tính tay."""
+import math
+
+import numpy as np
+
+import reorder
+
+
+def test_usage_stats_counts_days_without_usage_as_zero():
+    # Cửa sổ 4 ngày: linh kiện 1 dùng 4 và 2 (hai ngày còn lại 0), linh kiện 3 dùng 8 một ngày,
+    # linh kiện 2 không dùng; dòng của linh kiện 99 không có trong danh sách bị bỏ qua
+    avg, std = reorder.usage_stats([3, 1, 2], [1, 1, 3, 99], [4, 2, 8, 50], window_days=4)
+    np.testing.assert_allclose(avg, [2.0, 1.5, 0.0])
+    np.testing.assert_allclose(std, [math.sqrt(64 / 4 - 4), math.sqrt(20 / 4 - 2.25), 0.0])
+
+
+def test_usage_stats_without_parts():
+    avg, std = reorder.usage_stats([], [1], [5], window_days=30)
+    assert len(avg) == 0 and len(std) == 0
+
+
+def test_reorder_point_is_at_least_safety_stock():
+    # avg 2/ngày, lead time 4 ngày, std 1, z 1.5: 8 + 1.5 * 1 * 2 = 11
+    # avg 0.5, std 0: 2 < safety_stock 5; 0.1 * 30 = 3.0000000000000004 vẫn làm tròn lên 3
+    points = reorder.reorder_point([2.0, 0.5, 0.1], [1.0, 0.0, 0.0], [0, 5, 0], 4, 1.5)
+    assert points[:2].tolist() == [11, 5]
+    assert reorder.reorder_point([0.1], [0.0], [0], 30, 1.5).tolist() == [3]
+
+
+def test_days_of_cover_and_reorder_now():
+    cover = reorder.days_of_cover([10, 5], [2.0, 0.0])
+    assert cover[0] == 5.0 and np.isnan(cover[1])
+    # Chạm đúng điểm thì đặt hàng; điểm 0 (không tiêu thụ, không safety stock) thì không
+    assert reorder.reorder_now([8, 9, 0], [8, 8, 0]).tolist() == [True, False, False]
@@ -0,0 +1,40 @@
+"""Chỉ mục trigram (`search.TrigramIndex`) cho cùng kết quả với quét chuỗi con từng trường."""
+import pandas as pd
+import pytest
+
+import search
+
+CATALOG = pd.DataFrame({
+    "id": [1, 2, 3, 4, 5, 6],
+    "material_no": ["SP000123", "SP001200", "SP0012", "AB9", "SP1", "X"],
+    "part_no": ["P-12", "P-99", None, "sp0012-b", "Q", "Z"],
+    "description": ["Bạc đạn 6205", "Dây curoa", "bac dan lon", "Đai ốc M8", "Ống dầu", "a"],
+    "bin": ["A17", "B02", "A1", "C3", "a17", ""],
+    "cost_center": ["CC007", "CC008", "CC007", "CC010", "CC1", "cc"],
+})
+
+
+def _scan(term):
+    """Cách tìm cũ: từng từ phải là chuỗi con của ít nhất một trường (đã chuẩn hóa)."""
+    fields = CATALOG[list(search.FIELDS)].map(lambda v: search.normalize(v) if pd.notna(v) else "")
+    words = search.normalize(term).split()
+    hit = pd.Series(True, index=CATALOG.index)
+    for word in words:
+        hit &= fields.apply(lambda column: column.str.contains(word, regex=False)).any(axis=1)
+    return set(CATALOG.loc[hit, "id"])
+
+
+@pytest.mark.parametrize("term", ["sp0012", "0012", "SP000123", "bạc đạn", "bac dan", "đai",
+                                  "a", "a1", "cc", "sp", "12 cc007", "xyz", "dầu"])
+def test_trigram_hits_match_substring_scan(term):
+    index = search.TrigramIndex(CATALOG)
+    assert set(index.search(term)) == _scan(term)
+
+
+def test_term_does_not_match_across_fields():
+    # "a17" + "cc0" ghép hai trường không được tính là khớp
+    assert search.TrigramIndex(CATALOG).search("17cc0") == []
+
+
+def test_exact_code_ranks_first():
+    assert search.TrigramIndex(CATALOG).search("sp0012", limit=2) == [3, 2]
@@ -0,0 +1,66 @@
+"""Phân trang keyset của lưới View Stock (`repository.load_stock_page`) khi nhiều dòng cùng giá trị sắp xếp."""
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import migrations
+import repository
+from conftest import ROOT
+
+# (id, material_no, stock): stock trùng nhau để id phải phân định thứ tự
+PARTS = [(1, "M5", 5), (2, "M3", 3), (3, "M1", 5), (4, "M4", 5), (5, "M2", 1), (6, "M6", 3), (7, "M7", 5)]
+ASCENDING = [5, 2, 6, 1, 3, 4, 7]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stock.db'}")
+    with open(os.path.join(ROOT, "createdatabase.sqlite"), encoding="utf-8") as f:
+        script = f.read()
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.executescript(script)
+        raw.commit()
+    finally:
+        raw.close()
+    migrations.upgrade(engine, log=lambda message: None)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO machine_type (id, machine) VALUES (1, 'Fong')"))
+        conn.execute(text("""
+            INSERT INTO spare_parts (id, material_no, machine_type_id, stock) VALUES (:id, :material_no, 1, :stock)
+        """), [{"id": i, "material_no": m, "stock": s} for i, m, s in PARTS])
+    return engine
+
+
+def _page(conn, descending, after, size=2):
+    return repository.load_stock_page(conn, date.today(), repository.StockFilters(), (), (),
+                                      "stock", descending, after, size)
+
+
+def _walk(conn, descending):
+    """Đi hết các trang bằng nút "Trang sau"; trả về id từng trang và con trỏ đầu mỗi trang."""
+    cursors, pages = [None], []
+    while True:
+        page = _page(conn, descending, cursors[-1])
+        pages.append(page['id'].tolist())
+        if len(page) < 2:
+            return pages, cursors
+        cursors.append((page['sort_key'].iloc[-1].item(), int(page['id'].iloc[-1])))
+
+
+@pytest.mark.parametrize("descending, expected", [(False, ASCENDING), (True, ASCENDING[::-1])])
+def test_next_pages_cover_every_row_once(engine, descending, expected):
+    with engine.connect() as conn:
+        pages, _ = _walk(conn, descending)
+    assert pages == [expected[i:i + 2] for i in range(0, len(expected), 2)]
+
+
+def test_previous_page_returns_same_rows(engine):
+    with engine.connect() as conn:
+        pages, cursors = _walk(conn, False)
+        # "Trang trước" bỏ con trỏ cuối và đọc lại từ con trỏ của trang trước đó
+        while len(cursors) > 1:
+            cursors.pop()
+            assert _page(conn, False, cursors[-1])['id'].tolist() == pages[len(cursors) - 1]
@@ -0,0 +1,37 @@
+"""Giới hạn RSS khi tổng hợp lịch sử nhập/xuất theo ngày (`summaries.daily_totals_from_history`).
+
+Chạy `benchmarks/bench_streaming_rss.py` trên một file SQLite tạm. Để test chạy trong chưa đầy
+một phút, dùng 500 nghìn lượt và chunk 10 nghìn dòng thay cho 10 triệu lượt; benchmark đầy
+đủ vẫn chạy bằng tay. Cách nạp toàn bộ cũng được đo để chắc giới hạn đủ chặt để phân biệt.
+
+Chạy từ thư mục gốc bằng `pytest tests` (không dùng `python -m pytest`: email.py của repo
+che module email chuẩn khi thư mục gốc nằm đầu sys.path).
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.join(ROOT, "benchmarks", "bench_streaming_rss.py")
+
+MOVEMENTS = 500_000
+CHUNK_ROWS = 10_000
+MAX_RSS_MB = 40
+
+
+def test_daily_totals_rss_is_capped(tmp_path):
+    output = tmp_path / "rss.json"
+    env = {**os.environ, "WAREHOUSE_STREAM_CHUNK_ROWS": str(CHUNK_ROWS)}
+    run = subprocess.run(
+        [sys.executable, BENCH, "--movements", str(MOVEMENTS), "--parts", "2000", "--compare-full",
+         "--max-rss-mb", str(MAX_RSS_MB), "--output", str(output)],
+        cwd=tmp_path, env=env, capture_output=True, text=True,
+    )
+    assert run.returncode == 0, run.stdout + run.stderr
+
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    assert results["streaming"]["growth_mb"] <= MAX_RSS_MB
+    # Cùng kết quả nhưng nạp toàn bộ thì vượt giới hạn
+    assert results["full"]["growth_mb"] > MAX_RSS_MB
+    assert results["streaming"]["days"] == results["full"]["days"]
@@ -0,0 +1,138 @@
+"""Lệnh quản trị cơ sở dữ liệu.
+
+    python tools/manage.py migrate                # chạy các migration còn thiếu
+    python tools/manage.py migrate --status       # xem migration nào chưa chạy
+    python tools/manage.py rebuild-daily          # tính lại bảng tổng hợp daily_movements, export_costs, position_costs
+    python tools/manage.py snapshot-stock         # snapshot tồn kho cuối ngày hôm qua (chạy định kỳ)
+    python tools/manage.py archive-movements      # chuyển lịch sử nhập/xuất cũ sang Parquet (chạy định kỳ)
+    python tools/manage.py maintain-partitions    # tạo partition tháng tới, xóa partition đã lưu trữ (MySQL)
+    python tools/manage.py classify-parts         # tính lại nhóm ABC/XYZ của linh kiện (chạy định kỳ)
+    python tools/manage.py check-alerts           # đánh giá lại cảnh báo tồn kho của toàn bộ danh mục
+    python tools/manage.py rebuild-lots           # tính lại lô tồn kho FIFO từ lịch sử nhập kho
+"""
+import argparse
+import os
+import sys
+
+# Thêm thư mục gốc vào cuối sys.path để email.py của repo không che module email chuẩn
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alerts
+import archive
+import classification
+import lots
+import migrations
+import partitions
+import settings
+import stock_history
+import summaries
+from database import get_write_engine, write_transaction
+
+
+def cmd_migrate(args):
+    engine = get_write_engine()
+    if args.status:
+        todo = migrations.pending(engine)
+        if not todo:
+            print("Schema đã ở phiên bản mới nhất.")
+        for version, description in todo:
+            print(f"  chưa chạy  {version:03d} {description}")
+        return
+    migrations.upgrade(engine, target=args.target)
+    print("Hoàn tất.")
+
+
+def cmd_rebuild_daily(args):
+    if args.check:
+        with get_write_engine().connect() as conn:
+            mismatches = summaries.check_daily_movements(conn)
+        for flag, day, stored, expected in mismatches:
+            print(f"  {'nhập' if flag else 'xuất'} {day}: bảng tổng hợp {stored}, tính lại {expected}")
+        print("Khớp với lịch sử nhập/xuất." if not mismatches else f"{len(mismatches)} ngày bị lệch.")
+        sys.exit(1 if mismatches else 0)
+    with write_transaction("import_export") as conn:
+        rows = summaries.rebuild_daily_movements(conn)
+        costs = summaries.rebuild_export_costs(conn)
+        positions = summaries.rebuild_position_costs(conn)
+    print(f"Đã tổng hợp {rows} dòng daily_movements, {costs} dòng export_costs, {positions} dòng position_costs.")
+
+
+def cmd_snapshot_stock(args):
+    with write_transaction("stock_snapshots") as conn:
+        parts = stock_history.take_snapshot(conn, args.date)
+    print(f"Đã ghi snapshot tồn kho của {parts} linh kiện.")
+
+
+def cmd_archive_movements(args):
+    cutoff = archive.archive_cutoff(args.before)
+    print(f"Lưu trữ các lượt nhập/xuất trước {cutoff} vào {os.path.abspath(settings.ARCHIVE_DIR)}")
+    rows = archive.archive_movements(get_write_engine(), args.before)
+    print(f"Đã chuyển {rows} lượt nhập/xuất sang archive.")
+
+
+def cmd_maintain_partitions(args):
+    created, dropped = partitions.maintain_partitions(get_write_engine(), months_ahead=args.months_ahead)
+    print(f"Đã tạo {created} và xóa {dropped} partition.")
+
+
+def cmd_classify_parts(args):
+    with write_transaction("part_classes") as conn:
+        written, deleted = classification.refresh_part_classes(conn, args.date)
+    print(f"Đã cập nhật nhóm ABC/XYZ của {written} linh kiện, xóa {deleted} dòng cũ.")
+
+
+def cmd_check_alerts(args):
+    with write_transaction("alerts") as conn:
+        opened, closed = alerts.check_all(conn)
+    print(f"{opened} linh kiện dưới mức tồn kho an toàn, đã đóng {closed} cảnh báo.")
+
+
+def cmd_rebuild_lots(args):
+    with write_transaction("stock_lots") as conn:
+        count = lots.rebuild_lots(conn)
+    print(f"Đã tạo {count} lô tồn kho.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("migrate", help="Chạy migration schema")
+    p.add_argument("--status", action="store_true", help="Chỉ liệt kê migration chưa chạy")
+    p.add_argument("--target", type=int, default=None, help="Chỉ chạy đến phiên bản này")
+    p.set_defaults(func=cmd_migrate)
+
+    p = commands.add_parser("rebuild-daily", help="Tính lại bảng daily_movements, export_costs, position_costs từ import_export và archive")
+    p.add_argument("--check", action="store_true", help="Chỉ đối chiếu, không ghi")
+    p.set_defaults(func=cmd_rebuild_daily)
+
+    p = commands.add_parser("snapshot-stock", help="Ghi snapshot tồn kho cuối ngày")
+    p.add_argument("--date", help="Ngày snapshot YYYY-MM-DD (mặc định hôm qua)")
+    p.set_defaults(func=cmd_snapshot_stock)
+
+    p = commands.add_parser("archive-movements", help="Chuyển lịch sử nhập/xuất cũ sang file Parquet")
+    p.add_argument("--before", help="Lưu trữ các tháng trước tháng chứa ngày này YYYY-MM-DD "
+                                    "(mặc định: hôm nay trừ WAREHOUSE_ARCHIVE_AFTER_DAYS)")
+    p.set_defaults(func=cmd_archive_movements)
+
+    p = commands.add_parser("maintain-partitions", help="Bảo trì partition theo tháng của import_export (MySQL)")
+    p.add_argument("--months-ahead", type=int, default=None,
+                   help="Số tháng tới cần có sẵn partition (mặc định WAREHOUSE_PARTITION_MONTHS_AHEAD)")
+    p.set_defaults(func=cmd_maintain_partitions)
+
+    p = commands.add_parser("classify-parts", help="Tính lại nhóm ABC/XYZ của linh kiện")
+    p.add_argument("--date", help="Tính cho các tháng trước tháng chứa ngày này YYYY-MM-DD (mặc định hôm nay)")
+    p.set_defaults(func=cmd_classify_parts)
+
+    p = commands.add_parser("check-alerts", help="Đánh giá lại cảnh báo tồn kho (sau khi sửa tồn kho ngoài app)")
+    p.set_defaults(func=cmd_check_alerts)
+
+    p = commands.add_parser("rebuild-lots", help="Tính lại bảng stock_lots từ lịch sử nhập và tồn kho hiện tại")
+    p.set_defaults(func=cmd_rebuild_lots)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()